@@ -19,13 +19,14 @@ Author: Sathurjan Jeyarupan
 """
 # Import necessary libraries
 import streamlit as st # Streamlit library for web application interface
-from db.db_connector import get_db_connection # Function to establish database connection
 import pandas as pd # Data manipulation and analysis library
 
 # Import page-specific functions for a modular code structure
 from pages.dashboard import data_filtering, dashboard_data_visualization,dashboard_key_metrics_display
+from pages.dashboard import fetch_dashboard_data # Every query of the dashboard, run concurrently
 from pages.data import data_upload_page_display
 from pages.ml import ml_data_processing_display
+from db.instrumentation import debug_panel # Optional query timings panel
 
 # Basic configuration for the Streamlit app
 st.set_page_config(
@@ -33,9 +34,6 @@ st.set_page_config(
     page_title="Customer Order Data Engineering", # Sets the title displayed in the browser tab
     page_icon="🦜",) # Sets the icon for the app
 
-# Establish a database connection using SQLAlchemy engine
-engine = get_db_connection()
-
 def data():
     """
     Display the Original Data Page for data import.
@@ -55,12 +53,17 @@ def home():
     - Data visualizations like bar and line charts.
     - Display of key metrics, such as total revenue, nomber of orders and number of unique customers.
     
-    It sequentially calls `data_filtering`, `dashboard_data_visualization`, 
-    and `dashboard_key_metrics_display` functions to display the page content.
+    It runs every query of the page concurrently with `fetch_dashboard_data`, waits for
+    all of them, and then calls `data_filtering`, `dashboard_data_visualization`, and
+    `dashboard_key_metrics_display` with the results to display the page content.
     """
-    data_filtering() # Applies filters for data based on user input and displays the filtered data
-    dashboard_data_visualization() # Displays data visualizations on the dashboard
-    dashboard_key_metrics_display() # Displays summary metrics for quick insights
+    results = fetch_dashboard_data() # Slider bounds, tables, revenue series and metrics, fetched concurrently
+    snapshot = results['snapshot']
+    if not isinstance(snapshot, dict):
+        return # The snapshot query failed and already displayed a warning
+    data_filtering(snapshot, results) # Applies filters for data based on user input and displays the filtered data
+    dashboard_data_visualization(snapshot, results) # Displays data visualizations on the dashboard
+    dashboard_key_metrics_display(snapshot, results) # Displays summary metrics for quick insights
     
 def ml():
     """
@@ -80,4 +83,5 @@ ml_page = st.Page(ml, title="Machine Learning") # Machine learning page for cust
 
 # Set up navigation for the app with Streamlit's page navigation system and display the selected page
 pg = st.navigation([home_page, data_page, ml_page])
-pg.run() # Run the selected page
\ No newline at end of file
+pg.run() # Run the selected page
+debug_panel() # Show query timings in the sidebar when enabled
\ No newline at end of file
@@ -0,0 +1,355 @@
+"""
+Benchmark Script for the Customer Order Dashboard
+
+This script measures how the application behaves beyond the bundled sample data.
+For every requested scale it:
+- Generates synthetic customers and orders (customer ids drawn from a Zipf-like
+  distribution, so a few customers place most of the orders) and writes them as
+  CSV files in the format of `data/customers.csv` and `data/order.csv`.
+- Loads them through `db.data_import.data_read_write` into a local database
+  (SQLite by default), once as a full import and once as a no-op incremental import.
+- Times every `db.filter` query without (cold) and with (warm) the query cache,
+  the same queries on the in-memory backend, and `SimpleLogisticRegressionApp`
+  training with k-fold validation.
+- Writes all timings to a JSON report so runs can be compared with each other.
+
+The database is selected with the `DATABASE_URL` environment variable read by
+`db.db_connector`; the script sets it to a file in the working directory unless
+`--database-url` is given. The Parquet snapshots of the generated CSV files are
+written to the working directory as well (`SNAPSHOT_DIR`, read by `db.csv_snapshot`).
+Every timed call must return a result of the expected type, so a query failing
+with a Streamlit warning stops the run instead of being timed.
+
+Usage:
+    python benchmark.py --orders 10000 100000 1000000 --output report.json
+
+Functions:
+- generate_customers: Writes a synthetic customers CSV file.
+- generate_orders: Writes a synthetic orders CSV file in blocks.
+- check_result: Checks that a timed call returned the expected result type.
+- time_call: Times repeated calls of a function.
+- benchmark_queries: Times every dashboard query.
+- run_benchmark: Runs the whole benchmark for one scale.
+- main: Parses the command line and writes the report.
+"""
+import argparse # Command line options
+import json # Machine-readable report
+import numbers # Expected scalar result types
+import os # Database URL for the shared engine
+import platform # Environment details in the report
+import statistics # Median of repeated timings
+import tempfile # Default working directory
+import time # Wall clock timings
+from datetime import datetime, timezone # Report timestamp
+import numpy as np # Synthetic data generation
+import pandas as pd # CSV writing
+
+# Rows generated and written per block, so 50M orders never sit in memory at once
+GENERATE_BLOCK_SIZE = 1000000
+
+# Orders per customer in the generated data (the sample export has about 7)
+DEFAULT_ORDERS_PER_CUSTOMER = 8
+
+# Exponent of the customer popularity distribution (0 gives a uniform distribution)
+DEFAULT_SKEW = 1.1
+
+# Expected results of the queries returning tuples (see `check_result`)
+MAX_FILTER_AMOUNT_RESULT = (numbers.Integral, numbers.Integral)
+ORDERS_PAGE_RESULT = (pd.DataFrame, (tuple, type(None))) # Orders and the cursor of the next page
+SUMMARY_RESULT = (numbers.Real, numbers.Integral, numbers.Integral)
+
+# Order dates are spread uniformly over this range
+GENERATE_START_DATE = np.datetime64('2021-01-01T00:00:00')
+GENERATE_END_DATE = np.datetime64('2024-12-31T23:59:59')
+
+def generate_customers(path, n_customers, seed=0):
+    """
+    Write a Synthetic Customers CSV File.
+
+    Parameters:
+        path (str): Output file path.
+        n_customers (int): Number of customers, with ids 1 to `n_customers`.
+        seed (int): Random seed.
+
+    Returns:
+        int: Number of rows written.
+    """
+    rng = np.random.default_rng(seed)
+    first_row = True
+    for start in range(0, n_customers, GENERATE_BLOCK_SIZE):
+        ids = np.arange(start + 1, min(start + GENERATE_BLOCK_SIZE, n_customers) + 1)
+        suffix = rng.integers(0, 10000, len(ids))
+        pd.DataFrame({
+            'customer_id': ids,
+            'name': [f"customer {i}" for i in ids],
+            'email': [f"customer{i}.{s}@example.com" for i, s in zip(ids, suffix)],
+        }).to_csv(path, mode='w' if first_row else 'a', header=first_row, index=False)
+        first_row = False
+    return n_customers
+
+def generate_orders(path, n_orders, n_customers, skew=DEFAULT_SKEW, seed=0):
+    """
+    Write a Synthetic Orders CSV File.
+
+    Customer ids are drawn with probability proportional to `1 / rank ** skew`,
+    amounts from a log-normal distribution and dates uniformly between
+    `GENERATE_START_DATE` and `GENERATE_END_DATE`.
+
+    Parameters:
+        path (str): Output file path.
+        n_orders (int): Number of orders, with ids 1 to `n_orders`.
+        n_customers (int): Number of customers to assign the orders to.
+        skew (float): Exponent of the customer popularity distribution.
+        seed (int): Random seed.
+
+    Returns:
+        int: Number of rows written.
+    """
+    rng = np.random.default_rng(seed + 1)
+    weights = 1.0 / np.arange(1, n_customers + 1) ** skew
+    cumulative = np.cumsum(weights / weights.sum())
+    customer_order = rng.permutation(n_customers) + 1 # Popular customers get random ids
+    span = int((GENERATE_END_DATE - GENERATE_START_DATE) / np.timedelta64(1, 's'))
+
+    first_row = True
+    for start in range(0, n_orders, GENERATE_BLOCK_SIZE):
+        size = min(GENERATE_BLOCK_SIZE, n_orders - start)
+        ranks = np.minimum(np.searchsorted(cumulative, rng.random(size)), n_customers - 1)
+        dates = GENERATE_START_DATE + rng.integers(0, span, size).astype('timedelta64[s]')
+        pd.DataFrame({
+            'id': np.arange(start + 1, start + size + 1),
+            'display_order_id': [f"{i:X}" for i in rng.integers(0x10000, 0xFFFFF, size)],
+            'total_amount': np.round(rng.lognormal(6.5, 0.8, size)),
+            'created_at': pd.to_datetime(dates).strftime('%Y-%m-%d %H:%M:%S'),
+            'customer_id': customer_order[ranks],
+        }).to_csv(path, mode='w' if first_row else 'a', header=first_row, index=False)
+        first_row = False
+    return n_orders
+
+def check_result(result, expected):
+    """
+    Check that a Timed Call Returned the Expected Result Type.
+
+    The query functions report failures by returning a Streamlit warning or error
+    instead of raising, so the timing of a failed call would look like a fast query.
+
+    Parameters:
+        result: Value returned by the call.
+        expected (type or tuple): Expected type, or a tuple with the expected type
+            of every item of a tuple result.
+
+    Raises:
+        RuntimeError: If the result does not match.
+    """
+    if isinstance(expected, tuple):
+        matches = (isinstance(result, tuple) and len(result) == len(expected) and
+                   all(isinstance(item, kind) for item, kind in zip(result, expected)))
+    else:
+        matches = isinstance(result, expected)
+    if not matches:
+        raise RuntimeError(f"Unexpected result {type(result).__name__}: {result!r:.200}")
+
+def time_call(function, repeats=3, before=None, expected=object):
+    """
+    Time Repeated Calls of a Function.
+
+    Parameters:
+        function (callable): Function to call without arguments.
+        repeats (int): Number of calls.
+        before (callable): Called before every timed call, outside the timing (optional).
+        expected (type or tuple): Expected result, see `check_result` (default is any result).
+
+    Returns:
+        dict: Every timing, the median and the minimum in milliseconds.
+
+    Raises:
+        RuntimeError: If a call does not return the expected result.
+    """
+    timings = []
+    for _ in range(repeats):
+        if before:
+            before()
+        start_time = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start_time) * 1000)
+        check_result(result, expected)
+    return {'runs_ms': [round(t, 3) for t in timings],
+            'median_ms': round(statistics.median(timings), 3),
+            'min_ms': round(min(timings), 3)}
+
+def benchmark_queries(queries, repeats, clear=None):
+    """
+    Time Every Dashboard Query.
+
+    Parameters:
+        queries (dict): Query name mapped to a callable without arguments and its
+            expected result (see `check_result`).
+        repeats (int): Number of calls per query.
+        clear (callable): Empties the query cache before every call (optional).
+
+    Returns:
+        dict: Query name mapped to its timings; with `clear`, separate cold
+        (cache cleared) and warm (cache filled) timings.
+
+    Raises:
+        RuntimeError: If a query does not return its expected result.
+    """
+    results = {}
+    for name, (query, expected) in queries.items():
+        try:
+            if clear is None:
+                results[name] = time_call(query, repeats, expected=expected)
+            else:
+                results[name] = {'cold': time_call(query, repeats, before=clear, expected=expected),
+                                 'warm': time_call(query, repeats, expected=expected)}
+        except RuntimeError as e:
+            raise RuntimeError(f"Query {name} failed: {e}") from e
+    return results
+
+def run_benchmark(n_orders, workdir, n_customers=None, skew=DEFAULT_SKEW, repeats=3, folds=5, seed=0):
+    """
+    Run the Benchmark for One Scale.
+
+    Parameters:
+        n_orders (int): Number of generated orders.
+        workdir (str): Directory for the generated CSV files.
+        n_customers (int): Number of generated customers (default is
+            `n_orders / DEFAULT_ORDERS_PER_CUSTOMER`).
+        skew (float): Exponent of the customer popularity distribution.
+        repeats (int): Number of timed calls per query.
+        folds (int): Number of folds for the model validation.
+        seed (int): Random seed.
+
+    Returns:
+        dict: Timings of the data generation, the imports, every query and the
+        model training.
+
+    Raises:
+        RuntimeError: If the import did not load the generated orders.
+    """
+    # Imported here so that DATABASE_URL is set before the shared engine is created
+    from db.cache import clear_cache, get_data_version
+    from db.data_import import data_read_write
+    from db.db_connector import get_db_connection
+    from db.filter import (count_filtered_orders, filter_customer_by_amount, filter_data_by_sidebar, get_customer_features,
+                           filter_orders_page, get_dashboard_snapshot, get_max_filter_amount,
+                           get_total_over_time, get_total_summery, top_customer_by_revenue)
+    from db.memory_engine import InMemoryAnalytics
+    from db.sketches import Estimate
+    from ml_model import SimpleLogisticRegressionApp, train_lr_model
+
+    n_customers = n_customers or max(1, n_orders // DEFAULT_ORDERS_PER_CUSTOMER)
+    customers_csv = os.path.join(workdir, f"customers_{n_orders}.csv")
+    orders_csv = os.path.join(workdir, f"orders_{n_orders}.csv")
+    report = {'orders': n_orders, 'customers': n_customers, 'skew': skew}
+
+    # Generate the CSV files
+    start_time = time.perf_counter()
+    generate_customers(customers_csv, n_customers, seed)
+    generate_orders(orders_csv, n_orders, n_customers, skew, seed)
+    report['generate_seconds'] = round(time.perf_counter() - start_time, 3)
+    report['csv_bytes'] = os.path.getsize(customers_csv) + os.path.getsize(orders_csv)
+
+    # Full import, then an incremental import that finds nothing new
+    for name, incremental in (('import', False), ('incremental_import', True)):
+        start_time = time.perf_counter()
+        data_read_write(incremental=incremental, customers_csv=customers_csv, orders_csv=orders_csv)
+        elapsed = time.perf_counter() - start_time
+        report[name] = {'seconds': round(elapsed, 3),
+                        'rows_per_second': round((n_orders + n_customers) / elapsed)}
+    clear_cache()
+    summary = get_total_summery()
+    if not isinstance(summary, tuple) or summary[2] != n_orders:
+        raise RuntimeError(f"Import of {n_orders} orders failed.")
+
+    # Queries of the dashboard with the default filters, and their expected results
+    queries = {
+        'get_max_filter_amount': (lambda: get_max_filter_amount(), MAX_FILTER_AMOUNT_RESULT),
+        'filter_data_by_sidebar': (lambda: filter_data_by_sidebar([], 0, 0), pd.DataFrame),
+        'filter_orders_page': (lambda: filter_orders_page([], 0, 0), ORDERS_PAGE_RESULT),
+        'count_filtered_orders': (lambda: count_filtered_orders([], 0, 0), numbers.Integral),
+        'filter_customer_by_amount': (lambda: filter_customer_by_amount(0, 0), pd.DataFrame),
+        'top_customer_by_revenue': (lambda: top_customer_by_revenue(10), pd.DataFrame),
+        'get_total_over_time': (lambda: get_total_over_time(), pd.DataFrame),
+        'get_total_summery': (lambda: get_total_summery(), SUMMARY_RESULT),
+        'get_total_summery(approximate)': (lambda: get_total_summery(True), (Estimate, Estimate, Estimate)),
+        'get_max_filter_amount(approximate)': (lambda: get_max_filter_amount(True), MAX_FILTER_AMOUNT_RESULT),
+        'get_dashboard_snapshot': (lambda: get_dashboard_snapshot(10), dict),
+        'get_customer_features': (lambda: get_customer_features(), pd.DataFrame),
+    }
+    report['queries'] = benchmark_queries(queries, repeats, clear=clear_cache)
+
+    # Same queries on the in-memory backend
+    start_time = time.perf_counter()
+    analytics = InMemoryAnalytics(get_db_connection(), get_data_version())
+    start_date, end_date = datetime(2024, 1, 1), datetime.now()
+    report['memory_engine'] = {
+        'load_seconds': round(time.perf_counter() - start_time, 3),
+        'queries': benchmark_queries({
+            'get_max_filter_amount': (analytics.get_max_filter_amount, MAX_FILTER_AMOUNT_RESULT),
+            'filter_data_by_sidebar': (lambda: analytics.filter_orders(start_date, end_date), pd.DataFrame),
+            'filter_orders_page': (lambda: analytics.filter_orders_page(start_date, end_date), ORDERS_PAGE_RESULT),
+            'count_filtered_orders': (lambda: analytics.count_filtered_orders(start_date, end_date), numbers.Integral),
+            'filter_customer_by_amount': (lambda: analytics.filter_customer_by_amount(0, 0), pd.DataFrame),
+            'top_customer_by_revenue': (lambda: analytics.top_customer_by_revenue(10), pd.DataFrame),
+            'get_total_over_time': (analytics.get_total_over_time, pd.DataFrame),
+            'get_total_summery': (analytics.get_total_summery, SUMMARY_RESULT),
+            'get_dashboard_snapshot': (lambda: analytics.get_dashboard_snapshot(10), dict),
+        }, repeats),
+    }
+
+    # Model training: feature query plus k-fold validation
+    clear_cache()
+    app = SimpleLogisticRegressionApp()
+    start_time = time.perf_counter()
+    X, y = app.data_preprocessing_for_model_build()
+    preprocessing_seconds = time.perf_counter() - start_time
+    train_lr_model(X, y, folds) # Always trains, unlike the persisted model of validate_the_lr_model
+    report['model_training'] = {'preprocessing_seconds': round(preprocessing_seconds, 3),
+                                'seconds': round(time.perf_counter() - start_time, 3),
+                                'folds': folds, 'samples': len(X)}
+    return report
+
+def main():
+    """
+    Parse the Command Line, Run Every Scale and Write the Report.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the import, the dashboard queries and model training.")
+    parser.add_argument('--orders', type=int, nargs='+', default=[10000, 100000],
+                        help="Numbers of orders to generate, one run per value (default: 10000 100000).")
+    parser.add_argument('--customers', type=int, default=None,
+                        help=f"Number of customers (default: orders / {DEFAULT_ORDERS_PER_CUSTOMER}).")
+    parser.add_argument('--skew', type=float, default=DEFAULT_SKEW,
+                        help=f"Customer popularity exponent, 0 for uniform (default: {DEFAULT_SKEW}).")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed calls per query (default: 3).")
+    parser.add_argument('--folds', type=int, default=5, help="Folds of the model validation (default: 5).")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0).")
+    parser.add_argument('--workdir', default=None, help="Directory for the generated files (default: a temporary directory).")
+    parser.add_argument('--database-url', default=None,
+                        help="SQLAlchemy URL of the database to load (default: SQLite file in the working directory).")
+    parser.add_argument('--output', default='benchmark_report.json', help="Report file (default: benchmark_report.json).")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='order_benchmark_')
+    os.makedirs(workdir, exist_ok=True)
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(workdir, 'benchmark.db')}"
+    os.environ['SNAPSHOT_DIR'] = os.path.join(workdir, 'snapshots') # Not the caller's working directory
+
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': os.environ['DATABASE_URL'].split(':', 1)[0],
+        'runs': [],
+    }
+    for n_orders in args.orders:
+        print(f"Benchmarking {n_orders} orders...")
+        report['runs'].append(run_benchmark(n_orders, workdir, args.customers, args.skew,
+                                            args.repeats, args.folds, args.seed))
+
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Report written to {args.output}")
+
+if __name__ == '__main__':
+    main()
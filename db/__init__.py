@@ -1,3 +1,11 @@
+from . import cache
+from . import concurrency
+from . import csv_snapshot
 from . import data_import
 from . import db_connector
-from . import filter
\ No newline at end of file
+from . import dtypes
+from . import filter
+from . import instrumentation
+from . import memory_engine
+from . import schema
+from . import sketches
\ No newline at end of file
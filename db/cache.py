@@ -0,0 +1,214 @@
+"""
+Query Cache Module for Streamlit Application
+
+This module keeps the results of the `db.filter` functions in a process-wide,
+size-bounded LRU cache shared by all sessions. Every cache key contains the data
+version token, which `db.data_import.data_read_write` replaces after each import,
+so results computed before an import are never served afterwards.
+
+The token is stored in the `data_version` table so that every process serving the
+app sees a new import; each process re-reads it at most once every
+`data_version_ttl` seconds (default 30). The cache size is set with the optional
+`query_cache_size` key of the `[delivergate_db]` secrets section (default 256).
+
+Functions:
+- get_data_version: Returns the current data version token.
+- bump_data_version: Stores a new data version token after an import.
+- cached_query: Decorator caching a query function's result per data version.
+- get_cache_stats: Returns hit, miss and eviction counters of the cache.
+- clear_cache: Removes every cached result.
+- pop_cache_status: Returns whether the last call of a cached function on this thread was a hit.
+"""
+from collections import OrderedDict # Ordered mapping used as the LRU store
+import functools # Decorator helpers
+import threading # Lock shared by the Streamlit session threads
+import time # Version token and version refresh interval
+import pandas as pd # DataFrame results are copied before being returned
+from sqlalchemy import delete, insert, select # SQL statements for the data_version table
+from db.db_connector import get_db_connection, get_db_setting # Shared engine and settings
+from db.schema import data_version # Table holding the data version token
+
+# Default cache size and data version refresh interval, overridable in secrets.toml
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_DATA_VERSION_TTL = 30
+
+# Cached results, most recently used last
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+# Hit or miss of the last call of each cached function, per thread
+_status = threading.local()
+
+# Data version token of this process and the time it was last read from the database
+_data_version = {'token': None, 'checked_at': 0.0}
+
+def get_data_version():
+    """
+    Return the Current Data Version Token.
+
+    The token is read from the `data_version` table on first use and then again at
+    most every `data_version_ttl` seconds, so imports made by other processes are
+    picked up without querying the database on every request.
+
+    Returns:
+        int: Data version token (0 if no import has been recorded).
+    """
+    ttl = float(get_db_setting("data_version_ttl", DEFAULT_DATA_VERSION_TTL))
+    now = time.monotonic()
+    if _data_version['token'] is None or now - _data_version['checked_at'] > ttl:
+        token = 0
+        engine = get_db_connection()
+        if engine:
+            try:
+                with engine.connect() as connection:
+                    token = connection.execute(select(data_version.c.version)).scalar() or 0
+            except Exception:
+                token = 0 # The table does not exist before the first import
+        _data_version.update(token=token, checked_at=now)
+    return _data_version['token']
+
+def bump_data_version(connection, token=None):
+    """
+    Store a New Data Version Token.
+
+    Called at the end of every import. The new token makes all cached results of
+    the previous data unreachable, and they are dropped from the cache.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside a transaction.
+        token (int): Token chosen by the import (default is the current time in nanoseconds).
+
+    Returns:
+        int: The new data version token.
+    """
+    token = token or time.time_ns()
+    data_version.create(connection, checkfirst=True)
+    connection.execute(delete(data_version))
+    connection.execute(insert(data_version).values(version=token))
+    _data_version.update(token=token, checked_at=time.monotonic())
+    clear_cache()
+    return token
+
+def _freeze(value):
+    """
+    Convert a Function Argument into a Hashable Cache Key Part.
+
+    Parameters:
+        value: Positional or keyword argument of a cached function.
+
+    Returns:
+        A hashable equivalent of `value` (lists and dicts become tuples).
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+def _copy(value):
+    """
+    Copy a Cached Result Before Handing it to the Caller.
+
+    Callers are free to modify returned DataFrames in place, so the cached
+    instance itself is never returned.
+
+    Parameters:
+        value: Cached result.
+
+    Returns:
+        A copy of `value` whose DataFrames are independent of the cache.
+    """
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return value._make(_copy(item) for item in value) # Named tuples such as estimates keep their type
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value
+
+def cached_query(function):
+    """
+    Cache a Query Function's Result per Data Version.
+
+    Only DataFrame, tuple, dict and numeric results are cached; the Streamlit
+    error and warning elements the query functions return on failure are not.
+
+    Parameters:
+        function (callable): Query function whose arguments are hashable or lists.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        key = (function.__qualname__, _freeze(args), _freeze(kwargs), get_data_version())
+        with _lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                _stats['hits'] += 1
+                _set_cache_status(function.__qualname__, 'hit')
+                return _copy(_cache[key])
+            _stats['misses'] += 1
+        _set_cache_status(function.__qualname__, 'miss')
+
+        result = function(*args, **kwargs)
+        if isinstance(result, (pd.DataFrame, tuple, dict, int, float)):
+            max_entries = int(get_db_setting("query_cache_size", DEFAULT_CACHE_SIZE))
+            with _lock:
+                _cache[key] = result
+                _cache.move_to_end(key)
+                while len(_cache) > max_entries:
+                    _cache.popitem(last=False)
+                    _stats['evictions'] += 1
+        return _copy(result)
+    return wrapper
+
+def _set_cache_status(name, status):
+    """
+    Remember Whether a Cached Function Call Was a Hit or a Miss.
+
+    Parameters:
+        name (str): Qualified name of the cached function.
+        status (str): "hit" or "miss".
+    """
+    if not hasattr(_status, 'calls'):
+        _status.calls = {}
+    _status.calls[name] = status
+
+def pop_cache_status(name):
+    """
+    Return and Forget the Cache Status of a Function's Last Call on This Thread.
+
+    Parameters:
+        name (str): Qualified name of the cached function.
+
+    Returns:
+        str: "hit" or "miss", or None if the function is not cached.
+    """
+    return getattr(_status, 'calls', {}).pop(name, None)
+
+def get_cache_stats():
+    """
+    Return Cache Counters.
+
+    Returns:
+        dict: Hits, misses, evictions, current and maximum number of entries and
+        the data version token in use.
+    """
+    with _lock:
+        return {
+            **_stats,
+            'entries': len(_cache),
+            'max_entries': int(get_db_setting("query_cache_size", DEFAULT_CACHE_SIZE)),
+            'data_version': _data_version['token'],
+        }
+
+def clear_cache():
+    """
+    Remove Every Cached Result.
+    """
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,62 @@
+"""
+Concurrent Query Module for Streamlit Application
+
+This module runs independent `db.filter` calls of one page render at the same
+time, so the page waits for the slowest query instead of the sum of all of them.
+The calls run on a thread pool; each thread checks out its own connection from
+the shared engine's pool and is attached to the Streamlit script run context of
+the page, so warnings displayed by a failing query still reach the page.
+
+The number of queries running at once is set with the optional `query_concurrency`
+key of the `[delivergate_db]` secrets section (default 4). Keep it at or below
+`pool_size` + `max_overflow` of the connection pool; 1 runs the calls one after
+another on the script thread.
+
+Functions:
+- get_query_concurrency: Returns the configured concurrency limit.
+- run_concurrently: Runs independent calls on a thread pool and returns their results.
+"""
+from concurrent.futures import ThreadPoolExecutor # Thread pool running the queries
+import threading # Current worker thread for the script run context
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx # Streamlit context of the page
+from db.db_connector import get_db_setting # Concurrency limit setting
+
+# Default number of queries running at once, overridable in secrets.toml
+DEFAULT_QUERY_CONCURRENCY = 4
+
+def get_query_concurrency():
+    """
+    Return the Configured Concurrency Limit.
+
+    Returns:
+        int: Maximum number of queries running at once (at least 1).
+    """
+    return max(1, int(get_db_setting("query_concurrency", DEFAULT_QUERY_CONCURRENCY)))
+
+def run_concurrently(calls, max_workers=None):
+    """
+    Run Independent Calls Concurrently and Join Their Results.
+
+    Parameters:
+        calls (dict): Name of every call mapped to a `(function, args)` tuple.
+        max_workers (int): Maximum number of calls running at once (default is
+            `get_query_concurrency()`).
+
+    Returns:
+        dict: Name of every call mapped to its result, once all of them finished.
+    Raises:
+        Exception: The exception of the first failed call, after all calls finished.
+    """
+    max_workers = min(max_workers or get_query_concurrency(), len(calls))
+    if max_workers <= 1:
+        return {name: function(*args) for name, (function, args) in calls.items()}
+
+    # Attach every worker thread to the script run context of the page
+    script_run_ctx = get_script_run_ctx(suppress_warning=True)
+    def attach_context():
+        if script_run_ctx is not None:
+            add_script_run_ctx(threading.current_thread(), script_run_ctx)
+
+    with ThreadPoolExecutor(max_workers=max_workers, initializer=attach_context) as executor:
+        futures = {name: executor.submit(function, *args) for name, (function, args) in calls.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,332 @@
+"""
+CSV Snapshot Module for Streamlit Application
+
+This module keeps a typed Parquet copy ("snapshot") of every source CSV file, so
+the importer and the Original Data page read columnar data instead of parsing the
+CSV text again on every import and every rerun. A snapshot is stored next to a
+small JSON file recording the size, modification time and SHA-256 hash of the CSV
+it was built from, and the parsing options used:
+
+- Size and modification time unchanged: the snapshot is used as is.
+- Either changed but the hash is the same (the file was only touched): the
+  recorded fingerprint is updated and the snapshot is reused.
+- Otherwise the snapshot is rebuilt by streaming the CSV in chunks.
+
+Snapshots are written to the `snapshot_dir` directory of the `[delivergate_db]`
+secrets section (default "snapshots"); a `SNAPSHOT_DIR` environment variable, when
+set, takes precedence, like `DATABASE_URL` (used by `benchmark.py`). They require the `pyarrow` package (listed
+in requirements.txt); without it, or if a snapshot cannot be written or its chunks
+parse to differing types, the readers fall back to parsing the CSV file directly.
+
+Functions:
+- csv_fingerprint: Returns the size, modification time and optionally the hash of a CSV file.
+- get_snapshot_path: Returns the paths of the snapshot and fingerprint files of a CSV file.
+- ensure_snapshot: Builds or validates the snapshot of a CSV file and returns its path.
+- read_source: Reads a CSV file through its snapshot.
+- read_source_chunks: Streams a CSV file in chunks through its snapshot.
+- read_source_head: Reads only the first rows of a CSV file.
+- get_source_stats: Returns the row count and per-column statistics of a CSV file, cached per fingerprint.
+"""
+import hashlib # Content hash of the CSV files
+import json # Fingerprint files
+import os # File metadata and atomic replacement
+import threading # Lock serializing snapshot builds
+import pandas as pd # CSV parsing and DataFrames
+import streamlit as st # Cache of the column statistics
+from db.db_connector import get_db_setting # Snapshot directory setting
+
+try:
+    import pyarrow as pa # Arrow tables written to Parquet (optional at runtime)
+    import pyarrow.parquet as pq # Optional: Parquet reader and writer
+except ImportError:
+    pa = pq = None
+
+# Default snapshot directory, overridable in secrets.toml
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+
+# Rows parsed from the CSV file per chunk while building a snapshot
+SNAPSHOT_CHUNK_SIZE = 50000
+
+# Bytes read at a time while hashing a CSV file
+HASH_BLOCK_SIZE = 1 << 20
+
+# Snapshot builds of this process, one at a time
+_build_lock = threading.Lock()
+
+def csv_fingerprint(path, with_hash=False):
+    """
+    Return the Fingerprint of a CSV File.
+
+    Parameters:
+        path (str): Path of the CSV file.
+        with_hash (bool): Also compute the SHA-256 hash of the content (default is False).
+
+    Returns:
+        dict: `size` in bytes, `mtime_ns` and, when requested, `sha256`.
+    """
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as csv_file:
+            for block in iter(lambda: csv_file.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+def get_snapshot_path(path):
+    """
+    Return the Snapshot and Fingerprint Paths of a CSV File.
+
+    Parameters:
+        path (str): Path of the CSV file.
+
+    Returns:
+        tuple: Path of the Parquet snapshot and of its JSON fingerprint file.
+    """
+    snapshot_dir = os.environ.get("SNAPSHOT_DIR") or get_db_setting("snapshot_dir", DEFAULT_SNAPSHOT_DIR)
+    name = os.path.splitext(os.path.basename(path))[0]
+    source_hash = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8] # Same file names in other directories
+    base_path = os.path.join(snapshot_dir, f"{name}_{source_hash}")
+    return f"{base_path}.parquet", f"{base_path}.json"
+
+def _read_fingerprint(fingerprint_path):
+    """
+    Read a Recorded Fingerprint.
+
+    Returns:
+        dict: The recorded fingerprint, or an empty dict if there is none.
+    """
+    try:
+        with open(fingerprint_path) as fingerprint_file:
+            return json.load(fingerprint_file)
+    except (OSError, ValueError):
+        return {}
+
+def _write_atomically(target_path, write):
+    """
+    Write a File Through a Temporary File and Replace the Target.
+
+    Readers in other sessions never see a half-written file.
+
+    Parameters:
+        target_path (str): Final path of the file.
+        write (callable): Writes the content to the temporary path it is given.
+    """
+    temporary_path = f"{target_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(temporary_path)
+        os.replace(temporary_path, target_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+def _build_snapshot(path, snapshot_path, dtype, parse_dates):
+    """
+    Stream a CSV File into a Parquet Snapshot.
+
+    The schema of the snapshot is taken from the first chunk, and every later
+    chunk is cast to it. Callers pass explicit `dtype`s so all chunks parse to the
+    same types; a column without one whose values no longer fit the first chunk's
+    type (whole numbers first, decimals later) raises `pyarrow.ArrowInvalid`.
+
+    Parameters:
+        path (str): Path of the CSV file.
+        snapshot_path (str): Path of the Parquet snapshot.
+        dtype (dict): Optional column types passed to `pd.read_csv`.
+        parse_dates (list): Optional CSV columns parsed as datetimes.
+    """
+    def write(temporary_path):
+        writer = None
+        try:
+            for chunk in pd.read_csv(path, chunksize=SNAPSHOT_CHUNK_SIZE, dtype=dtype, parse_dates=parse_dates):
+                if writer is None:
+                    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(temporary_path, schema)
+                writer.write_table(pa.Table.from_pandas(chunk, preserve_index=False).cast(schema))
+            if writer is None: # Header only: keep the columns of the empty file
+                empty = pd.read_csv(path, dtype=dtype, parse_dates=parse_dates)
+                pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), temporary_path)
+        finally:
+            if writer is not None:
+                writer.close()
+    _write_atomically(snapshot_path, write)
+
+def ensure_snapshot(path, dtype=None, parse_dates=None):
+    """
+    Build or Validate the Snapshot of a CSV File.
+
+    Parameters:
+        path (str): Path of the CSV file.
+        dtype (dict): Optional column types passed to `pd.read_csv`.
+        parse_dates (list): Optional CSV columns parsed as datetimes.
+
+    Returns:
+        str: Path of an up-to-date Parquet snapshot, or None when `pyarrow` is not
+        installed or the snapshot could not be written or typed.
+    """
+    if pq is None:
+        return None
+    snapshot_path, fingerprint_path = get_snapshot_path(path)
+    options = {'dtype': dtype or {}, 'parse_dates': parse_dates or []}
+    try:
+        with _build_lock:
+            recorded = _read_fingerprint(fingerprint_path)
+            current = csv_fingerprint(path)
+            usable = os.path.exists(snapshot_path) and recorded.get('options') == options
+            if usable and all(recorded.get(key) == value for key, value in current.items()):
+                return snapshot_path # Size and modification time unchanged
+
+            current = csv_fingerprint(path, with_hash=True)
+            if not (usable and recorded.get('sha256') == current['sha256']):
+                os.makedirs(os.path.dirname(snapshot_path) or '.', exist_ok=True)
+                _build_snapshot(path, snapshot_path, dtype, parse_dates)
+
+            # Record the fingerprint of the CSV the snapshot belongs to
+            def write(temporary_path):
+                with open(temporary_path, 'w') as fingerprint_file:
+                    json.dump({**current, 'options': options}, fingerprint_file)
+            _write_atomically(fingerprint_path, write)
+            return snapshot_path
+    except OSError:
+        return None # Read-only or missing snapshot directory: parse the CSV instead
+    except pa.ArrowException:
+        return None # Chunks of differing types: parse the CSV instead
+
+def read_source(path, dtype=None, parse_dates=None, columns=None):
+    """
+    Read a CSV File Through its Snapshot.
+
+    Parameters:
+        path (str): Path of the CSV file.
+        dtype (dict): Optional column types passed to `pd.read_csv`.
+        parse_dates (list): Optional CSV columns parsed as datetimes.
+        columns (list): Optional CSV columns to read (default is all of them).
+
+    Returns:
+        DataFrame: The CSV content with the CSV column names.
+    """
+    snapshot_path = ensure_snapshot(path, dtype, parse_dates)
+    if snapshot_path is None:
+        return pd.read_csv(path, dtype=dtype, parse_dates=parse_dates, usecols=columns)
+    return pd.read_parquet(snapshot_path, columns=columns)
+
+def read_source_chunks(path, chunksize, dtype=None, parse_dates=None):
+    """
+    Stream a CSV File in Chunks Through its Snapshot.
+
+    Parameters:
+        path (str): Path of the CSV file.
+        chunksize (int): Number of rows per chunk.
+        dtype (dict): Optional column types passed to `pd.read_csv`.
+        parse_dates (list): Optional CSV columns parsed as datetimes.
+
+    Returns:
+        generator: DataFrame chunks with the CSV column names.
+    """
+    snapshot_path = ensure_snapshot(path, dtype, parse_dates)
+    if snapshot_path is None:
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=dtype, parse_dates=parse_dates)
+        return
+    for batch in pq.ParquetFile(snapshot_path).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+def _current_snapshot(path, dtype=None, parse_dates=None):
+    """
+    Return the Snapshot of a CSV File Only if it Is Already Up to Date.
+
+    Only the size and modification time are compared; nothing is hashed or built.
+
+    Returns:
+        str: Path of the current Parquet snapshot, or None if there is none.
+    """
+    if pq is None:
+        return None
+    snapshot_path, fingerprint_path = get_snapshot_path(path)
+    recorded = _read_fingerprint(fingerprint_path)
+    options = {'dtype': dtype or {}, 'parse_dates': parse_dates or []}
+    is_current = (os.path.exists(snapshot_path) and recorded.get('options') == options and
+                  all(recorded.get(key) == value for key, value in csv_fingerprint(path).items()))
+    return snapshot_path if is_current else None
+
+def read_source_head(path, nrows, dtype=None, parse_dates=None):
+    """
+    Read Only the First Rows of a CSV File.
+
+    Only the first rows are read: the first record batch of an existing snapshot,
+    or `nrows` rows of the CSV file. A missing or outdated snapshot is not built
+    here, so a preview never waits for a full pass over the file.
+
+    Parameters:
+        path (str): Path of the CSV file.
+        nrows (int): Maximum number of rows to read.
+        dtype (dict): Optional column types passed to `pd.read_csv`.
+        parse_dates (list): Optional CSV columns parsed as datetimes.
+
+    Returns:
+        DataFrame: Up to `nrows` rows with the CSV column names.
+    """
+    snapshot_path = _current_snapshot(path, dtype, parse_dates)
+    if snapshot_path is not None:
+        for batch in pq.ParquetFile(snapshot_path).iter_batches(batch_size=int(nrows)):
+            return batch.to_pandas()
+    return pd.read_csv(path, nrows=int(nrows), dtype=dtype, parse_dates=parse_dates)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _source_stats(path, size, mtime_ns, dtype, parse_dates):
+    """
+    Compute the Statistics of a CSV File in One Streaming Pass.
+
+    Cached per file size and modification time, so the pass runs again only
+    after the file changed. An up-to-date snapshot is read if there is one;
+    otherwise the CSV file is streamed directly, without building a snapshot.
+
+    Returns:
+        tuple: Row count and the per-column statistics DataFrame.
+    """
+    row_count = 0
+    columns = {}
+    dtype, parse_dates = dict(dtype) or None, list(parse_dates) or None
+    snapshot_path = _current_snapshot(path, dtype, parse_dates)
+    if snapshot_path is not None:
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(snapshot_path).iter_batches(batch_size=SNAPSHOT_CHUNK_SIZE))
+    else:
+        chunks = pd.read_csv(path, chunksize=SNAPSHOT_CHUNK_SIZE, dtype=dtype, parse_dates=parse_dates)
+    for chunk in chunks:
+        row_count += len(chunk)
+        for name in chunk.columns:
+            values = chunk[name].dropna()
+            stats = columns.setdefault(name, {'column': name, 'dtype': str(chunk[name].dtype), 'non_null': 0,
+                                              'min': None, 'max': None, 'sum': 0.0})
+            stats['non_null'] += len(values)
+            is_numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+            if len(values) and (is_numeric or pd.api.types.is_datetime64_any_dtype(values)):
+                stats['min'] = values.min() if stats['min'] is None else min(stats['min'], values.min())
+                stats['max'] = values.max() if stats['max'] is None else max(stats['max'], values.max())
+            stats['sum'] = stats['sum'] + float(values.sum()) if is_numeric else None
+    stats_df = pd.DataFrame(list(columns.values()), columns=['column', 'dtype', 'non_null', 'min', 'max', 'sum'])
+    stats_df['nulls'] = row_count - stats_df['non_null']
+    stats_df['mean'] = stats_df['sum'] / stats_df['non_null'].where(stats_df['non_null'] > 0)
+    stats_df[['min', 'max']] = stats_df[['min', 'max']].astype(str) # Numbers and dates in one display column
+    return row_count, stats_df[['column', 'dtype', 'non_null', 'nulls', 'min', 'max', 'mean']]
+
+def get_source_stats(path, dtype=None, parse_dates=None):
+    """
+    Return the Row Count and Column Statistics of a CSV File.
+
+    The statistics come from a single streaming pass over the file (through its
+    snapshot when that is up to date) and are cached until the size or
+    modification time of the file change. The pass never builds a snapshot.
+
+    Parameters:
+        path (str): Path of the CSV file.
+        dtype (dict): Optional column types passed to `pd.read_csv`.
+        parse_dates (list): Optional CSV columns parsed as datetimes.
+
+    Returns:
+        tuple: Number of rows, and a DataFrame with the type, non-null and null
+        counts, minimum, maximum (numbers and dates) and mean (numbers) of every column.
+    """
+    fingerprint = csv_fingerprint(path)
+    return _source_stats(path, fingerprint['size'], fingerprint['mtime_ns'],
+                         tuple(sorted((dtype or {}).items())), tuple(parse_dates or ()))
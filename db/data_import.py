@@ -4,53 +4,590 @@ Data Import Module for Streamlit Application
 This module handles the import of customer and order data from CSV files into
 a MySQL database using SQLAlchemy. The `data_read_write` function reads the data,
 renames columns as required, and then inserts the data into the database tables
-if a valid database connection is established.
+if a valid database connection is established. After every load the per-customer
+rollup table (`customer_summary`) is rebuilt so the dashboard filters can read
+pre-aggregated totals instead of grouping the whole `orders` table.
+
+In incremental mode only orders above the current high-water mark (the largest
+`order_id` already stored) are appended, new or changed customers are upserted,
+and the rollup is refreshed for the affected customers only. Refreshed rollup rows
+carry the data version token of the import in `updated_version`, so consumers such
+as the online model in `ml_model` can read just the customers that changed.
+
+The `customer_features` table (recency/frequency/monetary inputs and inter-order
+gap statistics of the model) is maintained the same way: rebuilt on a full import
+and recomputed from the orders of the affected customers on an incremental one.
+
+The `top_customers` table keeps the customers with the highest total spent, up to
+`top_customers_max` of the `[delivergate_db]` secrets section (default 100). It is
+rebuilt from `customer_summary` on a full import; an incremental import merges the
+refreshed totals of the affected customers into the stored list, since a customer
+whose total did not change cannot enter it.
+
+The `revenue_daily` table holds the revenue and order count of every order day, so
+the revenue-over-time chart reads a few hundred pre-aggregated rows at any
+granularity. It is rebuilt on a full import and, on an incremental one, only the
+days between the first and last new order are re-aggregated.
+
+The CSV files are read through their typed Parquet snapshots (see `db.csv_snapshot`),
+which are only rebuilt when a CSV file changes, and streamed in fixed-size chunks and every chunk is written with
+multi-row INSERT statements in its own transaction, so peak memory depends on the
+chunk size rather than on the size of the export.
+
+A full import recreates the tables from the typed schema in `db.schema` (integer
+primary keys, DATETIME dates, DECIMAL amounts) and builds the secondary indexes
+only after the bulk load has finished.
+
+The sample and sketches of the approximate mode (see `db.sketches`) are updated
+from the same chunks while they are loaded, so they never need a scan of `orders`.
+
+Every import ends by storing a new data version token (see `db.cache`), which
+invalidates the cached results of the filter queries.
 
 Functions:
 - data_read_write: Reads data from CSV files, renames columns, and imports the data
   into MySQL tables. Provides success or error messages based on operation outcome.
+- build_customer_summary: Refills the `customer_summary` rollup table from `orders`.
+- refresh_customer_summary: Recomputes the rollup rows of the given customers.
+- compute_customer_features: Computes the model features of customers from their orders.
+- build_customer_features: Refills the `customer_features` table.
+- refresh_customer_features: Recomputes the feature rows of the given customers.
+- get_top_customers_max: Returns the number of customers kept in the `top_customers` table.
+- build_top_customers: Refills the `top_customers` table from `customer_summary`.
+- refresh_top_customers: Merges the refreshed totals of selected customers into `top_customers`.
+- build_revenue_daily: Refills the `revenue_daily` table from `orders`.
+- refresh_revenue_daily: Re-aggregates the `revenue_daily` rows of a range of days.
+- read_csv_chunks: Streams a CSV file as renamed DataFrame chunks through its snapshot.
+- bulk_load: Writes DataFrame chunks to a table with batched multi-row inserts.
+- incremental_load: Appends new orders and upserts changed customers.
+- observe_chunks: Passes every chunk of a stream to a callback before yielding it.
 """
-from db.db_connector import get_db_connection # Database connection function
+from db.db_connector import get_db_connection, get_db_setting # Database connection function and settings
 import pandas as pd # Data manipulation library
 import streamlit as st # Streamlit library for displaying messages
+from sqlalchemy import bindparam, text, select, insert, delete, func, Date # SQL statements
+import time # Timing of the import for the rows/second report
+from db.schema import ( # Typed table and index definitions
+    recreate_tables, create_indexes, has_current_schema, orders, revenue_daily, customer_summary, top_customers,
+)
+from db.cache import bump_data_version, clear_cache # Invalidation of cached query results
+from db.instrumentation import instrumented, record_error # Call timings and failures for the debug panel
+from db.csv_snapshot import read_source_chunks # Typed Parquet snapshots of the CSV files
+from db.sketches import ( # Sample and sketches of the approximate mode
+    new_sketches, build_sketches, load_sketches, save_sketches,
+    update_order_sketches, update_customer_sketches, rebuild_customer_total_sketches,
+)
+
+# Source CSV files and the column renames applied to match the database schema
+CUSTOMERS_CSV = "data/customers.csv"
+ORDERS_CSV = "data/order.csv"
+CUSTOMER_COLUMNS = {'name': 'customer_name', 'email': 'customer_email'}
+ORDER_COLUMNS = {'id': 'order_id', 'created_at': 'order_date'}
+# Parsing options so the chunks match the typed schema (nullable integer customer ids, real dates).
+# Every column gets an explicit type, so no chunk's types depend on the values it happens to hold.
+CUSTOMER_DTYPES = {'customer_id': 'int64', 'name': 'str', 'email': 'str'}
+ORDER_DTYPES = {'id': 'int64', 'display_order_id': 'str', 'total_amount': 'float64', 'customer_id': 'Int64'}
+ORDER_DATE_COLUMNS = ['created_at']
+
+# Rows read from a CSV file per chunk (one transaction per chunk)
+CSV_CHUNK_SIZE = 50000
+# Rows sent in a single multi-row INSERT statement
+INSERT_BATCH_SIZE = 1000
+
+# Per-customer aggregates kept in the customer_summary rollup table (orders without a customer are left out)
+CUSTOMER_SUMMARY_QUERY = """
+    INSERT INTO customer_summary (customer_id, total_spent, order_count, first_order_date, last_order_date, updated_version)
+    SELECT customer_id, SUM(total_amount), COUNT(order_id), MIN(order_date), MAX(order_date), :version
+    FROM orders
+    WHERE customer_id IS NOT NULL {customer_filter}
+    GROUP BY customer_id
+"""
+
+# Tables that must exist before an incremental import can run
+LOADED_TABLES = ('customers', 'orders', 'customer_summary', 'customer_features', 'revenue_daily', 'top_customers')
+
+# Default number of customers kept in the top_customers table, overridable in secrets.toml
+DEFAULT_TOP_CUSTOMERS_MAX = 100
+
+# Number of customer ids bound into a single IN (...) list
+ID_BATCH_SIZE = 1000
+
+@instrumented
+def build_customer_summary(connection, version):
+    """
+    Rebuild the Customer Summary Rollup Table.
+
+    This function empties and refills the `customer_summary` table with the total
+    spent, order count and first/last order date of every customer, so the filter
+    queries do not have to aggregate the full `orders` table on each request.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+        version (int): Data version token of the import, stored in `updated_version`.
+    """
+    connection.execute(text("DELETE FROM customer_summary"))
+    connection.execute(text(CUSTOMER_SUMMARY_QUERY.format(customer_filter="")), {'version': version})
+
+@instrumented
+def refresh_customer_summary(connection, customer_ids, version):
+    """
+    Refresh the Rollup Rows of Selected Customers.
+
+    This function deletes and re-aggregates the `customer_summary` rows of the given
+    customers only, in batches of `ID_BATCH_SIZE` ids.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+        customer_ids (list): Ids of the customers whose orders changed.
+        version (int): Data version token of the import, stored in `updated_version`.
+    """
+    delete_query = text("DELETE FROM customer_summary WHERE customer_id IN :ids").bindparams(
+        bindparam('ids', expanding=True))
+    insert_query = text(CUSTOMER_SUMMARY_QUERY.format(customer_filter="AND customer_id IN :ids")).bindparams(
+        bindparam('ids', expanding=True))
+    
+    customer_ids = [int(customer_id) for customer_id in customer_ids if not pd.isna(customer_id)]
+    for start in range(0, len(customer_ids), ID_BATCH_SIZE):
+        batch = customer_ids[start:start + ID_BATCH_SIZE]
+        connection.execute(delete_query, {'ids': batch})
+        connection.execute(insert_query, {'ids': batch, 'version': version})
+
+# Orders of selected customers, the input of the feature computation
+CUSTOMER_ORDERS_QUERY = text(
+    "SELECT customer_id, total_amount, order_date FROM orders WHERE customer_id IN :ids"
+).bindparams(bindparam('ids', expanding=True))
+
+def compute_customer_features(order_frame, version):
+    """
+    Compute the Model Features of Customers from their Orders.
+
+    Parameters:
+        order_frame (DataFrame): Orders with `customer_id`, `total_amount` and `order_date`.
+        version (int): Data version token of the import, stored in `updated_version`.
+
+    Returns:
+        DataFrame: One row per customer with the columns of the `customer_features`
+        table. Gap statistics are in days and 0 for customers with a single order.
+    """
+    order_frame = order_frame.assign(total_amount=order_frame['total_amount'].astype(float),
+                                     order_date=pd.to_datetime(order_frame['order_date']))
+    order_frame = order_frame.sort_values(['customer_id', 'order_date'])
+    gap_days = order_frame.groupby('customer_id')['order_date'].diff().dt.total_seconds() / 86400
+    features = order_frame.assign(gap_days=gap_days, gap_square=gap_days ** 2).groupby('customer_id').agg(
+        total_revenue=('total_amount', 'sum'),
+        total_orders=('total_amount', 'size'),
+        first_order_date=('order_date', 'min'),
+        last_order_date=('order_date', 'max'),
+        mean_gap_days=('gap_days', 'mean'),
+        mean_gap_square=('gap_square', 'mean'),
+        max_gap_days=('gap_days', 'max'),
+    )
+    # Population standard deviation from the mean and mean square of the gaps
+    features['std_gap_days'] = (features['mean_gap_square'] - features['mean_gap_days'] ** 2).clip(lower=0) ** 0.5
+    features['avg_order_value'] = features['total_revenue'] / features['total_orders']
+    features[['mean_gap_days', 'std_gap_days', 'max_gap_days']] = features[
+        ['mean_gap_days', 'std_gap_days', 'max_gap_days']].fillna(0)
+    features['updated_version'] = version
+    return features.drop(columns='mean_gap_square').reset_index()
+
+@instrumented
+def refresh_customer_features(connection, customer_ids, version):
+    """
+    Recompute the Feature Rows of Selected Customers.
+
+    This function deletes the `customer_features` rows of the given customers and
+    recomputes them from their orders, in batches of `ID_BATCH_SIZE` ids.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+        customer_ids (list): Ids of the customers whose orders changed.
+        version (int): Data version token of the import, stored in `updated_version`.
+    """
+    delete_query = text("DELETE FROM customer_features WHERE customer_id IN :ids").bindparams(
+        bindparam('ids', expanding=True))
+    
+    customer_ids = [int(customer_id) for customer_id in customer_ids if not pd.isna(customer_id)]
+    for start in range(0, len(customer_ids), ID_BATCH_SIZE):
+        batch = customer_ids[start:start + ID_BATCH_SIZE]
+        connection.execute(delete_query, {'ids': batch})
+        order_frame = pd.read_sql(CUSTOMER_ORDERS_QUERY, con=connection, params={'ids': batch})
+        compute_customer_features(order_frame, version).to_sql(
+            name='customer_features', con=connection, if_exists='append', index=False,
+            method='multi', chunksize=INSERT_BATCH_SIZE)
+
+@instrumented
+def build_customer_features(connection, version):
+    """
+    Rebuild the Customer Features Table.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+        version (int): Data version token of the import, stored in `updated_version`.
+    """
+    connection.execute(text("DELETE FROM customer_features"))
+    customer_ids = connection.execute(text("SELECT customer_id FROM customer_summary ORDER BY customer_id")).scalars().all()
+    refresh_customer_features(connection, customer_ids, version)
+
+# Totals of the customers, highest spent first (ties by id), as stored in top_customers
+TOP_TOTALS_QUERY = (
+    select(customer_summary.c.customer_id, customer_summary.c.total_spent, customer_summary.c.order_count)
+    .order_by(customer_summary.c.total_spent.desc(), customer_summary.c.customer_id)
+)
+
+def get_top_customers_max():
+    """
+    Return the Number of Customers Kept in the Top Customers Table.
+
+    Returns:
+        int: The `top_customers_max` setting (default `DEFAULT_TOP_CUSTOMERS_MAX`).
+    """
+    return int(get_db_setting("top_customers_max", DEFAULT_TOP_CUSTOMERS_MAX))
+
+def _write_top_customers(connection, totals):
+    """
+    Replace the Rows of the Top Customers Table.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+        totals (DataFrame): `customer_id`, `total_spent` and `order_count`, highest spent first.
+    """
+    connection.execute(delete(top_customers))
+    if len(totals):
+        connection.execute(insert(top_customers), [
+            {'rank': rank, 'customer_id': int(row.customer_id), 'total_spent': row.total_spent,
+             'order_count': int(row.order_count)}
+            for rank, row in enumerate(totals.itertuples(index=False), start=1)
+        ])
+
+@instrumented
+def build_top_customers(connection):
+    """
+    Rebuild the Top Customers Table.
+
+    Reads the highest `top_customers_max` totals through the total spent index of
+    `customer_summary`.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+    """
+    top_max = get_top_customers_max()
+    _write_top_customers(connection, pd.read_sql(TOP_TOTALS_QUERY.limit(top_max), con=connection))
+
+@instrumented
+def refresh_top_customers(connection, customer_ids):
+    """
+    Merge the Refreshed Totals of Selected Customers into the Top Customers Table.
+
+    With orders only appended, the totals of the other customers are unchanged, so
+    the new top list is the best of the stored list and the refreshed customers.
+    The table is rebuilt instead if a listed customer's total went down (for
+    example after a refund), since a customer outside the list could then enter it.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction,
+            after `refresh_customer_summary`.
+        customer_ids (list): Ids of the customers whose orders changed.
+    """
+    top_max = get_top_customers_max()
+    stored = pd.read_sql(select(top_customers.c.customer_id, top_customers.c.total_spent, top_customers.c.order_count)
+                         .order_by(top_customers.c.rank), con=connection)
+    customer_ids = [int(customer_id) for customer_id in customer_ids if not pd.isna(customer_id)]
+    refreshed = pd.concat([stored.iloc[0:0]] + [
+        pd.read_sql(TOP_TOTALS_QUERY.where(customer_summary.c.customer_id.in_(customer_ids[start:start + ID_BATCH_SIZE])),
+                    con=connection)
+        for start in range(0, len(customer_ids), ID_BATCH_SIZE)
+    ], ignore_index=True)
+    
+    # A listed customer whose total dropped may be overtaken by an unlisted one
+    previous = stored.set_index('customer_id')['total_spent'].astype(float)
+    current = refreshed.set_index('customer_id')['total_spent'].astype(float)
+    common = previous.index.intersection(current.index)
+    if (current[common] < previous[common]).any():
+        return build_top_customers(connection)
+    
+    merged = pd.concat([stored[~stored['customer_id'].isin(current.index)], refreshed], ignore_index=True)
+    merged = merged.assign(sort_spent=merged['total_spent'].astype(float))
+    merged = merged.sort_values(['sort_spent', 'customer_id'], ascending=[False, True]).head(top_max)
+    _write_top_customers(connection, merged.drop(columns='sort_spent'))
+
+# Revenue and order count per order day kept in the revenue_daily rollup table
+ORDER_DAY = func.date(orders.c.order_date, type_=Date)
+REVENUE_DAILY_SELECT = (
+    select(ORDER_DAY, func.sum(orders.c.total_amount), func.count(orders.c.order_id))
+    .group_by(ORDER_DAY)
+)
+REVENUE_DAILY_COLUMNS = ['order_day', 'spent_amount', 'order_count']
+
+@instrumented
+def build_revenue_daily(connection):
+    """
+    Rebuild the Daily Revenue Rollup Table.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+    """
+    connection.execute(delete(revenue_daily))
+    connection.execute(insert(revenue_daily).from_select(REVENUE_DAILY_COLUMNS, REVENUE_DAILY_SELECT))
+
+@instrumented
+def refresh_revenue_daily(connection, first_day, last_day):
+    """
+    Re-aggregate the Daily Revenue Rows of a Range of Days.
+
+    The orders of the range are read through the order date index, so the cost
+    depends on the number of orders in the range rather than on the whole table.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+        first_day (Timestamp): Date of the first day to refresh.
+        last_day (Timestamp): Date of the last day to refresh.
+    """
+    first_day, last_day = pd.Timestamp(first_day).normalize(), pd.Timestamp(last_day).normalize()
+    connection.execute(delete(revenue_daily).where(
+        revenue_daily.c.order_day.between(first_day.date(), last_day.date())))
+    connection.execute(insert(revenue_daily).from_select(REVENUE_DAILY_COLUMNS, REVENUE_DAILY_SELECT.where(
+        orders.c.order_date >= first_day.to_pydatetime(),
+        orders.c.order_date < (last_day + pd.Timedelta(days=1)).to_pydatetime(),
+    )))
+
+def read_csv_chunks(path, columns, chunksize=CSV_CHUNK_SIZE, dtype=None, parse_dates=None):
+    """
+    Stream a CSV File in Chunks.
+
+    The chunks are read from the Parquet snapshot of the file, which is rebuilt
+    first if the CSV file changed since it was taken.
 
-# Establish a database connection using SQLAlchemy engine
-engine = get_db_connection()
+    Parameters:
+        path (str): Path of the CSV file.
+        columns (dict): Column renames applied to every chunk.
+        chunksize (int): Number of rows per chunk (default is `CSV_CHUNK_SIZE`).
+        dtype (dict): Optional column types passed to `pd.read_csv`.
+        parse_dates (list): Optional CSV columns parsed as datetimes.
+
+    Returns:
+        generator: DataFrame chunks with the database column names.
+    """
+    for chunk in read_source_chunks(path, chunksize, dtype=dtype, parse_dates=parse_dates):
+        yield chunk.rename(columns=columns)
+
+def observe_chunks(chunks, callback):
+    """
+    Pass Every Chunk of a Stream to a Callback Before Yielding it.
+
+    Parameters:
+        chunks (iterable): DataFrame chunks.
+        callback (callable): Called with every chunk.
+
+    Returns:
+        generator: The same chunks.
+    """
+    for chunk in chunks:
+        callback(chunk)
+        yield chunk
 
-def data_read_write():
+@instrumented
+def bulk_load(engine, chunks, table_name):
+    """
+    Write DataFrame Chunks to a Table with Batched Multi-row Inserts.
+
+    The chunks are appended to the existing table, each one committed in its own
+    transaction.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Database engine.
+        chunks (iterable): DataFrame chunks to write.
+        table_name (str): Name of the destination table.
+
+    Returns:
+        int: Number of rows written.
+    """
+    rows_written = 0
+    for chunk in chunks:
+        with engine.begin() as connection:
+            chunk.to_sql(name=table_name, con=connection, if_exists='append', index=False,
+                         method='multi', chunksize=INSERT_BATCH_SIZE)
+        rows_written += len(chunk)
+    return rows_written
+
+@instrumented
+def incremental_load(engine, customer_chunks, order_chunks, version):
+    """
+    Load Only New Orders and Changed Customers.
+
+    This function uses the largest stored `order_id` as a high-water mark: orders at
+    or below it are skipped, the rest are appended. Customers that are new are
+    inserted and customers whose name or email changed are replaced. The rollup is
+    then refreshed for the customers that received new orders, and the new rows are
+    added to the stored sketches. The whole load runs in one transaction, so a failure
+    leaves no orders above the high-water mark without their rollups and the next
+    incremental import starts over from the previous state.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Database engine.
+        customer_chunks (iterable): Customer DataFrame chunks read from the CSV file.
+        order_chunks (iterable): Order DataFrame chunks read from the CSV file.
+        version (int): Data version token of the import, stamped on the refreshed rollup rows.
+
+    Returns:
+        dict: Inserted, updated and skipped row counts for customers and orders.
+    """
+    counts = dict.fromkeys(['orders_inserted', 'orders_skipped', 'customers_inserted',
+                            'customers_updated', 'customers_skipped'], 0)
+    select_query = text(
+        "SELECT customer_id, customer_name, customer_email FROM customers WHERE customer_id IN :ids"
+    ).bindparams(bindparam('ids', expanding=True))
+    delete_query = text("DELETE FROM customers WHERE customer_id IN :ids").bindparams(
+        bindparam('ids', expanding=True))
+    
+    with engine.begin() as connection:
+        # Sketches of the previous imports, rebuilt from the tables at the end if there are none
+        sketch_set = load_sketches(connection)
+        
+        for chunk in customer_chunks:
+            # Compare incoming customers with the stored ones to find new and changed rows
+            chunk_ids = [int(customer_id) for customer_id in chunk['customer_id']]
+            stored_customers = pd.concat([
+                pd.read_sql(select_query, con=connection, params={'ids': chunk_ids[start:start + ID_BATCH_SIZE]})
+                for start in range(0, len(chunk_ids), ID_BATCH_SIZE)
+            ])
+            merged = chunk.merge(stored_customers, on='customer_id', how='left',
+                                 suffixes=('', '_stored'), indicator=True)
+            is_new = merged['_merge'] == 'left_only'
+            is_changed = ~is_new & (
+                (merged['customer_name'].fillna('') != merged['customer_name_stored'].fillna('')) |
+                (merged['customer_email'].fillna('') != merged['customer_email_stored'].fillna(''))
+            )
+            changed_ids = [int(customer_id) for customer_id in merged.loc[is_changed, 'customer_id']]
+            
+            # Upsert customers: remove the outdated rows, then append new and changed ones
+            for start in range(0, len(changed_ids), ID_BATCH_SIZE):
+                connection.execute(delete_query, {'ids': changed_ids[start:start + ID_BATCH_SIZE]})
+            chunk[(is_new | is_changed).to_numpy()].to_sql(
+                name='customers', con=connection, if_exists='append', index=False,
+                method='multi', chunksize=INSERT_BATCH_SIZE)
+            
+            if sketch_set is not None:
+                update_customer_sketches(sketch_set, chunk[is_new.to_numpy()])
+            counts['customers_inserted'] += int(is_new.sum())
+            counts['customers_updated'] += int(is_changed.sum())
+            counts['customers_skipped'] += int((~is_new & ~is_changed).sum())
+        
+        # High-water mark of the orders already loaded
+        last_order_id = connection.execute(text("SELECT MAX(order_id) FROM orders")).scalar() or 0
+        
+        # Append the new orders and remember which customers and days received them
+        affected_customers = set()
+        affected_days = []
+        for chunk in order_chunks:
+            new_orders = chunk[chunk['order_id'] > last_order_id]
+            new_orders.to_sql(name='orders', con=connection, if_exists='append', index=False,
+                              method='multi', chunksize=INSERT_BATCH_SIZE)
+            affected_customers.update(int(customer_id) for customer_id in new_orders['customer_id'].dropna().unique())
+            if sketch_set is not None:
+                update_order_sketches(sketch_set, new_orders)
+            if len(new_orders):
+                affected_days += [new_orders['order_date'].min(), new_orders['order_date'].max()]
+            counts['orders_inserted'] += len(new_orders)
+            counts['orders_skipped'] += len(chunk) - len(new_orders)
+        
+        # Refresh the rollups of the affected customers and days
+        refresh_customer_summary(connection, sorted(affected_customers), version)
+        refresh_customer_features(connection, sorted(affected_customers), version)
+        refresh_top_customers(connection, sorted(affected_customers))
+        if affected_days:
+            refresh_revenue_daily(connection, min(affected_days), max(affected_days))
+        if sketch_set is None:
+            sketch_set = build_sketches(connection)
+        else:
+            rebuild_customer_total_sketches(sketch_set, connection)
+        save_sketches(connection, sketch_set, version)
+    return counts
+
+@instrumented
+def data_read_write(incremental=False, customers_csv=CUSTOMERS_CSV, orders_csv=ORDERS_CSV):
     """
     Read Data from CSV and Write to MySQL Database.
 
     This function performs the following:
-    - Reads data from `customers.csv` and `orders.csv` files located in the `data/` directory.
+    - Streams data from `customers.csv` and `orders.csv` files located in the `data/` directory
+      in chunks of `CSV_CHUNK_SIZE` rows.
     - Renames columns to match MySQL database schema for consistent attribute naming.
-    - Imports the modified dataframes into MySQL tables (`customers` and `orders`).
-    - Provides success or error messages depending on the operation outcome.
+    - Imports the chunks into MySQL tables (`customers` and `orders`) with multi-row inserts.
+    - Rebuilds the `customer_summary`, `customer_features` and `revenue_daily` rollup tables
+      from the freshly loaded orders.
+    - Provides success or error messages, including the load rate in rows/second.
+
+    Parameters:
+        incremental (bool): Load only new orders and changed customers instead of
+            replacing both tables (default is False). Falls back to a full load
+            when the tables do not exist yet or were created by an older version.
+        customers_csv (str): Path of the customers CSV file (default is `CUSTOMERS_CSV`).
+        orders_csv (str): Path of the orders CSV file (default is `ORDERS_CSV`).
 
     Exceptions:
     - Returns an error message if data import fails due to database connection issues or other errors.
     """
     try:
-        # Load data from CSV files into pandas DataFrames
-        customer_data = pd.read_csv("data/customers.csv")
-        order_data = pd.read_csv("data/order.csv")
-        
-        # Rename columns for consistency with the MySQL database schema
-        customer_data.rename(columns={'name':'customer_name','email':'customer_email'}, inplace=True)
-        order_data.rename(columns={'id': 'order_id', 'created_at': 'order_date'}, inplace=True)
-
-        # import dataframe into mqsql database if connection exist success else error
+        # Get the shared database engine
+        engine = get_db_connection()
+        # import data into mqsql database if connection exist success else error
         if engine:
-            # Import data to MySQL using SQLAlchemy's to_sql method
-            customer_data.to_sql(name='customers', con=engine, if_exists='replace', index=customer_data.customer_id)
-            order_data.to_sql(name='orders', con=engine, if_exists='replace', index=order_data.order_id)
+            start_time = time.perf_counter()
+            version = time.time_ns() # Data version token of this import, also stamped on the changed rollup rows
+            
+            # Stream the CSV files with the database column names
+            customer_chunks = read_csv_chunks(customers_csv, CUSTOMER_COLUMNS, dtype=CUSTOMER_DTYPES)
+            order_chunks = read_csv_chunks(orders_csv, ORDER_COLUMNS, dtype=ORDER_DTYPES,
+                                           parse_dates=ORDER_DATE_COLUMNS)
+            
+            # Delta import when requested and the tables are already loaded
+            tables_loaded = has_current_schema(engine, LOADED_TABLES)
+            if incremental and tables_loaded:
+                counts = incremental_load(engine, customer_chunks, order_chunks, version)
+                with engine.begin() as connection:
+                    bump_data_version(connection, version)
+                rows_read = sum(counts.values())
+                elapsed = time.perf_counter() - start_time
+                return st.success(
+                    f"Incremental import done. Orders: {counts['orders_inserted']} inserted, "
+                    f"{counts['orders_skipped']} skipped. Customers: {counts['customers_inserted']} inserted, "
+                    f"{counts['customers_updated']} updated, {counts['customers_skipped']} skipped. "
+                    f"{rows_read} rows in {elapsed:.1f}s ({rows_read / elapsed:,.0f} rows/s).")
+            
+            # Recreate the typed tables, leaving the secondary indexes for after the load
+            with engine.begin() as connection:
+                recreate_tables(connection, LOADED_TABLES)
+            
+            # Import data to MySQL using batched multi-row inserts, feeding the sketches on the way
+            sketch_set = new_sketches()
+            rows_written = bulk_load(engine, observe_chunks(
+                customer_chunks, lambda chunk: update_customer_sketches(sketch_set, chunk)), 'customers')
+            rows_written += bulk_load(engine, observe_chunks(
+                order_chunks, lambda chunk: update_order_sketches(sketch_set, chunk)), 'orders')
+            
+            # Build the indexes and keep the per-customer rollup in step with the orders table
+            with engine.begin() as connection:
+                create_indexes(connection)
+                build_customer_summary(connection, version)
+                build_customer_features(connection, version)
+                build_top_customers(connection)
+                build_revenue_daily(connection)
+                rebuild_customer_total_sketches(sketch_set, connection)
+                save_sketches(connection, sketch_set, version)
+            with engine.begin() as connection:
+                bump_data_version(connection, version)
             
             # Display a success message in Streamlit
-            return st.success("Data imported successfully.")
+            elapsed = time.perf_counter() - start_time
+            return st.success(f"Data imported successfully. "
+                              f"{rows_written} rows in {elapsed:.1f}s ({rows_written / elapsed:,.0f} rows/s).")
         
         # Display an error message if the database connection is not established
         return st.error('Database connection error!.')
     
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
+        # A partial import may already have changed the tables, so drop the cached results
+        clear_cache()
         # Display a general error message if data import fails for any other reason
         return st.error(f"Something went wrong on data import!")
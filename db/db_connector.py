@@ -3,45 +3,146 @@ Database Connection Module for Streamlit Application
 
 This module establishes a connection to the MySQL database using SQLAlchemy.
 Database credentials are securely accessed from Streamlit's `secrets.toml`.
-The `get_db_connection` function attempts to connect and returns an SQLAlchemy 
+The `get_db_connection` function attempts to connect and returns an SQLAlchemy
 engine instance if successful. In case of a failure, it returns `None`.
 
+The `dialect` key selects the backend:
+- "mysql": MySQL server through mysql-connector (DB_HOST, DB_USER, DB_PASSWORD, DB_NAME).
+- "sqlite": Embedded SQLite file; DB_NAME is the file path.
+- "duckdb": Embedded DuckDB file; DB_NAME is the file path. Requires the optional
+  `duckdb` and `duckdb-engine` packages.
+The queries of the application are written with SQLAlchemy Core so they run
+unchanged on all three. A `DATABASE_URL` environment variable, when set, takes
+precedence over the secrets (used by `benchmark.py` and CI runs).
+
+A single engine is shared by every module and every session of the process: it is
+created lazily on the first call and cached as a Streamlit resource. Its connection
+pool is configured from optional keys of the `[delivergate_db]` secrets section:
+
+- pool_size: Connections kept open in the pool (default 5).
+- max_overflow: Extra connections allowed above `pool_size` under load (default 10).
+- pool_recycle: Seconds after which a connection is replaced, so it is never reused
+  after the server has dropped it (default 1800).
+- pool_pre_ping: Test each connection before use (default true).
+
 Functions:
-- get_db_connection: Establishes a database connection using SQLAlchemy.
+- get_db_setting: Reads an optional setting from the `[delivergate_db]` secrets section.
+- get_connection_string: Builds the SQLAlchemy URL for the configured backend.
+- get_db_connection: Returns the shared SQLAlchemy engine.
+- get_pool_status: Returns connection pool statistics for monitoring.
 """
 from sqlalchemy import create_engine  # SQLAlchemy for database connections
+import os # Environment variable overriding the configured database
 import streamlit as st # Streamlit to access secret environment variables
 
+# Default connection pool settings, overridable in secrets.toml
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 1800
+DEFAULT_POOL_PRE_PING = True
+
+# Backends stored in a local file instead of a database server
+EMBEDDED_DIALECTS = ("sqlite", "duckdb")
+
+def get_db_setting(name, default=None):
+    """
+    Read an Optional Database Setting.
+
+    Parameters:
+        name (str): Key in the `[delivergate_db]` section of `secrets.toml`.
+        default: Value returned when the key is not set.
+
+    Returns:
+        The configured value, or `default`.
+    """
+    try:
+        return st.secrets["delivergate_db"].get(name, default)
+    except Exception:
+        return default
+
+def get_connection_string(settings):
+    """
+    Build the SQLAlchemy Connection String for the Configured Backend.
+
+    Parameters:
+        settings (Mapping): The `[delivergate_db]` secrets section.
 
-# Function to connect to the MySQL database 
+    Returns:
+        str: SQLAlchemy database URL.
+    """
+    DIALECT = settings["dialect"]
+    DB_NAME = settings["DB_NAME"]
+
+    # Embedded backends only need the path of the database file
+    if DIALECT in EMBEDDED_DIALECTS:
+        return f"{DIALECT}:///{DB_NAME}"
+
+    # Retrieve database server credentials
+    DB_HOST = settings["DB_HOST"]
+    DB_USER = settings["DB_USER"]
+    DB_PASSWORD = settings["DB_PASSWORD"]
+    return f"{DIALECT}+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+
+@st.cache_resource(show_spinner=False)
+def _create_engine():
+    """
+    Create the Shared SQLAlchemy Engine.
+
+    Cached as a Streamlit resource so that the engine and its connection pool are
+    built once per process. Exceptions are not cached, so a failed attempt is
+    retried on the next call.
+
+    Returns:
+        engine (sqlalchemy.engine.Engine): Pooled database engine.
+    """
+    # Create connection string from the environment or the credentials in Streamlit's secrets
+    connection_string = os.environ.get("DATABASE_URL") or get_connection_string(st.secrets["delivergate_db"])
+
+    # Initialize SQLAlchemy engine with the connection string and pool settings
+    return create_engine(
+        connection_string,
+        pool_size=int(get_db_setting("pool_size", DEFAULT_POOL_SIZE)),
+        max_overflow=int(get_db_setting("max_overflow", DEFAULT_MAX_OVERFLOW)),
+        pool_recycle=int(get_db_setting("pool_recycle", DEFAULT_POOL_RECYCLE)),
+        pool_pre_ping=bool(get_db_setting("pool_pre_ping", DEFAULT_POOL_PRE_PING)),
+    )
+
+# Function to connect to the MySQL database
 def get_db_connection():
     """
-    Establish and return a MySQL database connection using SQLAlchemy.
+    Return the Shared Database Engine.
 
-    This function retrieves database credentials from Streamlit's `secrets.toml`,
-    creates a connection string, and initializes an SQLAlchemy engine to connect
-    to the MySQL database. If the connection is successful, the engine instance is
-    returned; otherwise, an error is caught, and `None` is returned.
+    This function returns the process-wide SQLAlchemy engine, creating it on the
+    first call from the settings in Streamlit's `secrets.toml`. If the engine
+    cannot be created, an error is displayed and `None` is returned.
 
     Returns:
         engine (sqlalchemy.engine.Engine): Database connection engine if successful.
         None: Returns `None` if the connection fails.
     """
     try:
-        # Retrieve database credentials securely from Streamlit's secrets
-        DB_HOST = st.secrets["delivergate_db"]["DB_HOST"]
-        DB_USER = st.secrets["delivergate_db"]["DB_USER"]
-        DB_PASSWORD = st.secrets["delivergate_db"]["DB_PASSWORD"]
-        DB_NAME = st.secrets["delivergate_db"]["DB_NAME"]
-        DIALECT = st.secrets["delivergate_db"]["dialect"]
-        
-        # Create connection string using provided credentials
-        connection_string = f"{DIALECT}+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
-        
-        # Initialize SQLAlchemy engine with the connection string
-        engine = create_engine(connection_string)
-        return engine # Return the engine instance if connection is successful
+        return _create_engine() # Return the shared engine instance
     except Exception as e:
         # Log the exception message in Streamlit and return None if connection fails
         st.error(f"Database connection failed: {e}")
         return None
+
+def get_pool_status():
+    """
+    Return Connection Pool Statistics.
+
+    Returns:
+        dict: Pool size, idle (checked in) and in-use (checked out) connections and
+        current overflow, or an empty dict if the engine is not available.
+    """
+    engine = get_db_connection()
+    if engine is None:
+        return {}
+    pool = engine.pool
+    return {
+        'pool_size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'status': pool.status(),
+    }
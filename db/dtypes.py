@@ -0,0 +1,168 @@
+"""
+Compact Data Types Module for Streamlit Application
+
+This module shrinks the DataFrames returned by the `db.filter` functions as they
+are fetched, before they are cached and copied into every session. `pd.read_sql`
+returns 64-bit numbers, Python `date` objects and one string object per value;
+the same results fit in a fraction of the memory with the following policy:
+- Integer columns (ids, counts, years and months) become int32 when their values fit.
+- Float columns (amounts) become float32 when every value converts without loss,
+  so the amounts shown and summed never change; other floats stay float64.
+- Columns of Python `date`/`datetime` objects become datetime64, and columns of
+  `Decimal` objects (MySQL `NUMERIC` columns) are converted to numbers first.
+- String columns become categorical when at most half of their values are
+  distinct (customer names repeated across orders), otherwise Arrow-backed
+  strings when the optional `pyarrow` package is installed (the default for
+  string columns from pandas 3 on).
+
+The size of every fetched result before compaction is kept per thread, so the
+instrumentation records it next to the compacted size of the same call. The policy
+can be switched off with `compact_dtypes = false` in the `[delivergate_db]`
+secrets section.
+
+Functions:
+- compact_frame: Applies the dtype policy to a DataFrame.
+- compact_result: Decorator compacting the DataFrames of a query function's result.
+- pop_raw_size: Returns the size before compaction of a function's last call on this thread.
+"""
+import functools # Decorator helpers
+import threading # Per-thread sizes before compaction
+import numpy as np # Integer and float limits
+import pandas as pd # DataFrames and dtypes
+from db.db_connector import get_db_setting # Compaction setting
+
+try:
+    import pyarrow as pa # Optional: Arrow-backed string columns
+except ImportError:
+    pa = None
+
+# Largest share of distinct values for a string column to become categorical
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Size before compaction of the last call of each compacted function, per thread
+_local = threading.local()
+
+def _frame_size(value):
+    """
+    Measure the In-Memory Size of the DataFrames in a Result.
+
+    Parameters:
+        value: Result of a query function.
+
+    Returns:
+        int: Deep memory usage of every DataFrame in `value` in bytes.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sum(_frame_size(item) for item in value.values())
+    if isinstance(value, tuple):
+        return sum(_frame_size(item) for item in value)
+    return 0
+
+def _compact_column(column):
+    """
+    Apply the Dtype Policy to One Column.
+
+    Parameters:
+        column (Series): Column of a fetched DataFrame.
+
+    Returns:
+        Series: The column with a compact dtype, or unchanged when none applies.
+    """
+    if pd.api.types.is_bool_dtype(column) or isinstance(column.dtype, pd.CategoricalDtype):
+        return column
+    if pd.api.types.is_integer_dtype(column):
+        limits = np.iinfo(np.int32)
+        if column.empty or (column.min() >= limits.min and column.max() <= limits.max):
+            return column.astype(np.int32)
+        return column
+    if pd.api.types.is_float_dtype(column):
+        compact = column.astype(np.float32)
+        if compact.astype(np.float64).equals(column.astype(np.float64)):
+            return compact
+        return column
+    if not (pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column)):
+        return column # datetime64, timedelta and extension columns are compact already
+    
+    # Object and string columns by the type of their values
+    inferred = pd.api.types.infer_dtype(column, skipna=True)
+    if inferred in ('decimal', 'integer', 'floating', 'mixed-integer-float'):
+        return _compact_column(pd.to_numeric(column))
+    if inferred in ('date', 'datetime'):
+        return pd.to_datetime(column)
+    if inferred == 'string':
+        if column.nunique() <= len(column) * CATEGORY_MAX_UNIQUE_RATIO:
+            return column.astype('category')
+        if pa is not None and pd.api.types.is_object_dtype(column):
+            return column.astype(pd.StringDtype('pyarrow')) # pandas 3 string columns are Arrow-backed already
+    return column
+
+def compact_frame(frame):
+    """
+    Apply the Dtype Policy to a DataFrame.
+
+    Parameters:
+        frame (DataFrame): Fetched DataFrame.
+
+    Returns:
+        DataFrame: A DataFrame with the same values in compact column types.
+    """
+    return pd.DataFrame({name: _compact_column(column) for name, column in frame.items()}, index=frame.index)
+
+def _compact(value):
+    """
+    Compact the DataFrames of a Query Function's Result.
+
+    Parameters:
+        value: Result of a query function.
+
+    Returns:
+        `value` with every DataFrame compacted; tuples and dicts keep their type.
+    """
+    if isinstance(value, pd.DataFrame):
+        return compact_frame(value)
+    if isinstance(value, dict):
+        return {key: _compact(item) for key, item in value.items()}
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return value # Named tuples such as estimates hold scalars only
+    if isinstance(value, tuple):
+        return tuple(_compact(item) for item in value)
+    return value
+
+def compact_result(function):
+    """
+    Compact the DataFrames Returned by a Query Function.
+
+    Apply it below `cached_query`, so the cache keeps the compacted result and
+    cache hits need no compaction.
+
+    Parameters:
+        function (callable): Query function returning DataFrames.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        result = function(*args, **kwargs)
+        if not get_db_setting("compact_dtypes", True):
+            return result
+        if not hasattr(_local, 'sizes'):
+            _local.sizes = {}
+        _local.sizes[function.__qualname__] = _frame_size(result)
+        return _compact(result)
+    return wrapper
+
+def pop_raw_size(name):
+    """
+    Return and Forget the Size Before Compaction of a Function's Last Call on This Thread.
+
+    Parameters:
+        name (str): Qualified name of the compacted function.
+
+    Returns:
+        int: Size in bytes of the DataFrames before compaction, or None when the
+        result was not compacted (cache hit, compaction switched off or not compacted).
+    """
+    return getattr(_local, 'sizes', {}).pop(name, None)
@@ -6,59 +6,341 @@ for the Streamlit application. It includes functions to:
 1. Get maximum filter amounts for user-defined thresholds.
 2. Filter orders and customers based on date range, total spent, and order count.
 3. Retrieve top customers by revenue.
-4. Get total revenue and order count over time.
+4. Get total revenue and order count over time from the `revenue_daily` rollup table.
 5. Summarize total revenue, unique customers, and order counts.
+6. Fetch everything the dashboard needs in one database round trip.
+7. Page through the filtered orders with keyset pagination.
+8. Read the per-customer model features of the `customer_features` table.
+
+Per-customer totals are read from the `customer_summary` rollup table maintained
+by `db.data_import`, rather than grouping the whole `orders` table per query.
+Results are cached per data version with `db.cache.cached_query`, so repeated
+reruns with the same filters are served without querying the database.
+
+The queries are SQLAlchemy Core statements built once at import time with bound
+parameters for the filter values. The SQL text therefore does not change with
+the slider values, SQLAlchemy compiles each statement once and reuses it from the
+engine's compiled cache, and user input is never pasted into the SQL.
+
+Every function is wrapped with `db.instrumentation.instrumented`, which records
+its wall time, result size and cache status for the debug panel.
+
+The returned DataFrames are compacted with `db.dtypes.compact_result` before they
+are cached (int32 ids and counts, float32 amounts where lossless, datetime64 dates
+and categorical names), and the instrumentation records their size before and after.
+
+`get_max_filter_amount` and `get_total_summery` take an `approximate` flag that
+answers from the sample and sketches maintained at import (see `db.sketches`)
+instead of scanning the tables; they fall back to the exact queries while no
+sketches are stored.
+
+When `analytics_backend = "memory"` is configured, every function is answered by
+the in-memory column store of `db.memory_engine` instead, with identical results.
 
 Functions:
 - get_max_filter_amount: Retrieves maximum spent amount and order count for filtering.
 - filter_data_by_sidebar: Filters orders based on user-defined criteria.
 - filter_customer_by_amount: Filters customers based on spending and order count.
-- top_customer_by_revenue: Retrieves the top customers by total revenue.
-- get_total_over_time: Fetches revenue data grouped by year and month.
+- top_customer_by_revenue: Retrieves the top customers by total revenue, optionally within a date range.
+- bucket_revenue: Groups daily revenue rows into days, weeks, months or years.
+- get_total_over_time: Fetches revenue data per day, week, month or year from the daily rollup.
 - get_total_summery: Returns summary metrics for total revenue, customers, and orders.
+- get_dashboard_snapshot: Returns slider bounds, summary metrics, top customers and the
+  monthly revenue series from a single query.
+- resolve_date_range: Applies the default start and end dates to a date range input.
+- filter_orders_page: Returns one page of filtered orders after a (order_date, order_id) cursor.
+- count_filtered_orders: Counts the orders matching the sidebar filters.
+- get_feature_reference_date: Returns the latest order date, the reference for recency.
+- add_recency_days: Adds the days since each customer's last order to a feature DataFrame.
+- get_customer_features: Returns the model features of every customer with orders.
+- read_sketches: Returns the stored sketches of the approximate mode.
+- get_spend_quantiles: Estimates quantiles of the customer totals and order amounts from the sketches.
 """
 
 # import neccessory libraries
 from db.db_connector import get_db_connection # Import database connection function
 import pandas as pd # Data manipulation library
 import streamlit as st # Streamlit for UI interaction
-from datetime import date # Date handling
+from datetime import date, timedelta # Date handling
+from db.cache import cached_query # Versioned result cache shared by all sessions
+from db.dtypes import compact_result # Compact column types of the fetched DataFrames
+from sqlalchemy import select, func, bindparam, extract, literal, null, union_all, and_, or_, Date # SQL expression language
+from db.schema import customers, orders, customer_summary, customer_features, revenue_daily, top_customers # Table definitions
+from db.data_import import get_top_customers_max # Size of the top_customers table
+from db.memory_engine import get_memory_engine # Optional in-memory analytics backend
+from db.instrumentation import instrumented, record_error # Call timings and failures for the debug panel
+from db.sketches import Estimate, load_sketches # Sample and sketches of the approximate mode
+
+# Model features of the customers with orders, with their names for display
+CUSTOMER_FEATURES_QUERY = (
+    select(
+        customers.c.customer_id,
+        customers.c.customer_name,
+        *[column for column in customer_features.c if column.name not in ('customer_id', 'updated_version')],
+    )
+    .select_from(customers.join(customer_features, customers.c.customer_id == customer_features.c.customer_id))
+    .where(customer_features.c.total_revenue > 0)
+)
+
+# Latest order date, the reference point of the recency feature
+FEATURE_REFERENCE_DATE_QUERY = select(func.max(customer_features.c.last_order_date).label('reference_date'))
+
+# Default start of the order date filter
+DEFAULT_START_DATE = date(2024, 1, 1)
+
+# Date ranges include their end day: timestamps are compared with the start of the following day
+ONE_DAY = timedelta(days=1)
+
+# Quantiles of the spend distributions reported in approximate mode
+SPEND_QUANTILES = (0.5, 0.9, 0.99)
+
+# Maximum spent amount and order count per customer
+MAX_FILTER_AMOUNT_QUERY = select(
+    func.coalesce(func.max(customer_summary.c.total_spent), 0).label('max_amount'), # 0 before any orders
+    func.coalesce(func.max(customer_summary.c.order_count), 0).label('max_count'),
+)
+
+# Customers whose total spent and order count are above the filter thresholds
+FILTERED_CUSTOMER_IDS = select(customer_summary.c.customer_id).where(
+    customer_summary.c.total_spent > bindparam('min_amount'),
+    customer_summary.c.order_count > bindparam('min_orders'),
+)
+
+# Orders joined with customers, filtered by date range and customer thresholds
+ORDERS_WITH_CUSTOMERS = orders.outerjoin(customers, orders.c.customer_id == customers.c.customer_id)
+FILTER_ORDERS_CONDITIONS = (
+    orders.c.order_date >= bindparam('start_date'),
+    orders.c.order_date < bindparam('end_before'),
+    customers.c.customer_id.in_(FILTERED_CUSTOMER_IDS),
+)
+FILTER_ORDERS_QUERY = (
+    select(
+        orders.c.order_id,
+        orders.c.total_amount,
+        func.date(orders.c.order_date, type_=Date).label('order_date'),
+        orders.c.customer_id,
+        customers.c.customer_name,
+    )
+    .select_from(ORDERS_WITH_CUSTOMERS)
+    .where(*FILTER_ORDERS_CONDITIONS)
+)
+
+# Pages of the filtered orders in (order_date, order_id) order, served by ix_orders_order_date.
+# The full timestamp is selected as well to build the cursor of the next page.
+ORDERS_FIRST_PAGE_QUERY = (
+    FILTER_ORDERS_QUERY
+    .add_columns(orders.c.order_date.label('order_timestamp'))
+    .order_by(orders.c.order_date, orders.c.order_id)
+    .limit(bindparam('page_size'))
+)
+ORDERS_NEXT_PAGE_QUERY = ORDERS_FIRST_PAGE_QUERY.where(or_(
+    orders.c.order_date > bindparam('after_date'),
+    and_(orders.c.order_date == bindparam('after_date'), orders.c.order_id > bindparam('after_id')),
+))
+
+# Number of filtered orders, without fetching them
+COUNT_ORDERS_QUERY = select(func.count(orders.c.order_id).label('order_count')).select_from(
+    ORDERS_WITH_CUSTOMERS).where(*FILTER_ORDERS_CONDITIONS)
+
+# Customers with their rollup totals, filtered by spending and order count
+FILTER_CUSTOMERS_QUERY = (
+    select(
+        customers.c.customer_id,
+        customers.c.customer_name,
+        customer_summary.c.total_spent,
+        customer_summary.c.order_count.label('number_of_orders'),
+        customers.c.customer_email,
+    )
+    .select_from(customers.join(customer_summary, customers.c.customer_id == customer_summary.c.customer_id))
+    .where(
+        customer_summary.c.total_spent > bindparam('min_amount'),
+        customer_summary.c.order_count > bindparam('min_orders'),
+    )
+)
+
+# Top customers by total spent, joined with their names
+TOP_CUSTOMERS = (
+    select(
+        customer_summary.c.customer_id,
+        customer_summary.c.total_spent.label('spent_amount'),
+        customer_summary.c.order_count,
+    )
+    .order_by(customer_summary.c.total_spent.desc())
+    .limit(bindparam('top_number'))
+    .subquery('sum_tab')
+)
+TOP_CUSTOMERS_QUERY = (
+    select(TOP_CUSTOMERS.c.customer_id, customers.c.customer_name, TOP_CUSTOMERS.c.spent_amount, TOP_CUSTOMERS.c.order_count)
+    .select_from(TOP_CUSTOMERS.outerjoin(customers, TOP_CUSTOMERS.c.customer_id == customers.c.customer_id))
+    .order_by(TOP_CUSTOMERS.c.spent_amount.desc())
+)
+
+# Top customers read from the top_customers table maintained at import, in rank order
+LISTED_TOP_CUSTOMERS = (
+    select(
+        top_customers.c.rank,
+        top_customers.c.customer_id,
+        top_customers.c.total_spent.label('spent_amount'),
+        top_customers.c.order_count,
+    )
+    .where(top_customers.c.rank <= bindparam('top_number'))
+    .subquery('top_tab')
+)
+LISTED_TOP_CUSTOMERS_QUERY = (
+    select(LISTED_TOP_CUSTOMERS.c.customer_id, customers.c.customer_name,
+           LISTED_TOP_CUSTOMERS.c.spent_amount, LISTED_TOP_CUSTOMERS.c.order_count)
+    .select_from(LISTED_TOP_CUSTOMERS.outerjoin(customers, LISTED_TOP_CUSTOMERS.c.customer_id == customers.c.customer_id))
+    .order_by(LISTED_TOP_CUSTOMERS.c.rank)
+)
+
+# Top customers by the revenue of their orders within a date range, read through the order date index
+RANGE_TOP_CUSTOMERS = (
+    select(
+        orders.c.customer_id,
+        func.sum(orders.c.total_amount).label('spent_amount'),
+        func.count(orders.c.order_id).label('order_count'),
+    )
+    .where(orders.c.order_date >= bindparam('start_date'), orders.c.order_date < bindparam('end_before'),
+           orders.c.customer_id.is_not(None))
+    .group_by(orders.c.customer_id)
+    .order_by(func.sum(orders.c.total_amount).desc())
+    .limit(bindparam('top_number'))
+    .subquery('range_tab')
+)
+RANGE_TOP_CUSTOMERS_QUERY = (
+    select(RANGE_TOP_CUSTOMERS.c.customer_id, customers.c.customer_name,
+           RANGE_TOP_CUSTOMERS.c.spent_amount, RANGE_TOP_CUSTOMERS.c.order_count)
+    .select_from(RANGE_TOP_CUSTOMERS.outerjoin(customers, RANGE_TOP_CUSTOMERS.c.customer_id == customers.c.customer_id))
+    .order_by(RANGE_TOP_CUSTOMERS.c.spent_amount.desc())
+)
 
-# Establish a database connection using SQLAlchemy engine
-engine = get_db_connection()
+# Revenue and order count per day from the revenue_daily rollup, over all days or a date range
+REVENUE_DAILY_QUERY = (
+    select(revenue_daily.c.order_day, revenue_daily.c.spent_amount, revenue_daily.c.order_count)
+    .order_by(revenue_daily.c.order_day)
+)
+REVENUE_DAILY_RANGE_QUERY = REVENUE_DAILY_QUERY.where(
+    revenue_daily.c.order_day >= bindparam('start_date', type_=Date),
+    revenue_daily.c.order_day < bindparam('end_before', type_=Date))
 
-def get_max_filter_amount():
+# Revenue series granularities and the pandas period each one buckets the days into
+GRANULARITY_PERIODS = {'day': 'D', 'week': 'W', 'month': 'M', 'year': 'Y'}
+
+# Monthly revenue of the dashboard snapshot, derived from the daily rollup
+ROLLUP_YEAR = extract('year', revenue_daily.c.order_day)
+ROLLUP_MONTH = extract('month', revenue_daily.c.order_day)
+
+# Number of unique customers, and total order count and revenue
+CUSTOMER_COUNT_QUERY = select(func.count(func.distinct(customers.c.customer_id)).label('customer_count'))
+ORDER_SUMMARY_QUERY = select(
+    func.count(orders.c.order_id).label('order_count'),
+    func.coalesce(func.sum(orders.c.total_amount), 0).label('total_spent'), # 0 before any orders
+)
+
+# Dashboard snapshot: one UNION ALL query whose rows are tagged with the section they belong to.
+# Columns: section, key_a (customer id / year), key_b (month), label (customer name), amount, count
+DASHBOARD_SNAPSHOT_QUERY = union_all(
+    select(
+        literal('bounds').label('section'), null().label('key_a'), null().label('key_b'), null().label('label'),
+        func.coalesce(func.max(customer_summary.c.total_spent), 0).label('amount'),
+        func.coalesce(func.max(customer_summary.c.order_count), 0).label('count'),
+    ),
+    select(
+        literal('summary'), CUSTOMER_COUNT_QUERY.scalar_subquery(), null(), null(),
+        func.coalesce(func.sum(orders.c.total_amount), 0), func.count(orders.c.order_id),
+    ),
+    select(
+        literal('top'), LISTED_TOP_CUSTOMERS.c.customer_id, null(), customers.c.customer_name,
+        LISTED_TOP_CUSTOMERS.c.spent_amount, LISTED_TOP_CUSTOMERS.c.order_count,
+    ).select_from(LISTED_TOP_CUSTOMERS.outerjoin(customers, LISTED_TOP_CUSTOMERS.c.customer_id == customers.c.customer_id)),
+    select(
+        literal('monthly'), ROLLUP_YEAR, ROLLUP_MONTH, null(),
+        func.sum(revenue_daily.c.spent_amount), func.sum(revenue_daily.c.order_count),
+    ).group_by(ROLLUP_YEAR, ROLLUP_MONTH),
+)
+
+def resolve_date_range(date_range):
+    """
+    Apply the Default Start and End Dates to a Date Range Input.
+
+    Parameters:
+        date_range (tuple): Start and end dates from the sidebar, or an empty value.
+
+    Returns:
+        tuple: Start and end dates, defaulting to `DEFAULT_START_DATE` and today.
+    """
+    # Set default start and end dates
+    start_date = DEFAULT_START_DATE
+    end_date = date.today()
+    # Update start and end dates if a date range is provided
+    if date_range:
+        start_date, end_date = date_range
+    return start_date, end_date
+
+def read_sketches():
+    """
+    Return the Stored Sketches of the Approximate Mode.
+
+    Returns:
+        dict: Sketch name mapped to its sketch, or None when no sketches are stored
+        or the database is not available.
+    """
+    engine = get_db_connection()
+    if engine:
+        with engine.connect() as connection:
+            return load_sketches(connection)
+    return None
+
+@instrumented
+@cached_query
+@compact_result
+def get_max_filter_amount(approximate=False):
     """
     Retrieve Maximum Filter Amounts.
 
     This function retrieves the maximum spent amount and order count 
     from the database for setting user-defined filters.
 
+    Parameters:
+        approximate (bool): Read the maxima kept by the per-customer sketches instead of
+            querying `customer_summary` (default is False). The sketches track their
+            maximum exactly, so the result only differs from the exact one if the
+            sketches are older than the tables.
+
     Returns:
         tuple: Maximum amount and maximum order count.
     Raises:
         Exception: If there is an error during database interaction.
     """
     try:
+        # Answer from the sketches when requested and available
+        sketch_set = read_sketches() if approximate else None
+        if sketch_set is not None and sketch_set['customer_spent'].count:
+            return int(sketch_set['customer_spent'].maximum), int(sketch_set['customer_orders'].maximum)
+        
+        # Answer from the in-memory engine when it is enabled
+        analytics = get_memory_engine()
+        if analytics is not None:
+            return analytics.get_max_filter_amount()
+        
+        # Get the shared database engine
+        engine = get_db_connection()
         # Check if the database engine is available
         if engine:
             # Query for maximum spent amount and order count per customer
-            query = """
-                SELECT MAX(spent_amount) max_amount, MAX(order_count) max_count
-                FROM (SELECT SUM(total_amount) spent_amount, COUNT(order_id) order_count
-                    FROM orders
-                    GROUP BY customer_id) sum_table;
-            """
-            # Execute the SQL query and store the result in a DataFrame
-            max_df = pd.read_sql(query, con=engine)
+            max_df = pd.read_sql(MAX_FILTER_AMOUNT_QUERY, con=engine)
             
             # Return the maximum spent amount and order count as integers
-            return int(max_df['max_amount']), int(max_df['max_count'])
+            return int(max_df['max_amount'].iloc[0]), int(max_df['max_count'].iloc[0])
         return st.error("Database connection error!") # Handle database connection error
     
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.error("something went wrong on filtering!") # Handle general errors
 
+@instrumented
+@cached_query
+@compact_result
 def filter_data_by_sidebar(date_range, min_amount=0, min_orders=0):
     """
     Filter Orders Based on User-defined Criteria.
@@ -77,34 +359,31 @@ def filter_data_by_sidebar(date_range, min_amount=0, min_orders=0):
         Exception: If there is an error during database interaction.
     """
     try:
+        # Apply the default start and end dates
+        start_date, end_date = resolve_date_range(date_range)
+        
+        # Answer from the in-memory engine when it is enabled
+        analytics = get_memory_engine()
+        if analytics is not None:
+            return analytics.filter_orders(start_date, end_date, min_amount, min_orders)
+        
+        # Get the shared database engine
+        engine = get_db_connection()
         # Check if the database engine is available
         if engine:
-            # Set default start and end dates
-            start_date = '2024-01-01'
-            end_date = date.today()
-            # Update start and end dates if a date range is provided
-            if date_range:
-                start_date, end_date = date_range
-                
-            # SQL query to filter orders based on the defined criteria
-            filter_query = f""" 
-                SELECT o.order_id, o.total_amount, DATE(o.order_date) order_date, o.customer_id, c.customer_name
-                FROM orders o
-                LEFT JOIN customers c
-                ON o.customer_id=c.customer_id
-                WHERE   (o.order_date BETWEEN '{start_date}' AND '{end_date}') AND
-                        (c.customer_id IN ( SELECT customer_id
-                                            FROM orders
-                                            GROUP BY customer_id
-                                            HAVING SUM(total_amount) > {min_amount} AND COUNT(order_id) > {min_orders}));
-            """
-            # Execute the SQL query and return the results as a DataFrame
-            orders_df = pd.read_sql(filter_query, con=engine)
+            # Execute the filter query with the sidebar values bound as parameters
+            params = {'start_date': start_date, 'end_before': end_date + ONE_DAY,
+                      'min_amount': min_amount, 'min_orders': min_orders}
+            orders_df = pd.read_sql(FILTER_ORDERS_QUERY, con=engine, params=params)
             return orders_df # Return the filtered DataFrame
         return st.error("Database connection error!") # Handle database connection error
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.warning("something went wrong on filtering!") # Handle general errors
 
+@instrumented
+@cached_query
+@compact_result
 def filter_customer_by_amount(min_amount= 0, min_orders = 0):
     """
     Filter Customers Based on Spending and Order Count.
@@ -122,33 +401,40 @@ def filter_customer_by_amount(min_amount= 0, min_orders = 0):
         Exception: If there is an error during database interaction.
     """
     try:
+        # Answer from the in-memory engine when it is enabled
+        analytics = get_memory_engine()
+        if analytics is not None:
+            return analytics.filter_customer_by_amount(min_amount, min_orders)
+        
+        # Get the shared database engine
+        engine = get_db_connection()
         # Check if the database engine is available
         if engine:
-            # SQL query to filter customers based on spending and order count
-            filter_query = f"""
-                SELECT c.customer_id, c.customer_name, sum_tab.total_spent,sum_tab.number_of_orders, c.customer_email 
-                FROM customers c
-                JOIN    (SELECT customer_id, SUM(total_amount) total_spent, COUNT(order_id) number_of_orders
-                        FROM orders
-                        GROUP BY customer_id
-                        HAVING SUM(total_amount) > {min_amount} AND count(order_id) > {min_orders}) sum_tab
-                ON c.customer_id = sum_tab.customer_id
-            """
-            # Execute the SQL query and return the results as a DataFrame
-            customers_df = pd.read_sql(filter_query, con=engine)
+            # Execute the filter query with the thresholds bound as parameters
+            params = {'min_amount': min_amount, 'min_orders': min_orders}
+            customers_df = pd.read_sql(FILTER_CUSTOMERS_QUERY, con=engine, params=params)
             return customers_df # Return the filtered DataFrame
         return st.error("Database connection error!") # Handle database connection error
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.warning("something went wrong on filtering!") # Handle general errors
 
-def top_customer_by_revenue(top_number=10):
+@instrumented
+@cached_query
+@compact_result
+def top_customer_by_revenue(top_number=10, date_range=None):
     """
     Retrieve Top Customers by Revenue.
 
     This function retrieves the top customers based on their total revenue from orders.
+    Up to `top_customers_max` customers are read from the ranked `top_customers`
+    table maintained at import, so only `top_number` rows are touched; larger
+    numbers fall back to the total spent index of `customer_summary`. With a date
+    range, the revenue of the orders within the range is aggregated instead.
 
     Parameters:
         top_number (int): The number of top customers to retrieve (default is 10).
+        date_range (tuple): Start and end dates of the orders to rank by, or None for all orders.
 
     Returns:
         DataFrame: A DataFrame containing top customers by revenue.
@@ -156,87 +442,424 @@ def top_customer_by_revenue(top_number=10):
         Exception: If there is an error during database interaction.
     """
     try:
+        # Answer from the in-memory engine when it is enabled
+        analytics = get_memory_engine()
+        if analytics is not None:
+            if date_range:
+                return analytics.top_customer_by_revenue(top_number, *resolve_date_range(date_range))
+            return analytics.top_customer_by_revenue(top_number)
+        
+        # Get the shared database engine
+        engine = get_db_connection()
         # Check if the database engine is available
         if engine:
-            # SQL query to retrieve top customers based on total revenue
-            filter_query = f"""
-                SELECT c.customer_id, c.customer_name, sum_tab.spent_amount, sum_tab.order_count
-                FROM customers c
-                RIGHT JOIN (SELECT customer_id, SUM(total_amount) spent_amount, COUNT(order_id) order_count
-                            FROM orders
-                            GROUP BY customer_id
-                            ORDER BY spent_amount DESC
-                            LIMIT {int(top_number)}) sum_tab
-                ON c.customer_id=sum_tab.customer_id;
-            """
-            # Execute the SQL query and return the results as a DataFrame
-            customers_df = pd.read_sql(filter_query, con=engine)
+            # Execute the top customers query with the limit bound as a parameter
+            params = {'top_number': int(top_number)}
+            if date_range:
+                start_date, end_date = resolve_date_range(date_range)
+                params.update(start_date=start_date, end_before=end_date + ONE_DAY)
+                customers_df = pd.read_sql(RANGE_TOP_CUSTOMERS_QUERY, con=engine, params=params)
+            elif top_number <= get_top_customers_max():
+                customers_df = pd.read_sql(LISTED_TOP_CUSTOMERS_QUERY, con=engine, params=params)
+            else:
+                customers_df = pd.read_sql(TOP_CUSTOMERS_QUERY, con=engine, params=params)
             return customers_df # Return the top customers DataFrame
         return st.error("Database connection error!") # Handle database connection error
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.warning("something went wrong on filtering!") # Handle general errors
 
-def get_total_over_time():
+def bucket_revenue(daily_df, granularity='month'):
+    """
+    Group Daily Revenue Rows into Periods.
+
+    Parameters:
+        daily_df (DataFrame): Rows with `order_day`, `spent_amount` and `order_count`.
+        granularity (str): "day", "week" (starting on Monday), "month" or "year".
+
+    Returns:
+        DataFrame: One row per period in date order with `period_start` (date),
+        `order_year`, `order_month` (of the period start), `spent_amount` and `order_count`.
     """
-    Get Revenue Data Grouped by Year and Month.
+    order_day = pd.to_datetime(daily_df['order_day'])
+    period_start = order_day.dt.to_period(GRANULARITY_PERIODS[granularity]).dt.start_time
+    revenue_df = (daily_df.assign(period_start=period_start, spent_amount=daily_df['spent_amount'].astype(float))
+                  .groupby('period_start', as_index=False)
+                  .agg(spent_amount=('spent_amount', 'sum'), order_count=('order_count', 'sum')))
+    revenue_df.insert(1, 'order_year', revenue_df['period_start'].dt.year.astype('int64'))
+    revenue_df.insert(2, 'order_month', revenue_df['period_start'].dt.month.astype('int64'))
+    revenue_df['order_count'] = revenue_df['order_count'].astype('int64')
+    revenue_df['period_start'] = revenue_df['period_start'].dt.date
+    return revenue_df
+
+@instrumented
+@cached_query
+@compact_result
+def get_total_over_time(granularity='month', date_range=None):
+    """
+    Get Revenue Data Grouped by Day, Week, Month or Year.
+
+    This function reads the pre-aggregated daily rows of the `revenue_daily` rollup
+    table and groups them into periods, instead of grouping the whole `orders` table.
 
-    This function fetches total revenue data grouped by year and month.
+    Parameters:
+        granularity (str): "day", "week", "month" (default) or "year".
+        date_range (tuple): Start and end dates of the series, or None for all days.
 
     Returns:
-        DataFrame: A DataFrame containing revenue data over time.
+        DataFrame: A DataFrame containing revenue data over time, with the columns
+        of `bucket_revenue`.
     Raises:
         Exception: If there is an error during database interaction.
     """
     try:
+        # Reject granularities the series cannot be grouped by
+        if granularity not in GRANULARITY_PERIODS:
+            return st.warning(f"Unsupported granularity: {granularity}")
+        start_date, end_date = date_range if date_range else (None, None)
+        
+        # Answer from the in-memory engine when it is enabled
+        analytics = get_memory_engine()
+        if analytics is not None:
+            return bucket_revenue(analytics.get_revenue_daily(start_date, end_date), granularity)
+        
+        # Get the shared database engine
+        engine = get_db_connection()
         # Check if the database engine is available
         if engine:
-            # SQL query to get revenue data grouped by year and month
-            filter_query = f"""
-                SELECT YEAR(order_date) order_year, MONTH(order_date) order_month, SUM(total_amount) spent_amount, COUNT(order_id) order_count
-                FROM orders
-                GROUP BY YEAR(order_date), MONTH(order_date)
-                ORDER BY YEAR(order_date), MONTH(order_date)
-            """
-            # Execute the SQL query and return the results as a DataFrame
-            revenue_df = pd.read_sql(filter_query, con=engine)
-            return revenue_df # Return the revenue data DataFrame
+            # Read the daily rollup rows of the requested days
+            if date_range:
+                daily_df = pd.read_sql(REVENUE_DAILY_RANGE_QUERY, con=engine,
+                                       params={'start_date': start_date, 'end_before': end_date + ONE_DAY})
+            else:
+                daily_df = pd.read_sql(REVENUE_DAILY_QUERY, con=engine)
+            return bucket_revenue(daily_df, granularity) # Return the revenue data DataFrame
         return st.error("Database connection error!") # Handle database connection error
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.warning("something went wrong on filtering!") # Handle general error
 
-def get_total_summery():
+@instrumented
+@cached_query
+@compact_result
+def get_total_summery(approximate=False):
     """
     Get Summary Metrics for Total Revenue, Customers, and Orders.
 
     This function retrieves summary metrics for total revenue, unique customers, 
     and order counts.
 
+    Parameters:
+        approximate (bool): Read the metrics from the sketches instead of scanning
+            the tables (default is False): the exact revenue and order count kept by
+            the running total, and customers from the HyperLogLog counter.
+
     Returns:
-        tuple: Total revenue, total customers, and total orders.
+        tuple: Total revenue, total customers, and total orders; in approximate mode
+        each one is an `Estimate(value, low, high)` with its 95% interval.
     Raises:
         Exception: If there is an error during database interaction.
     """
     try:
+        # Answer from the sketches when requested and available
+        sketch_set = read_sketches() if approximate else None
+        if sketch_set is not None:
+            order_count = sketch_set['order_total'].count
+            return (sketch_set['order_total'].estimate(), sketch_set['customer_ids'].estimate(),
+                    Estimate(order_count, order_count, order_count))
+        
+        # Answer from the in-memory engine when it is enabled
+        analytics = get_memory_engine()
+        if analytics is not None:
+            return analytics.get_total_summery()
+        
+        # Get the shared database engine
+        engine = get_db_connection()
         # Check if the database engine is available
         if engine:
-            # SQL query to count unique customers
-            customer_query = "SELECT COUNT(DISTINCT(customer_id)) customer_count FROM customers;"
-            # SQL query to get total order count and total revenue
-            order_query = "SELECT COUNT(order_id) order_count, SUM(total_amount) total_spent FROM orders;"
-            
             # Execute the customer query and store the result in a DataFrame
-            customer_summery = pd.read_sql(customer_query, con=engine)
+            customer_summery = pd.read_sql(CUSTOMER_COUNT_QUERY, con=engine)
             # Execute the order query and store the result in a DataFrame
-            order_summery = pd.read_sql(order_query, con=engine)
+            order_summery = pd.read_sql(ORDER_SUMMARY_QUERY, con=engine)
             
             # Retrieve the total count of customers, total revenue, and order count
-            total_customers = int(customer_summery['customer_count'])
-            total_revenue = float(order_summery['total_spent'])
-            total_orders = int(order_summery['order_count'])
+            total_customers = int(customer_summery['customer_count'].iloc[0])
+            total_revenue = float(order_summery['total_spent'].iloc[0])
+            total_orders = int(order_summery['order_count'].iloc[0])
             
             # Return a tuple containing the summary metrics
             return total_revenue, total_customers, total_orders
         
         return st.error("Database connection error!")
-    except Exception:
-        return st.warning("something went wrong on filtering!")
\ No newline at end of file
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
+        return st.warning("something went wrong on filtering!")
+
+@instrumented
+@cached_query
+@compact_result
+def get_dashboard_snapshot(top_number=10):
+    """
+    Get Everything the Dashboard Displays in One Query.
+
+    This function fetches the slider bounds, the summary metrics, the top customers
+    by revenue (from the `top_customers` table) and the monthly revenue series with a
+    single UNION ALL query, and
+    splits the tagged rows into the same values the individual filter functions return.
+
+    Parameters:
+        top_number (int): The number of top customers to retrieve (default is 10).
+
+    Returns:
+        dict: `max_amount` and `max_count` (slider bounds), `summary` (total revenue,
+        total customers, total orders), `top_customers` (DataFrame) and
+        `total_over_time` (DataFrame).
+    Raises:
+        Exception: If there is an error during database interaction.
+    """
+    try:
+        # Answer from the in-memory engine when it is enabled
+        analytics = get_memory_engine()
+        if analytics is not None:
+            return analytics.get_dashboard_snapshot(top_number)
+        
+        # Get the shared database engine
+        engine = get_db_connection()
+        # Check if the database engine is available
+        if engine:
+            # Execute the combined query in a single round trip
+            snapshot_df = pd.read_sql(DASHBOARD_SNAPSHOT_QUERY, con=engine, params={'top_number': int(top_number)})
+            sections = dict(tuple(snapshot_df.groupby('section')))
+            bounds = sections['bounds'].iloc[0]
+            summary = sections['summary'].iloc[0]
+            
+            # Top customers ordered by revenue, with the column names of top_customer_by_revenue
+            top_customers = (sections.get('top', snapshot_df.iloc[0:0])
+                             .rename(columns={'key_a': 'customer_id', 'label': 'customer_name',
+                                              'amount': 'spent_amount', 'count': 'order_count'})
+                             .sort_values('spent_amount', ascending=False)
+                             [['customer_id', 'customer_name', 'spent_amount', 'order_count']]
+                             .astype({'customer_id': 'int64', 'order_count': 'int64'})
+                             .reset_index(drop=True))
+            if top_number > get_top_customers_max(): # Beyond the top_customers table
+                top_customers = top_customer_by_revenue(top_number)
+            
+            # Monthly revenue in date order from the daily rollup, with the column names of get_total_over_time
+            total_over_time = (sections.get('monthly', snapshot_df.iloc[0:0])
+                               .rename(columns={'key_a': 'order_year', 'key_b': 'order_month',
+                                                'amount': 'spent_amount', 'count': 'order_count'})
+                               [['order_year', 'order_month', 'spent_amount', 'order_count']]
+                               .astype({'order_year': 'int64', 'order_month': 'int64', 'order_count': 'int64'})
+                               .sort_values(['order_year', 'order_month'])
+                               .reset_index(drop=True))
+            total_over_time.insert(0, 'period_start', pd.to_datetime(
+                total_over_time[['order_year', 'order_month']].rename(columns={'order_year': 'year', 'order_month': 'month'})
+                .assign(day=1)).dt.date)
+            
+            return {
+                'max_amount': int(bounds['amount']),
+                'max_count': int(bounds['count']),
+                'summary': (float(summary['amount']), int(summary['key_a']), int(summary['count'])),
+                'top_customers': top_customers,
+                'total_over_time': total_over_time,
+            }
+        return st.error("Database connection error!") # Handle database connection error
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
+        return st.warning("something went wrong on filtering!") # Handle general errors
+
+@instrumented
+@cached_query
+@compact_result
+def filter_orders_page(date_range, min_amount=0, min_orders=0, page_size=100, after=None):
+    """
+    Get One Page of Filtered Orders.
+
+    This function returns the orders matching the sidebar filters in (order_date,
+    order_id) order, starting right after the `after` cursor. Seeking from the
+    cursor through the order date index keeps every page equally cheap, unlike an
+    OFFSET that has to skip all earlier rows.
+
+    Parameters:
+        date_range (tuple): A tuple containing the start and end dates for filtering.
+        min_amount (float): The minimum amount spent by customers for filtering (default is 0).
+        min_orders (int): The minimum number of orders placed by customers for filtering (default is 0).
+        page_size (int): The number of orders per page (default is 100).
+        after (tuple): `(order_date, order_id)` of the last order of the previous page,
+            or None for the first page.
+
+    Returns:
+        tuple: DataFrame with the columns of `filter_data_by_sidebar`, and the cursor
+        of the next page (None on the last page).
+    Raises:
+        Exception: If there is an error during database interaction.
+    """
+    try:
+        # Apply the default start and end dates
+        start_date, end_date = resolve_date_range(date_range)
+        
+        # Answer from the in-memory engine when it is enabled
+        analytics = get_memory_engine()
+        if analytics is not None:
+            return analytics.filter_orders_page(start_date, end_date, min_amount, min_orders, page_size, after)
+        
+        # Get the shared database engine
+        engine = get_db_connection()
+        # Check if the database engine is available
+        if engine:
+            # Fetch one extra row to know whether a next page exists
+            params = {'start_date': start_date, 'end_before': end_date + ONE_DAY, 'min_amount': min_amount,
+                      'min_orders': min_orders, 'page_size': int(page_size) + 1}
+            if after is None:
+                page_df = pd.read_sql(ORDERS_FIRST_PAGE_QUERY, con=engine, params=params)
+            else:
+                params.update(after_date=after[0], after_id=int(after[1]))
+                page_df = pd.read_sql(ORDERS_NEXT_PAGE_QUERY, con=engine, params=params)
+            
+            # Cursor of the next page: the last order shown on this page
+            next_cursor = None
+            if len(page_df) > page_size:
+                page_df = page_df.iloc[:int(page_size)]
+                last_order = page_df.iloc[-1]
+                next_cursor = (pd.Timestamp(last_order['order_timestamp']).to_pydatetime(), int(last_order['order_id']))
+            return page_df.drop(columns=['order_timestamp']), next_cursor
+        return st.error("Database connection error!") # Handle database connection error
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
+        return st.warning("something went wrong on filtering!") # Handle general errors
+
+@instrumented
+@cached_query
+@compact_result
+def count_filtered_orders(date_range, min_amount=0, min_orders=0):
+    """
+    Count the Orders Matching the Sidebar Filters.
+
+    Parameters:
+        date_range (tuple): A tuple containing the start and end dates for filtering.
+        min_amount (float): The minimum amount spent by customers for filtering (default is 0).
+        min_orders (int): The minimum number of orders placed by customers for filtering (default is 0).
+
+    Returns:
+        int: Number of matching orders.
+    Raises:
+        Exception: If there is an error during database interaction.
+    """
+    try:
+        # Apply the default start and end dates
+        start_date, end_date = resolve_date_range(date_range)
+        
+        # Answer from the in-memory engine when it is enabled
+        analytics = get_memory_engine()
+        if analytics is not None:
+            return analytics.count_filtered_orders(start_date, end_date, min_amount, min_orders)
+        
+        # Get the shared database engine
+        engine = get_db_connection()
+        # Check if the database engine is available
+        if engine:
+            # Count the matching orders without fetching them
+            params = {'start_date': start_date, 'end_before': end_date + ONE_DAY,
+                      'min_amount': min_amount, 'min_orders': min_orders}
+            count_df = pd.read_sql(COUNT_ORDERS_QUERY, con=engine, params=params)
+            return int(count_df['order_count'].iloc[0])
+        return st.error("Database connection error!") # Handle database connection error
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
+        return st.warning("something went wrong on filtering!") # Handle general errors
+
+@instrumented
+def get_feature_reference_date():
+    """
+    Return the Latest Order Date of the Imported Data.
+
+    Recency is measured from this date rather than from today, so it only changes
+    with an import and the model sees the same values it was trained on.
+
+    Returns:
+        Timestamp: Latest order date of any customer, or None without data (no
+        import yet, or no orders).
+    """
+    engine = get_db_connection()
+    if engine:
+        try:
+            reference_df = pd.read_sql(FEATURE_REFERENCE_DATE_QUERY, con=engine, parse_dates=['reference_date'])
+        except Exception as e:
+            record_error(e) # Keep the failure visible in the metrics
+            return None # The tables do not exist before the first import
+        reference_date = reference_df['reference_date'].iloc[0]
+        return None if pd.isna(reference_date) else reference_date
+    return None
+
+def add_recency_days(feature_df, reference_date):
+    """
+    Add the Days Since Each Customer's Last Order.
+
+    Parameters:
+        feature_df (DataFrame): Features with a `last_order_date` column.
+        reference_date (Timestamp): Date recency is measured from.
+
+    Returns:
+        DataFrame: The features with a `recency_days` column (NaN without a last order).
+    """
+    last_order_date = pd.to_datetime(feature_df['last_order_date'])
+    return feature_df.assign(recency_days=(reference_date - last_order_date).dt.total_seconds() / 86400)
+
+@instrumented
+@cached_query
+@compact_result
+def get_customer_features():
+    """
+    Retrieve the Model Features of Every Customer with Orders.
+
+    Returns:
+        DataFrame: Customer id and name, `total_revenue`, `total_orders`,
+        `avg_order_value`, first/last order date, gap statistics in days and
+        `recency_days`.
+    Raises:
+        Exception: If there is an error during database interaction.
+    """
+    try:
+        # Get the shared database engine
+        engine = get_db_connection()
+        # Check if the database engine is available
+        if engine:
+            feature_df = pd.read_sql(CUSTOMER_FEATURES_QUERY, con=engine,
+                                     parse_dates=['first_order_date', 'last_order_date'])
+            feature_df['total_revenue'] = feature_df['total_revenue'].astype(float)
+            return add_recency_days(feature_df, get_feature_reference_date())
+        return st.error("Database connection error!") # Handle database connection error
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
+        return st.warning("something went wrong on reading the customer features!") # Handle general errors
+
+@instrumented
+@cached_query
+@compact_result
+def get_spend_quantiles(quantiles=SPEND_QUANTILES):
+    """
+    Estimate Spend Quantiles from the Sketches.
+
+    Parameters:
+        quantiles (tuple): Quantiles between 0 and 1 (default is `SPEND_QUANTILES`).
+
+    Returns:
+        DataFrame: One row per quantile with the estimated `total_spent` and
+        `order_count` per customer and `order_amount` per order, each within the
+        relative accuracy of the sketches, or an empty DataFrame without sketches.
+    Raises:
+        Exception: If there is an error during database interaction.
+    """
+    try:
+        sketch_set = read_sketches()
+        if sketch_set is None:
+            return pd.DataFrame(columns=['quantile', 'total_spent', 'order_count', 'order_amount'])
+        rows = []
+        for quantile in quantiles:
+            estimates = [sketch_set[name].quantile(quantile)
+                         for name in ('customer_spent', 'customer_orders', 'order_amounts')]
+            rows.append([quantile] + [estimate.value if estimate else None for estimate in estimates])
+        return pd.DataFrame(rows, columns=['quantile', 'total_spent', 'order_count', 'order_amount'])
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
+        return st.warning("something went wrong on reading the sketches!") # Handle general errors
@@ -0,0 +1,211 @@
+"""
+Instrumentation Module for Streamlit Application
+
+This module records how long the database calls and page functions take. Every
+function wrapped with `instrumented` produces one record per call with:
+- name: Module and function name.
+- wall_ms: Wall time of the call in milliseconds.
+- rows: Rows in the returned DataFrames (1 for scalar results, 0 for none).
+- bytes: In-memory size of the returned data.
+- raw_bytes: Size of the returned DataFrames before `db.dtypes.compact_result`
+  compacted them, or None when nothing was fetched (cache hits) or compacted.
+- cache: "hit" or "miss" for functions cached with `db.cache.cached_query`, else None.
+- status: "ok", or "error" when the call raised or reported an exception with
+  `record_error` before returning its Streamlit error message.
+
+The most recent records are kept in memory for the optional debug panel shown in
+the sidebar when `debug_panel = true` is set in the `[delivergate_db]` secrets
+section. When `metrics_log` is set to a file path, every record is also appended
+to that file as one JSON line.
+
+Functions:
+- instrumented: Decorator recording the timing of a function call.
+- record_error: Marks the current call as failed and keeps the exception message.
+- get_metrics: Returns the recorded calls.
+- get_metrics_summary: Returns per-function call counts, latency percentiles and totals.
+- clear_metrics: Removes every recorded call.
+- debug_panel: Displays the metrics, connection pool and cache status in the sidebar.
+"""
+from collections import deque # Bounded buffer of recent records
+import functools # Decorator helpers
+import json # JSON lines metrics log
+import sys # Size of scalar results
+import threading # Per-thread call state and buffer lock
+import time # Wall clock timings
+import pandas as pd # Result sizes and the summary table
+import streamlit as st # Debug panel
+from db.db_connector import get_db_setting, get_pool_status # Settings and pool statistics
+from db.cache import get_cache_stats, pop_cache_status # Cache counters and per-call cache status
+from db.dtypes import pop_raw_size # Per-call size before compaction
+
+# Number of recent calls kept in memory
+METRICS_BUFFER_SIZE = 1000
+
+# Recent records, oldest first
+_records = deque(maxlen=METRICS_BUFFER_SIZE)
+_lock = threading.Lock()
+
+# Errors recorded by the calls currently running on this thread
+_local = threading.local()
+
+def _result_size(value):
+    """
+    Measure the Rows and Bytes of a Function Result.
+
+    Parameters:
+        value: Result of an instrumented function.
+
+    Returns:
+        tuple: Number of rows and size in bytes.
+    """
+    if isinstance(value, pd.DataFrame):
+        return len(value), int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (dict, tuple, list)):
+        items = value.values() if isinstance(value, dict) else value
+        sizes = [_result_size(item) for item in items]
+        frame_rows = sum(rows for (rows, _), item in zip(sizes, items) if isinstance(item, pd.DataFrame))
+        has_frames = any(isinstance(item, pd.DataFrame) for item in items)
+        return (frame_rows if has_frames else 1), sum(size for _, size in sizes)
+    if isinstance(value, (int, float, str)):
+        return 1, sys.getsizeof(value)
+    return 0, 0 # None or a Streamlit element
+
+def record_error(exception):
+    """
+    Mark the Current Instrumented Call as Failed.
+
+    Called from the `except` blocks that turn an exception into a Streamlit error
+    message, so the failure is still visible in the metrics.
+
+    Parameters:
+        exception (Exception): The exception that was handled.
+    """
+    errors = getattr(_local, 'errors', None)
+    if errors:
+        errors[-1] = f"{type(exception).__name__}: {exception}"
+
+def _store(record):
+    """
+    Keep a Record in Memory and Append it to the Metrics Log.
+
+    Parameters:
+        record (dict): Record of one call.
+    """
+    log_path = get_db_setting("metrics_log", None)
+    with _lock:
+        _records.append(record)
+        if log_path:
+            try:
+                with open(log_path, 'a') as log_file:
+                    log_file.write(json.dumps(record) + "\n")
+            except OSError:
+                pass # The log is best effort and never breaks the page
+
+def instrumented(function):
+    """
+    Record the Timing of Every Call of a Function.
+
+    Apply it above `cached_query`, so cache hits are recorded as well.
+
+    Parameters:
+        function (callable): Database call or page function.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    name = f"{function.__module__}.{function.__qualname__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not hasattr(_local, 'errors'):
+            _local.errors = []
+        _local.errors.append(None)
+        start_time = time.perf_counter()
+        result = None
+        try:
+            result = function(*args, **kwargs)
+            return result
+        except Exception as e:
+            record_error(e)
+            raise
+        finally:
+            wall_ms = (time.perf_counter() - start_time) * 1000
+            error = _local.errors.pop()
+            rows, size = _result_size(result)
+            _store({
+                'time': time.time(),
+                'name': name,
+                'wall_ms': round(wall_ms, 3),
+                'rows': rows,
+                'bytes': size,
+                'raw_bytes': pop_raw_size(function.__qualname__),
+                'cache': pop_cache_status(function.__qualname__),
+                'status': 'error' if error else 'ok',
+                'error': error,
+            })
+    return wrapper
+
+def get_metrics():
+    """
+    Return the Recorded Calls.
+
+    Returns:
+        list: Records of the most recent calls, oldest first.
+    """
+    with _lock:
+        return list(_records)
+
+def get_metrics_summary():
+    """
+    Summarize the Recorded Calls per Function.
+
+    Returns:
+        DataFrame: Calls, mean/p95/max wall time, mean rows and bytes, mean bytes
+        before compaction of the fetched results, cache hits and errors per
+        function, slowest mean first.
+    """
+    metrics = pd.DataFrame(get_metrics())
+    if metrics.empty:
+        return metrics
+    metrics['raw_bytes'] = pd.to_numeric(metrics['raw_bytes']) # None for cache hits
+    summary = metrics.groupby('name').agg(
+        calls=('wall_ms', 'size'),
+        mean_ms=('wall_ms', 'mean'),
+        p95_ms=('wall_ms', lambda wall: wall.quantile(0.95)),
+        max_ms=('wall_ms', 'max'),
+        mean_rows=('rows', 'mean'),
+        mean_bytes=('bytes', 'mean'),
+        mean_raw_bytes=('raw_bytes', 'mean'),
+        cache_hits=('cache', lambda cache: int((cache == 'hit').sum())),
+        errors=('status', lambda status: int((status == 'error').sum())),
+    )
+    return summary.sort_values('mean_ms', ascending=False).round(3)
+
+def clear_metrics():
+    """
+    Remove Every Recorded Call.
+    """
+    with _lock:
+        _records.clear()
+
+def debug_panel():
+    """
+    Display the Debug Panel in the Sidebar.
+
+    Shows the per-function summary, the most recent failures, the connection pool
+    status and the query cache counters. Nothing is displayed unless
+    `debug_panel = true` is set in the `[delivergate_db]` secrets section.
+    """
+    if not get_db_setting("debug_panel", False):
+        return
+    with st.sidebar.expander("Debug: query timings"):
+        st.dataframe(get_metrics_summary())
+        errors = [record for record in get_metrics() if record['status'] == 'error']
+        if errors:
+            st.write("Recent errors")
+            st.dataframe(pd.DataFrame(errors[-10:])[['name', 'error']])
+        st.write("Connection pool")
+        st.json(get_pool_status())
+        st.write("Query cache")
+        st.json(get_cache_stats())
+        st.button("Reset timings", on_click=clear_metrics)
@@ -0,0 +1,374 @@
+"""
+In-Memory Analytics Module for Streamlit Application
+
+This module provides an optional analytics engine that loads the `customers` and
+`orders` tables once into typed NumPy columns and answers the `db.filter` queries
+with vectorized group-bys and boolean masks instead of SQL. Joins use precomputed
+index arrays from each order to its customer and to its per-customer aggregates.
+The database stays the system of record: the columns are reloaded whenever the
+data version token (see `db.cache`) changes.
+
+The engine is enabled by setting `analytics_backend = "memory"` in the
+`[delivergate_db]` secrets section; the default (`"database"`) sends every query
+to the database. If loading fails, the filter functions fall back to SQL.
+
+Classes:
+- InMemoryAnalytics: Column store answering the dashboard queries.
+
+Functions:
+- get_memory_engine: Returns the loaded engine for the current data version, or None.
+"""
+import numpy as np # Vectorized column operations
+import pandas as pd # DataFrames returned to the pages
+import streamlit as st # Resource cache holding the loaded columns
+from sqlalchemy import select # SQL expression language
+from db.db_connector import get_db_connection, get_db_setting # Shared engine and settings
+from db.cache import get_data_version # Data version token of the latest import
+from db.schema import customers, orders # Table definitions
+
+def _positions(sorted_ids, ids):
+    """
+    Find the Position of Each Id in a Sorted Id Array.
+
+    Parameters:
+        sorted_ids (ndarray): Sorted, unique ids.
+        ids (ndarray): Ids to look up.
+
+    Returns:
+        ndarray: Position of every id in `sorted_ids`, or -1 where it is absent.
+    """
+    if len(sorted_ids) == 0:
+        return np.full(len(ids), -1, dtype=np.int64)
+    positions = np.clip(np.searchsorted(sorted_ids, ids), 0, len(sorted_ids) - 1)
+    return np.where(sorted_ids[positions] == ids, positions, -1)
+
+class InMemoryAnalytics():
+    """
+    Column Store Answering the Dashboard Queries.
+
+    The orders are held as parallel arrays (id, amount, date, customer id), the
+    customers as arrays sorted by id, and the per-customer totals as arrays over
+    the distinct customer ids found in the orders, matching `customer_summary`.
+    """
+
+    def __init__(self, engine, data_version):
+        """
+        Load Both Tables into Typed Columns.
+
+        Parameters:
+            engine (sqlalchemy.engine.Engine): Database engine to load from.
+            data_version (int): Data version token the columns belong to.
+        """
+        self.data_version = data_version
+
+        # Customers sorted by id
+        customer_df = pd.read_sql(
+            select(customers.c.customer_id, customers.c.customer_name, customers.c.customer_email)
+            .order_by(customers.c.customer_id), con=engine)
+        self.customer_ids = customer_df['customer_id'].to_numpy(np.int64)
+        self.customer_names = customer_df['customer_name'].to_numpy(object)
+        self.customer_emails = customer_df['customer_email'].to_numpy(object)
+
+        # Orders sorted by id
+        order_df = pd.read_sql(
+            select(orders.c.order_id, orders.c.total_amount, orders.c.order_date, orders.c.customer_id)
+            .order_by(orders.c.order_id), con=engine)
+        self.order_ids = order_df['order_id'].to_numpy(np.int64)
+        self.order_amounts = order_df['total_amount'].to_numpy(np.float64)
+        self.order_dates = pd.to_datetime(order_df['order_date']).to_numpy('datetime64[ns]')
+        has_customer = order_df['customer_id'].notna().to_numpy()
+        self.order_customer_ids = order_df['customer_id'].fillna(-1).to_numpy(np.int64)
+
+        # Per-customer totals over the orders that have a customer, as in customer_summary
+        self.summary_ids, inverse = np.unique(self.order_customer_ids[has_customer], return_inverse=True)
+        self.summary_spent = np.bincount(inverse, weights=self.order_amounts[has_customer],
+                                         minlength=len(self.summary_ids))
+        self.summary_count = np.bincount(inverse, minlength=len(self.summary_ids)).astype(np.int64)
+
+        # Join index arrays: order -> per-customer totals, order -> customer, totals -> customer
+        self.order_summary_pos = np.full(len(self.order_ids), -1, dtype=np.int64)
+        self.order_summary_pos[has_customer] = inverse
+        self.order_customer_pos = _positions(self.customer_ids, self.order_customer_ids)
+        self.summary_customer_pos = _positions(self.customer_ids, self.summary_ids)
+
+    def _customer_column(self, column, positions):
+        """
+        Gather a Customer Column Through a Join Index Array.
+
+        Parameters:
+            column (ndarray): Customer column (names or emails).
+            positions (ndarray): Customer positions, -1 where there is no customer.
+
+        Returns:
+            ndarray: Gathered values, None where there is no customer.
+        """
+        values = column[np.clip(positions, 0, None)] if len(column) else np.full(len(positions), None, dtype=object)
+        return np.where(positions >= 0, values, None)
+
+    def _qualifying_customers(self, min_amount, min_orders):
+        """
+        Mask the Per-customer Totals Above the Filter Thresholds.
+
+        Returns:
+            ndarray: Boolean mask over the per-customer totals.
+        """
+        return (self.summary_spent > min_amount) & (self.summary_count > min_orders)
+
+    def get_max_filter_amount(self):
+        """
+        Return the Maximum Spent Amount and Order Count per Customer.
+
+        Returns:
+            tuple: Maximum amount and maximum order count, 0 and 0 before any orders.
+        """
+        if not self.summary_spent.size:
+            return 0, 0
+        return int(self.summary_spent.max()), int(self.summary_count.max())
+
+    def filter_orders(self, start_date, end_date, min_amount=0, min_orders=0):
+        """
+        Filter Orders by Date Range and Customer Thresholds.
+
+        Parameters:
+            start_date (date): Start of the order date range.
+            end_date (date): End of the order date range.
+            min_amount (float): The minimum amount spent by the customer.
+            min_orders (int): The minimum number of orders placed by the customer.
+
+        Returns:
+            DataFrame: Filtered orders with the columns of `filter_data_by_sidebar`.
+        """
+        return self._orders_frame(self._filtered_order_mask(start_date, end_date, min_amount, min_orders))
+
+    def _date_range_mask(self, start_date, end_date):
+        """
+        Mask the Orders Placed from the Start Day up to the End of the End Day.
+
+        Returns:
+            ndarray: Boolean mask over the orders.
+        """
+        end_before = np.datetime64(end_date, 'D') + np.timedelta64(1, 'D') # Same bound as the SQL queries
+        return (self.order_dates >= np.datetime64(start_date, 'ns')) & (self.order_dates < end_before)
+
+    def _filtered_order_mask(self, start_date, end_date, min_amount, min_orders):
+        """
+        Mask the Orders Matching the Sidebar Filters.
+
+        Returns:
+            ndarray: Boolean mask over the orders.
+        """
+        qualifies = self._qualifying_customers(min_amount, min_orders)
+        return (self._date_range_mask(start_date, end_date) &
+                (self.order_customer_pos >= 0) &
+                (self.order_summary_pos >= 0) &
+                qualifies[self.order_summary_pos])
+
+    def _orders_frame(self, selected):
+        """
+        Build the Filtered Orders DataFrame for Selected Order Positions.
+
+        Parameters:
+            selected (ndarray): Boolean mask or positions of the orders to return.
+
+        Returns:
+            DataFrame: Orders with the columns of `filter_data_by_sidebar`.
+        """
+        return pd.DataFrame({
+            'order_id': self.order_ids[selected],
+            'total_amount': self.order_amounts[selected],
+            'order_date': pd.Series(self.order_dates[selected]).dt.date.to_numpy(object),
+            'customer_id': self.order_customer_ids[selected],
+            'customer_name': self.customer_names[self.order_customer_pos[selected]],
+        })
+
+    def filter_orders_page(self, start_date, end_date, min_amount=0, min_orders=0, page_size=100, after=None):
+        """
+        Return One Page of Filtered Orders After a Cursor.
+
+        Parameters:
+            start_date (date): Start of the order date range.
+            end_date (date): End of the order date range.
+            min_amount (float): The minimum amount spent by the customer.
+            min_orders (int): The minimum number of orders placed by the customer.
+            page_size (int): The number of orders per page.
+            after (tuple): `(order_date, order_id)` of the last order of the previous page, or None.
+
+        Returns:
+            tuple: Page DataFrame and the cursor of the next page (None on the last page).
+        """
+        mask = self._filtered_order_mask(start_date, end_date, min_amount, min_orders)
+        if after is not None:
+            after_date = np.datetime64(after[0], 'ns')
+            mask &= (self.order_dates > after_date) | ((self.order_dates == after_date) & (self.order_ids > after[1]))
+        positions = np.flatnonzero(mask)
+        positions = positions[np.lexsort((self.order_ids[positions], self.order_dates[positions]))][:int(page_size) + 1]
+
+        next_cursor = None
+        if len(positions) > page_size:
+            positions = positions[:int(page_size)]
+            last = positions[-1]
+            next_cursor = (pd.Timestamp(self.order_dates[last]).to_pydatetime(), int(self.order_ids[last]))
+        return self._orders_frame(positions), next_cursor
+
+    def count_filtered_orders(self, start_date, end_date, min_amount=0, min_orders=0):
+        """
+        Count the Orders Matching the Sidebar Filters.
+
+        Returns:
+            int: Number of matching orders.
+        """
+        return int(self._filtered_order_mask(start_date, end_date, min_amount, min_orders).sum())
+
+    def filter_customer_by_amount(self, min_amount=0, min_orders=0):
+        """
+        Filter Customers by Spending and Order Count.
+
+        Parameters:
+            min_amount (float): The minimum amount spent by the customer.
+            min_orders (int): The minimum number of orders placed by the customer.
+
+        Returns:
+            DataFrame: Filtered customers with the columns of `filter_customer_by_amount`.
+        """
+        mask = self._qualifying_customers(min_amount, min_orders) & (self.summary_customer_pos >= 0)
+        positions = self.summary_customer_pos[mask]
+        return pd.DataFrame({
+            'customer_id': self.summary_ids[mask],
+            'customer_name': self.customer_names[positions],
+            'total_spent': self.summary_spent[mask],
+            'number_of_orders': self.summary_count[mask],
+            'customer_email': self.customer_emails[positions],
+        })
+
+    def top_customer_by_revenue(self, top_number=10, start_date=None, end_date=None):
+        """
+        Return the Top Customers by Revenue.
+
+        Parameters:
+            top_number (int): The number of top customers to retrieve.
+            start_date (date): Start of the order date range, or None for all orders.
+            end_date (date): End of the order date range, or None for all orders.
+
+        Returns:
+            DataFrame: Top customers with the columns of `top_customer_by_revenue`.
+        """
+        if start_date is None:
+            summary_ids, summary_spent, summary_count = self.summary_ids, self.summary_spent, self.summary_count
+            summary_customer_pos = self.summary_customer_pos
+        else:
+            # Totals over the orders of the date range only
+            in_range = self._date_range_mask(start_date, end_date) & (self.order_summary_pos >= 0)
+            spent = np.bincount(self.order_summary_pos[in_range], weights=self.order_amounts[in_range],
+                                minlength=len(self.summary_ids))
+            count = np.bincount(self.order_summary_pos[in_range], minlength=len(self.summary_ids)).astype(np.int64)
+            has_orders = count > 0
+            summary_ids, summary_spent, summary_count = self.summary_ids[has_orders], spent[has_orders], count[has_orders]
+            summary_customer_pos = self.summary_customer_pos[has_orders]
+        top = np.argsort(-summary_spent, kind='stable')[:int(top_number)]
+        return pd.DataFrame({
+            'customer_id': summary_ids[top],
+            'customer_name': self._customer_column(self.customer_names, summary_customer_pos[top]),
+            'spent_amount': summary_spent[top],
+            'order_count': summary_count[top],
+        })
+
+    def get_revenue_daily(self, start_date=None, end_date=None):
+        """
+        Return Revenue and Order Count per Order Day.
+
+        Parameters:
+            start_date (date): First day of the series, or None for the first order day.
+            end_date (date): Last day of the series, or None for the last order day.
+
+        Returns:
+            DataFrame: Daily rows with the columns of the `revenue_daily` table.
+        """
+        day_index = self.order_dates.astype('datetime64[D]')
+        mask = np.ones(len(day_index), dtype=bool)
+        if start_date is not None:
+            mask &= day_index >= np.datetime64(start_date, 'D')
+        if end_date is not None:
+            mask &= day_index <= np.datetime64(end_date, 'D')
+        days, inverse = np.unique(day_index[mask], return_inverse=True)
+        return pd.DataFrame({
+            'order_day': pd.Series(days).dt.date.to_numpy(object),
+            'spent_amount': np.bincount(inverse, weights=self.order_amounts[mask], minlength=len(days)),
+            'order_count': np.bincount(inverse, minlength=len(days)).astype(np.int64),
+        })
+
+    def get_total_over_time(self):
+        """
+        Return Revenue and Order Count Grouped by Year and Month.
+
+        Returns:
+            DataFrame: Monthly series with the columns of `get_total_over_time`.
+        """
+        month_index = self.order_dates.astype('datetime64[M]')
+        months, inverse = np.unique(month_index, return_inverse=True)
+        month_number = months.astype(np.int64)
+        return pd.DataFrame({
+            'period_start': pd.Series(months.astype('datetime64[ns]')).dt.date.to_numpy(object),
+            'order_year': month_number // 12 + 1970,
+            'order_month': month_number % 12 + 1,
+            'spent_amount': np.bincount(inverse, weights=self.order_amounts, minlength=len(months)),
+            'order_count': np.bincount(inverse, minlength=len(months)).astype(np.int64),
+        })
+
+    def get_total_summery(self):
+        """
+        Return Total Revenue, Unique Customers and Order Count.
+
+        Returns:
+            tuple: Total revenue, total customers, and total orders.
+        """
+        return float(self.order_amounts.sum()), len(self.customer_ids), len(self.order_ids)
+
+    def get_dashboard_snapshot(self, top_number=10):
+        """
+        Return Everything the Dashboard Displays.
+
+        Parameters:
+            top_number (int): The number of top customers to retrieve.
+
+        Returns:
+            dict: The same keys as `get_dashboard_snapshot` in `db.filter`.
+        """
+        max_amount, max_count = self.get_max_filter_amount()
+        return {
+            'max_amount': max_amount,
+            'max_count': max_count,
+            'summary': self.get_total_summery(),
+            'top_customers': self.top_customer_by_revenue(top_number),
+            'total_over_time': self.get_total_over_time(),
+        }
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _load_memory_engine(data_version):
+    """
+    Load the Column Store for a Data Version.
+
+    Cached as a Streamlit resource so that one copy per process is shared by all
+    sessions; a new data version replaces the previous copy.
+
+    Parameters:
+        data_version (int): Data version token to load.
+
+    Returns:
+        InMemoryAnalytics: The loaded engine.
+    """
+    return InMemoryAnalytics(get_db_connection(), data_version)
+
+def get_memory_engine():
+    """
+    Return the In-Memory Engine for the Current Data Version.
+
+    Returns:
+        InMemoryAnalytics: The loaded engine, or None when the in-memory backend is
+        disabled or the tables could not be loaded.
+    """
+    if get_db_setting("analytics_backend", "database") != "memory":
+        return None
+    try:
+        return _load_memory_engine(get_data_version())
+    except Exception:
+        return None
@@ -0,0 +1,174 @@
+"""
+Database Schema Module for Streamlit Application
+
+This module defines the tables used by the application with SQLAlchemy Core, so
+the importer creates explicitly typed columns, primary keys and indexes instead
+of letting pandas infer the schema from the CSV files.
+
+Tables:
+- customers: One row per customer, keyed by `customer_id`.
+- orders: One row per order, keyed by `order_id`, with indexes on `customer_id`
+  (joins and rollup refreshes) and `order_date, order_id` (date range filters).
+- customer_summary: Per-customer rollup of total spent, order count and first/last order date,
+  stamped with the data version of the import that last changed it (`updated_version`).
+- customer_features: Per-customer model features (totals, average order value, first/last order
+  date and inter-order gap statistics), stamped with `updated_version` like `customer_summary`.
+- top_customers: The customers with the highest total spent, ranked, up to the configured
+  maximum (see `db.data_import`).
+- revenue_daily: Revenue and order count of every order day, the source of the revenue-over-time series
+  at daily, weekly, monthly and yearly granularity.
+- customer_scores: Repeat purchase probability of every customer, written by the batch scoring in `ml_model`.
+- sketches: Serialized sample and sketches of the approximate mode (see `db.sketches`), one row per sketch.
+- data_version: Single-row table holding the token of the latest import (see `db.cache`).
+
+Functions:
+- recreate_tables: Drops and recreates the given tables without their secondary indexes.
+- create_indexes: Creates the secondary indexes after a bulk load.
+- has_current_schema: Checks that existing tables have every column of this schema.
+"""
+from sqlalchemy import MetaData, Table, Column, Index, Integer, BigInteger, String, Numeric, Date, DateTime, Float, Boolean, LargeBinary # Schema definition
+from sqlalchemy import inspect # Columns of the existing tables
+from sqlalchemy.schema import CreateTable # DDL construct for a table without its indexes
+
+# Metadata collection holding every application table
+metadata = MetaData()
+
+# Customers table
+customers = Table(
+    'customers', metadata,
+    Column('customer_id', Integer, primary_key=True, autoincrement=False),
+    Column('customer_name', String(255)),
+    Column('customer_email', String(255)),
+)
+
+# Orders table
+orders = Table(
+    'orders', metadata,
+    Column('order_id', Integer, primary_key=True, autoincrement=False),
+    Column('display_order_id', String(32)),
+    Column('total_amount', Numeric(12, 2), nullable=False),
+    Column('order_date', DateTime, nullable=False),
+    Column('customer_id', Integer),
+    Index('ix_orders_customer_id', 'customer_id'),
+    Index('ix_orders_order_date', 'order_date', 'order_id'),
+)
+
+# Per-customer rollup maintained by the importer
+customer_summary = Table(
+    'customer_summary', metadata,
+    Column('customer_id', Integer, primary_key=True, autoincrement=False),
+    Column('total_spent', Numeric(14, 2), nullable=False),
+    Column('order_count', Integer, nullable=False),
+    Column('first_order_date', DateTime),
+    Column('last_order_date', DateTime),
+    Column('updated_version', BigInteger),
+    Index('ix_customer_summary_total_spent', 'total_spent'),
+    Index('ix_customer_summary_updated_version', 'updated_version'),
+)
+
+# Per-customer model features maintained by the importer; recency is derived from last_order_date when read
+customer_features = Table(
+    'customer_features', metadata,
+    Column('customer_id', Integer, primary_key=True, autoincrement=False),
+    Column('total_revenue', Numeric(14, 2), nullable=False),
+    Column('total_orders', Integer, nullable=False),
+    Column('avg_order_value', Float, nullable=False),
+    Column('first_order_date', DateTime, nullable=False),
+    Column('last_order_date', DateTime, nullable=False),
+    Column('mean_gap_days', Float, nullable=False),
+    Column('std_gap_days', Float, nullable=False),
+    Column('max_gap_days', Float, nullable=False),
+    Column('updated_version', BigInteger),
+    Index('ix_customer_features_updated_version', 'updated_version'),
+)
+
+# Highest-spending customers maintained by the importer, rank 1 first
+top_customers = Table(
+    'top_customers', metadata,
+    Column('rank', Integer, primary_key=True, autoincrement=False),
+    Column('customer_id', Integer, nullable=False),
+    Column('total_spent', Numeric(14, 2), nullable=False),
+    Column('order_count', Integer, nullable=False),
+)
+
+# Revenue per order day maintained by the importer (all orders, with or without a customer)
+revenue_daily = Table(
+    'revenue_daily', metadata,
+    Column('order_day', Date, primary_key=True),
+    Column('spent_amount', Numeric(16, 2), nullable=False),
+    Column('order_count', Integer, nullable=False),
+)
+
+# Repeat purchase scores of the batch prediction
+customer_scores = Table(
+    'customer_scores', metadata,
+    Column('customer_id', Integer, primary_key=True, autoincrement=False),
+    Column('repeat_probability', Float, nullable=False),
+    Column('repeat_purchaser', Boolean, nullable=False),
+    Column('data_version', BigInteger, nullable=False),
+    Column('scored_at', DateTime, nullable=False),
+)
+
+# Serialized sketches of the approximate mode, replaced by every import
+sketches = Table(
+    'sketches', metadata,
+    Column('sketch_name', String(32), primary_key=True),
+    Column('state', LargeBinary(2 ** 24), nullable=False),
+    Column('updated_version', BigInteger, nullable=False),
+)
+
+# Token of the latest import, used to invalidate cached query results
+data_version = Table(
+    'data_version', metadata,
+    Column('version', BigInteger, primary_key=True, autoincrement=False),
+)
+
+def recreate_tables(connection, table_names):
+    """
+    Drop and Recreate the Given Tables Without Secondary Indexes.
+
+    Only the tables filled by an import are passed in; the scores, sketches and the
+    data version token are kept and replaced by their own writers. The secondary
+    indexes are left out so that a bulk load does not pay for index maintenance on
+    every insert; call `create_indexes` once the load is finished.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside a transaction.
+        table_names (iterable): Names of the tables to recreate.
+    """
+    tables = [table for table in metadata.sorted_tables if table.name in set(table_names)]
+    metadata.drop_all(connection, tables=tables)
+    for table in tables:
+        connection.execute(CreateTable(table)) # CREATE TABLE only, indexes are created separately
+
+def create_indexes(connection):
+    """
+    Create the Secondary Indexes of All Tables.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside a transaction.
+    """
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+def has_current_schema(engine, table_names):
+    """
+    Check that Existing Tables Have Every Column of This Schema.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Database engine.
+        table_names (iterable): Names of the tables to check.
+
+    Returns:
+        bool: True if every table exists with all of its columns, False if a table
+        is missing or was created by an older version of the application.
+    """
+    inspector = inspect(engine)
+    for table_name in table_names:
+        if not inspector.has_table(table_name):
+            return False
+        existing_columns = {column['name'] for column in inspector.get_columns(table_name)}
+        if not set(metadata.tables[table_name].columns.keys()) <= existing_columns:
+            return False
+    return True
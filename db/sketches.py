@@ -0,0 +1,500 @@
+"""
+Sketches Module for Streamlit Application
+
+This module keeps small summaries of the imported data that answer the dashboard
+overview approximately without scanning the `orders` table:
+
+- RunningTotal: Exact sum and count of the order amounts, kept while the chunks
+  are loaded, so total revenue and the order count need no estimate.
+- ReservoirSample: Uniform sample of the order amounts (Algorithm R), with the
+  exact number of orders seen, for statistics that need a sample.
+- HyperLogLog: Distinct count of the customer ids, mergeable register array.
+- QuantileSketch: Relative-error quantile sketch (logarithmic buckets, as in
+  DDSketch) of the order amounts and of the per-customer totals and order counts,
+  with the exact minimum and maximum.
+
+Every estimate is returned as an `Estimate(value, low, high)` with a 95% interval.
+The sketches are updated by `db.data_import` while the CSV chunks are loaded,
+serialized with NumPy and stored in the `sketches` table, stamped with the data
+version of the import. The sample size is set with the optional `sample_size`
+key of the `[delivergate_db]` secrets section (default 10000).
+
+Classes:
+- Estimate: Estimated value with the bounds of its 95% interval.
+- RunningTotal: Exact sum and count of order amounts.
+- ReservoirSample: Uniform sample of order amounts.
+- HyperLogLog: Approximate distinct counter.
+- QuantileSketch: Approximate quantiles with a relative error guarantee.
+
+Functions:
+- new_sketches: Returns empty sketches for a full import.
+- update_order_sketches: Adds a chunk of orders to the sketches.
+- update_customer_sketches: Adds a chunk of customers to the sketches.
+- rebuild_customer_total_sketches: Rebuilds the per-customer total sketches from `customer_summary`.
+- build_sketches: Builds every sketch from the stored tables.
+- load_sketches: Reads the stored sketches.
+- save_sketches: Stores the sketches of an import.
+"""
+from collections import namedtuple # Estimates with bounds
+import io # In-memory NumPy archives
+import math # Error bounds
+import numpy as np # Sketch arrays
+import pandas as pd # Chunked reads of the rollup table
+from sqlalchemy import select, delete, insert # SQL statements for the sketches table
+from db.db_connector import get_db_setting # Sample size setting
+from db.schema import sketches, customers, orders, customer_summary # Table definitions
+
+# Default reservoir size, overridable in secrets.toml
+DEFAULT_SAMPLE_SIZE = 10000
+# HyperLogLog precision: 2**14 registers, about 0.8% standard error
+HLL_PRECISION = 14
+# Relative accuracy of the quantile sketches
+QUANTILE_ACCURACY = 0.01
+# z value of the 95% intervals
+Z_95 = 1.96
+# Rows of customer_summary read per chunk when rebuilding the per-customer sketches
+SUMMARY_CHUNK_SIZE = 50000
+
+# Estimated value with the bounds of its 95% interval
+Estimate = namedtuple('Estimate', ['value', 'low', 'high'])
+
+class RunningTotal():
+    """
+    Exact Sum and Count of Order Amounts.
+
+    Every order passes through the import once, so its amount is added here
+    instead of being estimated later from the sample.
+    """
+
+    def __init__(self, total=0.0, count=0):
+        """
+        Create the Total, Empty or from Stored State.
+        """
+        self.total = float(total)
+        self.count = int(count)
+
+    def add(self, amounts):
+        """
+        Add Order Amounts to the Total.
+
+        Parameters:
+            amounts (array-like): Amounts of orders not seen before.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        self.total = math.fsum([self.total, math.fsum(amounts)])
+        self.count += len(amounts)
+
+    def estimate(self):
+        """
+        Return the Total as an Estimate.
+
+        Returns:
+            Estimate: The exact total, with an interval of zero width.
+        """
+        return Estimate(self.total, self.total, self.total)
+
+    def to_arrays(self):
+        """
+        Return the Arrays Describing the Total.
+
+        Returns:
+            dict: NumPy arrays stored with `np.savez_compressed`.
+        """
+        return {'total': np.array(self.total), 'count': np.array(self.count)}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Rebuild the Total from the Arrays of `to_arrays`.
+        """
+        return cls(float(arrays['total']), int(arrays['count']))
+
+class ReservoirSample():
+    """
+    Uniform Sample of Order Amounts.
+
+    Keeps at most `size` amounts such that every order seen so far had the same
+    chance to be kept (Algorithm R), and the exact number of orders seen.
+    """
+
+    def __init__(self, size=DEFAULT_SAMPLE_SIZE, amounts=None, seen=0):
+        """
+        Create the Sample, Empty or from Stored State.
+        """
+        self.size = int(size)
+        self.amounts = np.zeros(0) if amounts is None else np.asarray(amounts, dtype=np.float64)
+        self.seen = int(seen)
+
+    def add(self, amounts):
+        """
+        Add Order Amounts to the Sample.
+
+        Parameters:
+            amounts (array-like): Amounts of orders not seen before.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        # Fill the reservoir first
+        free = max(0, self.size - len(self.amounts))
+        self.amounts = np.concatenate([self.amounts, amounts[:free]])
+        self.seen += len(amounts[:free])
+        rest = amounts[free:]
+        if len(rest) == 0:
+            return
+        # The i-th order replaces a random slot with probability size / i; later orders win on the same slot
+        positions = np.random.default_rng().integers(0, self.seen + np.arange(1, len(rest) + 1))
+        kept = positions < self.size
+        slots, last = np.unique(positions[kept][::-1], return_index=True)
+        self.amounts[slots] = rest[kept][::-1][last]
+        self.seen += len(rest)
+
+    def estimate_total(self):
+        """
+        Estimate the Sum of All Amounts Seen.
+
+        Returns:
+            Estimate: Total with the 95% interval from the sample standard error,
+            including the finite population correction (exact once every order is sampled).
+        """
+        sampled = len(self.amounts)
+        if sampled == 0:
+            return Estimate(0.0, 0.0, 0.0)
+        total = self.seen * float(self.amounts.mean())
+        if sampled >= self.seen or sampled < 2:
+            return Estimate(total, total, total)
+        correction = math.sqrt((self.seen - sampled) / (self.seen - 1))
+        margin = Z_95 * self.seen * float(self.amounts.std(ddof=1)) / math.sqrt(sampled) * correction
+        return Estimate(total, total - margin, total + margin)
+
+    def to_arrays(self):
+        """
+        Return the Arrays Describing the Sample.
+
+        Returns:
+            dict: NumPy arrays stored with `np.savez_compressed`.
+        """
+        return {'amounts': self.amounts, 'size': np.array(self.size), 'seen': np.array(self.seen)}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Rebuild the Sample from the Arrays of `to_arrays`.
+        """
+        return cls(int(arrays['size']), arrays['amounts'], int(arrays['seen']))
+
+def _hash64(ids):
+    """
+    Hash Integer Ids to Uniform 64-bit Values (SplitMix64 finalizer).
+
+    Parameters:
+        ids (array-like): Integer ids.
+
+    Returns:
+        ndarray: uint64 hashes.
+    """
+    z = np.asarray(ids, dtype=np.int64).astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+class HyperLogLog():
+    """
+    Approximate Distinct Counter.
+
+    Adding the same id again does not change the registers, so re-imported rows
+    are not double counted; two counters merge with an element-wise maximum.
+    """
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        """
+        Create the Counter, Empty or from Stored State.
+        """
+        self.precision = int(precision)
+        self.registers = (np.zeros(1 << self.precision, dtype=np.uint8) if registers is None
+                          else np.asarray(registers, dtype=np.uint8))
+
+    def add(self, ids):
+        """
+        Add Integer Ids to the Counter.
+
+        Parameters:
+            ids (array-like): Integer ids (missing values must be dropped first).
+        """
+        hashes = _hash64(ids)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Rank of the first set bit of the remaining bits; they fit exactly into a float64 mantissa
+        bit_length = np.frexp(remainder.astype(np.float64))[1]
+        rank = (64 - self.precision - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """
+        Merge Another Counter of the Same Precision into this One.
+        """
+        self.registers = np.maximum(self.registers, other.registers)
+
+    def estimate(self):
+        """
+        Estimate the Number of Distinct Ids.
+
+        Returns:
+            Estimate: Count with the 95% interval from the 1.04 / sqrt(m) standard error.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        count = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int((self.registers == 0).sum())
+        if count <= 2.5 * m and zeros: # Small range correction: linear counting
+            count = m * math.log(m / zeros)
+        margin = Z_95 * 1.04 / math.sqrt(m) * count
+        return Estimate(count, max(0.0, count - margin), count + margin)
+
+    def to_arrays(self):
+        """
+        Return the Arrays Describing the Counter.
+
+        Returns:
+            dict: NumPy arrays stored with `np.savez_compressed`.
+        """
+        return {'registers': self.registers, 'precision': np.array(self.precision)}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Rebuild the Counter from the Arrays of `to_arrays`.
+        """
+        return cls(int(arrays['precision']), arrays['registers'])
+
+class QuantileSketch():
+    """
+    Approximate Quantiles with a Relative Error Guarantee.
+
+    Positive values are counted in logarithmic buckets whose bounds grow by
+    `gamma = (1 + accuracy) / (1 - accuracy)`, so every quantile is returned within
+    `accuracy` of the true value. Zero and negative values share one bucket at 0.
+    The minimum, maximum and count are exact; sketches merge by adding counts.
+    """
+
+    def __init__(self, accuracy=QUANTILE_ACCURACY, keys=None, counts=None, zeros=0, minimum=math.inf, maximum=-math.inf):
+        """
+        Create the Sketch, Empty or from Stored State.
+        """
+        self.accuracy = float(accuracy)
+        self.log_gamma = math.log((1 + self.accuracy) / (1 - self.accuracy))
+        self.keys = np.zeros(0, dtype=np.int64) if keys is None else np.asarray(keys, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self.zeros = int(zeros)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+
+    @property
+    def count(self):
+        """
+        Return the Number of Values Added.
+        """
+        return int(self.counts.sum()) + self.zeros
+
+    def add(self, values):
+        """
+        Add Values to the Sketch.
+
+        Parameters:
+            values (array-like): Values to add (missing values must be dropped first).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        keys, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(np.int64), return_counts=True)
+        self._add_buckets(keys, counts)
+
+    def _add_buckets(self, keys, counts):
+        """
+        Add Bucket Counts to the Sketch.
+        """
+        merged_keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]),
+                                  minlength=len(merged_keys)).astype(np.int64)
+        self.keys = merged_keys
+
+    def merge(self, other):
+        """
+        Merge Another Sketch of the Same Accuracy into this One.
+        """
+        self.zeros += other.zeros
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._add_buckets(other.keys, other.counts)
+
+    def quantile(self, q):
+        """
+        Estimate a Quantile.
+
+        Parameters:
+            q (float): Quantile between 0 and 1.
+
+        Returns:
+            Estimate: Value within the relative accuracy of the true quantile, with
+            the bounds of that accuracy. None for an empty sketch.
+        """
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return Estimate(self.minimum, self.minimum, self.minimum)
+        if q >= 1:
+            return Estimate(self.maximum, self.maximum, self.maximum)
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return Estimate(0.0, 0.0, 0.0)
+        key = self.keys[np.searchsorted(np.cumsum(self.counts), rank - self.zeros, side='right')]
+        gamma = math.exp(self.log_gamma)
+        value = 2 * gamma ** int(key) / (gamma + 1)
+        value = min(max(value, self.minimum), self.maximum)
+        return Estimate(value, value * (1 - self.accuracy), value * (1 + self.accuracy))
+
+    def to_arrays(self):
+        """
+        Return the Arrays Describing the Sketch.
+
+        Returns:
+            dict: NumPy arrays stored with `np.savez_compressed`.
+        """
+        return {'keys': self.keys, 'counts': self.counts, 'accuracy': np.array(self.accuracy),
+                'zeros': np.array(self.zeros), 'minimum': np.array(self.minimum), 'maximum': np.array(self.maximum)}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Rebuild the Sketch from the Arrays of `to_arrays`.
+        """
+        return cls(float(arrays['accuracy']), arrays['keys'], arrays['counts'], int(arrays['zeros']),
+                   float(arrays['minimum']), float(arrays['maximum']))
+
+# Stored sketches and their classes
+SKETCH_CLASSES = {
+    'order_total': RunningTotal,
+    'order_sample': ReservoirSample,
+    'order_amounts': QuantileSketch,
+    'customer_ids': HyperLogLog,
+    'customer_spent': QuantileSketch,
+    'customer_orders': QuantileSketch,
+}
+
+def new_sketches():
+    """
+    Return Empty Sketches for a Full Import.
+
+    Returns:
+        dict: Sketch name mapped to an empty sketch.
+    """
+    sample_size = int(get_db_setting("sample_size", DEFAULT_SAMPLE_SIZE))
+    return {
+        'order_total': RunningTotal(),
+        'order_sample': ReservoirSample(sample_size),
+        'order_amounts': QuantileSketch(),
+        'customer_ids': HyperLogLog(),
+        'customer_spent': QuantileSketch(),
+        'customer_orders': QuantileSketch(),
+    }
+
+def update_order_sketches(sketch_set, order_frame):
+    """
+    Add a Chunk of New Orders to the Sketches.
+
+    Parameters:
+        sketch_set (dict): Sketches returned by `new_sketches` or `load_sketches`.
+        order_frame (DataFrame): Orders with a `total_amount` column, each seen only once.
+    """
+    amounts = order_frame['total_amount'].astype(float).to_numpy()
+    sketch_set['order_total'].add(amounts)
+    sketch_set['order_sample'].add(amounts)
+    sketch_set['order_amounts'].add(amounts)
+
+def update_customer_sketches(sketch_set, customer_frame):
+    """
+    Add a Chunk of Customers to the Sketches.
+
+    Parameters:
+        sketch_set (dict): Sketches returned by `new_sketches` or `load_sketches`.
+        customer_frame (DataFrame): Customers with a `customer_id` column; ids seen before are ignored.
+    """
+    sketch_set['customer_ids'].add(customer_frame['customer_id'].dropna().to_numpy(np.int64))
+
+def rebuild_customer_total_sketches(sketch_set, connection):
+    """
+    Rebuild the Per-customer Total Sketches from the Rollup Table.
+
+    The totals of existing customers change with every import, so these two
+    sketches are rebuilt from `customer_summary`, which has one row per customer.
+
+    Parameters:
+        sketch_set (dict): Sketches returned by `new_sketches` or `load_sketches`.
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+    """
+    sketch_set['customer_spent'], sketch_set['customer_orders'] = QuantileSketch(), QuantileSketch()
+    totals_query = select(customer_summary.c.total_spent, customer_summary.c.order_count)
+    for chunk in pd.read_sql(totals_query, con=connection, chunksize=SUMMARY_CHUNK_SIZE):
+        sketch_set['customer_spent'].add(chunk['total_spent'].astype(float).to_numpy())
+        sketch_set['customer_orders'].add(chunk['order_count'].to_numpy())
+
+def build_sketches(connection):
+    """
+    Build Every Sketch from the Stored Tables.
+
+    Used by an incremental import when no sketches were stored yet, for example
+    after upgrading a database loaded by an older version of the application.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+
+    Returns:
+        dict: Sketch name mapped to its sketch.
+    """
+    sketch_set = new_sketches()
+    for chunk in pd.read_sql(select(customers.c.customer_id), con=connection, chunksize=SUMMARY_CHUNK_SIZE):
+        update_customer_sketches(sketch_set, chunk)
+    for chunk in pd.read_sql(select(orders.c.total_amount), con=connection, chunksize=SUMMARY_CHUNK_SIZE):
+        update_order_sketches(sketch_set, chunk)
+    rebuild_customer_total_sketches(sketch_set, connection)
+    return sketch_set
+
+def load_sketches(connection):
+    """
+    Read the Stored Sketches.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection.
+
+    Returns:
+        dict: Sketch name mapped to its sketch, or None when the sketches are
+        missing (never built, or the table does not exist).
+    """
+    try:
+        rows = connection.execute(select(sketches.c.sketch_name, sketches.c.state)).all()
+    except Exception:
+        return None # The table does not exist before the first import with sketches
+    stored = {}
+    for name, state in rows:
+        if name in SKETCH_CLASSES:
+            with np.load(io.BytesIO(state), allow_pickle=False) as arrays:
+                stored[name] = SKETCH_CLASSES[name].from_arrays(arrays)
+    return stored if set(stored) == set(SKETCH_CLASSES) else None
+
+def save_sketches(connection, sketch_set, version):
+    """
+    Store the Sketches of an Import.
+
+    Parameters:
+        connection (sqlalchemy.engine.Connection): Open connection inside the import transaction.
+        sketch_set (dict): Sketch name mapped to its sketch.
+        version (int): Data version token of the import, stored in `updated_version`.
+    """
+    sketches.create(connection, checkfirst=True)
+    connection.execute(delete(sketches))
+    for name, sketch in sketch_set.items():
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **sketch.to_arrays())
+        connection.execute(insert(sketches).values(sketch_name=name, state=buffer.getvalue(), updated_version=version))
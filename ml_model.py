@@ -8,27 +8,513 @@ a logistic regression model:
 2. SimpleLogisticRegressionApp: Contains only the core machine learning code, 
    returning values directly without displaying in Streamlit.
 
+The features are read from the `customer_features` table maintained by the
+importer: total revenue and order count (monetary and frequency), average order
+value, days since the last order (recency) and the mean, standard deviation and
+maximum of the days between orders. Features a caller does not provide, such as
+the gap statistics of a hand-typed prediction, are filled with their training
+medians.
+
+Both classes share one trained model: the fitted `LogisticRegression`, its
+`StandardScaler` and the k-fold metrics are persisted with joblib in the
+`model_dir` directory (default `models/`), keyed by the data version of the latest
+import and the fold count. A model is trained only when no artifact exists for
+the current data, and artifacts of older imports are removed when a new one is
+saved.
+
+The batch scoring path applies the fitted scaler and model to many customers in
+one vectorized call: `score_all_customers` reads every customer's totals from the
+database in chunks and writes the repeat purchase probabilities to the
+`customer_scores` table (see `score_customers.py` for a nightly job).
+
+In online mode an `SGDClassifier` with logistic loss and a running `StandardScaler`
+are updated with `partial_fit` on only the customers whose rollup changed since the
+model's last update (`customer_features.updated_version`), and the persisted online
+model is replaced in place. A full import changes every customer, so the online
+model is then started afresh.
+
 Classes:
 - StreamlitLogisticRegressionApp: Manages logistic regression with UI components for 
   interactive data processing and prediction.
 - SimpleLogisticRegressionApp: Provides a streamlined logistic regression model for 
   background processing without Streamlit UI.
+
+Functions:
+- model_features: Builds the model's feature columns from customer data, filling missing values.
+- fold_metrics: Computes accuracy, precision, recall and F1 score from a confusion matrix.
+- fit_fold: Fits and evaluates the model on one cross-validation fold.
+- train_lr_model: Trains the model with parallel k-fold cross-validation and returns the artifact.
+- get_model_artifact_path: Returns the artifact path for a data version and fold count.
+- load_model_artifact: Loads a persisted artifact, or returns None.
+- save_model_artifact: Persists an artifact and removes those of older data versions.
+- get_trained_lr_model: Loads the persisted model, training and saving it when missing.
+- score_batch: Scores a DataFrame of customers in one vectorized call.
+- score_all_customers: Scores every customer in chunks and writes the `customer_scores` table.
+- get_online_model_path: Returns the path of the persisted online model.
+- load_online_model: Loads the persisted online model, or returns None.
+- update_online_model: Updates the online model with the customers changed since its last update.
 """
 #import necessory libraries
 import streamlit as st
-from db.db_connector import get_db_connection
-from db.filter import filter_customer_by_amount
+from db.db_connector import get_db_connection, get_db_setting
+from db.filter import get_customer_features, get_feature_reference_date, add_recency_days
+from db.cache import get_data_version
+from db.data_import import INSERT_BATCH_SIZE
+from db.instrumentation import instrumented
+from db.schema import customers, customer_features, customer_scores
+from sqlalchemy import select, func, bindparam, delete, case
+from datetime import datetime
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.model_selection import StratifiedKFold
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.metrics import confusion_matrix
 import time
+import os
+import glob
+import joblib
+from joblib import Parallel, delayed
+
+# Directory of the persisted model artifacts, overridable in secrets.toml
+DEFAULT_MODEL_DIR = "models"
+
+# Parallel workers for the cross-validation folds (-1 uses every core), overridable in secrets.toml
+DEFAULT_CV_N_JOBS = -1
+
+# File name prefix of the repeat purchaser model artifacts
+MODEL_ARTIFACT_PREFIX = "repeat_purchaser_lr"
+
+# Feature columns of the repeat purchaser models
+MODEL_FEATURES = ['total_revenue', 'total_orders', 'avg_order_value', 'recency_days',
+                  'mean_gap_days', 'std_gap_days', 'max_gap_days']
+
+# Customers read and scored per chunk by the batch scoring
+SCORE_CHUNK_SIZE = 50000
+
+# File name of the persisted online model, updated in place
+ONLINE_MODEL_FILE = "repeat_purchaser_online.joblib"
+
+# Feature rows changed after the online model's last update, after a customer id
+CHANGED_CUSTOMERS_QUERY = (
+    select(customer_features)
+    .where(customer_features.c.updated_version > bindparam('trained_version'))
+    .where(customer_features.c.customer_id > bindparam('after_id'))
+    .order_by(customer_features.c.customer_id)
+    .limit(bindparam('chunk_size'))
+)
+
+# Number of changed and total feature rows
+CHANGED_CUSTOMER_COUNT_QUERY = select(
+    func.coalesce(func.sum(case((customer_features.c.updated_version > bindparam('trained_version'), 1), else_=0)), 0).label('changed'),
+    func.count().label('total'),
+)
+
+# Model features of the customers after a customer id; customers without orders have zero totals
+SCORE_FEATURES_QUERY = (
+    select(
+        customers.c.customer_id,
+        func.coalesce(customer_features.c.total_revenue, 0).label('total_revenue'),
+        func.coalesce(customer_features.c.total_orders, 0).label('total_orders'),
+        customer_features.c.avg_order_value,
+        customer_features.c.last_order_date,
+        customer_features.c.mean_gap_days,
+        customer_features.c.std_gap_days,
+        customer_features.c.max_gap_days,
+    )
+    .select_from(customers.outerjoin(customer_features, customers.c.customer_id == customer_features.c.customer_id))
+    .where(customers.c.customer_id > bindparam('after_id'))
+    .order_by(customers.c.customer_id)
+    .limit(bindparam('chunk_size'))
+)
+
+def model_features(data, defaults=None):
+    """
+    Build the Model's Feature Columns from Customer Data.
+
+    Parameters:
+        data (DataFrame): Customer data with at least `total_revenue` and `total_orders`.
+        defaults (dict): Values for missing features, such as the training medians
+            (default fills them with 0).
+
+    Returns:
+        DataFrame: The `MODEL_FEATURES` columns as floats, without missing values.
+    """
+    features = data.reindex(columns=MODEL_FEATURES).astype(float)
+    order_value = features['total_revenue'] / features['total_orders'].where(features['total_orders'] > 0)
+    features['avg_order_value'] = features['avg_order_value'].fillna(order_value)
+    return features.fillna(defaults or {}).fillna(0)
+
+def fold_metrics(y_true, y_pred):
+    """
+    Compute the Fold Metrics from One Confusion Matrix.
+
+    Parameters:
+        y_true (ndarray): Actual repeat purchaser labels.
+        y_pred (ndarray): Predicted repeat purchaser labels.
+
+    Returns:
+        tuple: Accuracy, precision, recall and F1 score (0 where undefined).
+    """
+    tn, fp, fn, tp = confusion_matrix(y_true, y_pred, labels=[False, True]).ravel()
+    accuracy = (tp + tn) / len(y_true)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * tp / (2 * tp + fp + fn) if tp + fp + fn else 0.0
+    return accuracy, precision, recall, f1
+
+def fit_fold(x_label, y_label, train_index, test_index):
+    """
+    Fit and Evaluate the Model on One Fold.
+
+    Parameters:
+        x_label (ndarray): Standardized features.
+        y_label (ndarray): Target labels.
+        train_index (ndarray): Rows used for fitting.
+        test_index (ndarray): Rows used for evaluation.
+
+    Returns:
+        tuple: Fitted model, the fold metrics of `fold_metrics` and the fit time in seconds.
+    """
+    # Measure execution time
+    start_time = time.time()
+    
+    model = LogisticRegression()
+    model.fit(x_label[train_index], y_label[train_index])
+    y_pred = model.predict(x_label[test_index])
+    
+    # Calculate execution time
+    end_time = time.time()
+    return model, fold_metrics(y_label[test_index], y_pred), end_time - start_time
+
+def train_lr_model(X, y, k=5, n_jobs=None, data_version=None):
+    """
+    Train the Repeat Purchaser Model with k-Fold Cross-Validation.
+
+    The features are standardized, and a logistic regression model is fitted and
+    evaluated on each of the `k` stratified folds concurrently on a thread pool;
+    the model of the last fold is kept for prediction.
+
+    Parameters:
+        X (DataFrame): Input features for model training.
+        y (Series): Target variable for model training.
+        k (int): Number of folds for cross-validation (default is 5).
+        n_jobs (int): Parallel workers (default is the `cv_n_jobs` setting, or
+            `DEFAULT_CV_N_JOBS`).
+        data_version (int): Data version the features were read at (default is the
+            current data version).
+
+    Returns:
+        dict: Artifact with the fitted `model` and `standardizer`, the fold-wise
+        `kfold_metric` and `average_metric` DataFrames, the fold count and the
+        data version the model was trained on.
+    """
+    n_folds = k
+    n_jobs = n_jobs or int(get_db_setting("cv_n_jobs", DEFAULT_CV_N_JOBS))
+    skf = StratifiedKFold(n_splits=n_folds)
+    standardizer = StandardScaler()
+    X = model_features(X)
+    x_label = standardizer.fit_transform(X)
+    y_label = np.ravel(y)
+    
+    #fit and evaluate the folds concurrently; the solver releases the GIL, so threads avoid copying the data
+    folds = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(fit_fold)(x_label, y_label, train_index, test_index)
+        for train_index, test_index in skf.split(x_label, y_label))
+    model = folds[-1][0]
+    test_accuracy, test_precision, test_recall, test_f1 = np.array([metrics for _, metrics, _ in folds]).T
+    test_time = np.array([fold_time for _, _, fold_time in folds])
+    
+    #combine the matrics array to a dataframe
+    kfold_metric = pd.DataFrame(index=[f"fold-{x+1}" for x in range(n_folds)],
+                            columns=['Accuracy', 'Precision', 'Recall', 'F1score','Time'])
+    kfold_metric['Accuracy'] = test_accuracy
+    kfold_metric['Precision'] = test_precision
+    kfold_metric['Recall'] = test_recall
+    kfold_metric['F1score'] = test_f1
+    kfold_metric['Time'] = test_time
+    
+    #find the mean and standar deviation of the validations metrics
+    average_metric = pd.DataFrame(index=['Mean','Standard Deviation'],
+                            columns=['Accuracy', 'Precision', 'Recall', 'F1score','Time'])
+    average_metric['Accuracy'] = test_accuracy.mean(),test_accuracy.std()
+    average_metric['Precision'] = test_precision.mean(),test_precision.std()
+    average_metric['Recall'] = test_recall.mean(),test_recall.std()
+    average_metric['F1score'] = test_f1.mean(),test_f1.std()
+    average_metric['Time'] = test_time.mean(),test_time.std()
+    
+    return {
+        'model': model,
+        'standardizer': standardizer,
+        'kfold_metric': kfold_metric,
+        'average_metric': average_metric,
+        'features': list(MODEL_FEATURES),
+        'feature_defaults': X.median().to_dict(),
+        'folds': n_folds,
+        'data_version': get_data_version() if data_version is None else data_version,
+        'trained_at': time.time(),
+    }
+
+def get_model_artifact_path(k=5, data_version=None):
+    """
+    Return the Artifact Path for a Data Version and Fold Count.
+
+    Parameters:
+        k (int): Number of folds for cross-validation.
+        data_version (int): Data version of the artifact (default is the current data version).
+
+    Returns:
+        str: Path of the joblib file.
+    """
+    model_dir = get_db_setting("model_dir", DEFAULT_MODEL_DIR)
+    data_version = get_data_version() if data_version is None else data_version
+    return os.path.join(model_dir, f"{MODEL_ARTIFACT_PREFIX}_v{data_version}_k{k}.joblib")
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _read_model_artifact(path):
+    """
+    Read a Persisted Artifact.
+
+    Cached as a Streamlit resource, so every session of the process shares the
+    loaded model; a missing file raises and is therefore not cached.
+
+    Parameters:
+        path (str): Path of the joblib file.
+
+    Returns:
+        dict: The artifact returned by `train_lr_model`.
+    """
+    return joblib.load(path)
+
+def load_model_artifact(path):
+    """
+    Load a Persisted Artifact.
+
+    Parameters:
+        path (str): Path of the joblib file.
+
+    Returns:
+        dict: The artifact, or None if it does not exist or cannot be read.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        return _read_model_artifact(path)
+    except Exception:
+        return None
+
+def save_model_artifact(path, artifact, data_version=None):
+    """
+    Persist an Artifact and Remove Those of Older Data Versions.
+
+    The file is written under a temporary name and renamed, so other processes
+    never read a partially written artifact.
+
+    Parameters:
+        path (str): Path of the joblib file.
+        artifact (dict): The artifact returned by `train_lr_model`.
+        data_version (int): Data version of the artifact; the batch artifacts of every
+            other version are removed (default is None: none are removed).
+    """
+    model_dir = os.path.dirname(path)
+    os.makedirs(model_dir or ".", exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(artifact, temporary_path)
+    os.replace(temporary_path, path)
+    
+    # Artifacts of previous imports are never used again
+    if data_version is None:
+        return
+    current_version = f"_v{data_version}_"
+    for old_path in glob.glob(os.path.join(model_dir, f"{MODEL_ARTIFACT_PREFIX}_v*_k*.joblib")):
+        if current_version not in os.path.basename(old_path):
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass # Already removed by another process
+
+def get_trained_lr_model(X, y, k=5):
+    """
+    Return the Model Trained on the Current Data.
+
+    Loads the persisted artifact for the current data version and fold count, and
+    only trains (and persists) a new model when there is none.
+
+    Parameters:
+        X (DataFrame): Input features for model training.
+        y (Series): Target variable for model training.
+        k (int): Number of folds for cross-validation (default is 5).
+
+    Returns:
+        dict: The artifact returned by `train_lr_model`.
+    """
+    data_version = get_data_version() # Read once, so the path, the artifact and the cleanup agree
+    path = get_model_artifact_path(k, data_version)
+    artifact = load_model_artifact(path)
+    if artifact is None or artifact.get('features') != MODEL_FEATURES:
+        artifact = train_lr_model(X, y, k, data_version=data_version)
+        try:
+            save_model_artifact(path, artifact, data_version)
+        except OSError:
+            pass # A read-only file system only costs retraining on the next run
+    return artifact
+
+def score_batch(model, standardizer, data, feature_defaults=None):
+    """
+    Score a Batch of Customers in One Vectorized Call.
+
+    Parameters:
+        model (LogisticRegression): Fitted model.
+        standardizer (StandardScaler): Scaler fitted on the training data; it is
+            only applied, never refitted.
+        data (DataFrame): Customers with `total_revenue`, `total_orders` and
+            optionally the other `MODEL_FEATURES` columns.
+        feature_defaults (dict): Values for missing features (see `model_features`).
+
+    Returns:
+        DataFrame: `repeat_probability` and `repeat_purchaser` of every row, with
+        the index of `data`.
+    """
+    features = model_features(data, feature_defaults)
+    probabilities = model.predict_proba(standardizer.transform(features))
+    repeat_probability = probabilities[:, list(model.classes_).index(True)]
+    return pd.DataFrame({'repeat_probability': repeat_probability,
+                         'repeat_purchaser': repeat_probability >= 0.5}, index=data.index)
+
+@instrumented
+def score_all_customers(engine, model, standardizer, chunksize=SCORE_CHUNK_SIZE, feature_defaults=None):
+    """
+    Score Every Customer and Write the Scores to the `customer_scores` Table.
 
-# Initialize the database connection
-engine = get_db_connection()
+    The customers are read in chunks of `chunksize` ordered by id, so memory does
+    not grow with the customer base. The previous scores are replaced in the same
+    transaction, so readers see either the old or the new complete set.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Database engine.
+        model (LogisticRegression): Fitted model.
+        standardizer (StandardScaler): Scaler fitted on the training data.
+        chunksize (int): Number of customers per chunk (default is `SCORE_CHUNK_SIZE`).
+        feature_defaults (dict): Values for missing features, used for customers without orders.
+
+    Returns:
+        int: Number of customers scored (0, leaving the table untouched, when no
+        orders are imported).
+    """
+    data_version = get_data_version()
+    reference_date = get_feature_reference_date()
+    if reference_date is None:
+        return 0 # No orders imported yet: nothing to score
+    scored_at = datetime.now()
+    rows_scored, after_id = 0, -1 # Customer ids are positive
+    with engine.begin() as connection:
+        customer_scores.create(connection, checkfirst=True)
+        connection.execute(delete(customer_scores))
+        while True:
+            chunk = pd.read_sql(SCORE_FEATURES_QUERY, con=connection,
+                                params={'after_id': after_id, 'chunk_size': chunksize})
+            if chunk.empty:
+                break
+            chunk = add_recency_days(chunk, reference_date)
+            scores = score_batch(model, standardizer, chunk, feature_defaults)
+            scores.insert(0, 'customer_id', chunk['customer_id'])
+            scores['data_version'] = data_version
+            scores['scored_at'] = scored_at
+            scores.to_sql(name='customer_scores', con=connection, if_exists='append', index=False,
+                          method='multi', chunksize=INSERT_BATCH_SIZE)
+            rows_scored += len(chunk)
+            after_id = int(chunk['customer_id'].iloc[-1])
+    return rows_scored
+
+def get_online_model_path():
+    """
+    Return the Path of the Persisted Online Model.
+
+    Returns:
+        str: Path of the joblib file in `model_dir`.
+    """
+    return os.path.join(get_db_setting("model_dir", DEFAULT_MODEL_DIR), ONLINE_MODEL_FILE)
+
+def load_online_model():
+    """
+    Load the Persisted Online Model.
+
+    Not cached, because the file is replaced in place by every update.
+
+    Returns:
+        dict: Artifact with the `model`, `standardizer`, the newest version stamp of
+        the consumed feature rows (`data_version`) and the number of customers consumed
+        (`samples_seen`), or None if there is no online model yet.
+    """
+    path = get_online_model_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path)
+    except Exception:
+        return None
+
+@instrumented
+def update_online_model(engine, chunksize=SCORE_CHUNK_SIZE):
+    """
+    Update the Online Model with the Customers Changed Since its Last Update.
+
+    The rollup rows stamped with a newer data version than the model are read in
+    chunks, and the newest stamp read becomes the model's version, so rows written
+    by an import during the update are consumed by the next one; each chunk updates the running scaler and then the model with
+    `partial_fit`. When every row changed (after a full import), or no online
+    model exists, a new model is started so earlier data is not counted twice.
+    The feature medians of all customers are stored with the model, so missing
+    features of a prediction are filled the same way as with the batch model.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Database engine.
+        chunksize (int): Number of customers per chunk (default is `SCORE_CHUNK_SIZE`).
+
+    Returns:
+        dict: The updated artifact (see `load_online_model`) and the number of
+        customers consumed by this update in `customers_consumed`, or None when no
+        orders are imported.
+    """
+    reference_date = get_feature_reference_date()
+    if reference_date is None:
+        return None # No orders imported yet: nothing to learn from
+    artifact = load_online_model()
+    trained_version = artifact['data_version'] if artifact else -1
+    with engine.connect() as connection:
+        changed, total = connection.execute(CHANGED_CUSTOMER_COUNT_QUERY, {'trained_version': trained_version}).one()
+    if artifact is None or artifact.get('features') != MODEL_FEATURES or (changed and changed == total):
+        artifact = {'model': SGDClassifier(loss='log_loss'), 'standardizer': StandardScaler(),
+                    'features': list(MODEL_FEATURES), 'feature_defaults': None, 'samples_seen': 0}
+        trained_version = -1
+    
+    consumed, after_id = 0, -1 # Customer ids are positive
+    consumed_version = trained_version # Newest version stamp of the rows consumed so far
+    with engine.connect() as connection:
+        while True:
+            chunk = pd.read_sql(CHANGED_CUSTOMERS_QUERY, con=connection,
+                                params={'trained_version': trained_version, 'after_id': after_id, 'chunk_size': chunksize})
+            if chunk.empty:
+                break
+            features = model_features(add_recency_days(chunk, reference_date))
+            target = np.ravel(chunk['total_orders'] > 1) # repeat_purchaser, as in the batch model
+            artifact['standardizer'].partial_fit(features)
+            artifact['model'].partial_fit(artifact['standardizer'].transform(features), target, classes=[False, True])
+            consumed += len(chunk)
+            consumed_version = max(consumed_version, int(chunk['updated_version'].max()))
+            after_id = int(chunk['customer_id'].iloc[-1])
+    
+    # Medians of the features for the ones missing from a prediction, as `train_lr_model` stores them
+    if consumed or artifact.get('feature_defaults') is None:
+        feature_df = get_customer_features()
+        if isinstance(feature_df, pd.DataFrame) and not feature_df.empty:
+            artifact['feature_defaults'] = feature_df[MODEL_FEATURES].median().to_dict()
+    
+    artifact.update(data_version=consumed_version, samples_seen=artifact['samples_seen'] + consumed,
+                    updated_at=time.time())
+    save_model_artifact(get_online_model_path(), artifact)
+    return {**artifact, 'customers_consumed': consumed}
 
 class StreamlitLogisticRegressionApp():
     """
@@ -37,8 +523,13 @@ class StreamlitLogisticRegressionApp():
     This class handles data processing, validation, and prediction steps, 
     integrating Streamlit components to display intermediate results.
     """
-    model = LogisticRegression() # Initialize Logistic Regression model
-    standardizer = StandardScaler() # Initialize standard scaler for data normalization
+    def __init__(self):
+        """
+        Initialize an Untrained Model for this Session.
+        """
+        self.model = LogisticRegression() # Initialize Logistic Regression model
+        self.standardizer = StandardScaler() # Initialize standard scaler for data normalization
+        self.feature_defaults = None # Training medians of the features, filled in by training
     
     def data_preprocessing_for_model_build(self):
         """
@@ -51,17 +542,20 @@ class StreamlitLogisticRegressionApp():
             tuple: Processed features (X) and target (y) data.
         """
         try:
+            # Get the shared database engine
+            engine = get_db_connection()
             if engine:
-                # Retrieve customer data and display initial dataset
-                data_frame = filter_customer_by_amount(0,0)
+                # Retrieve customer features and display initial dataset
+                data_frame = get_customer_features()
                 st.subheader("Data Preprocessing")
                 st.write("This section involves in data processing before dive deeper into the machine learning field.")
-                st.write("The original data filtered from the mysql to fit into our need is displayed below")
+                st.write("""The customer features kept up to date by the importer are displayed below: total revenue,
+                        total orders, average order value, days since the last order and the mean, standard deviation
+                        and maximum of the days between orders.""")
                 st.dataframe(data_frame)
                 
-                # Add target column and rename columns
+                # Add target column
                 st.write("lets add a new column repeat_purchaser which is used as target feature to train our model.")
-                data_frame.rename(columns={"total_spent":"total_revenue","number_of_orders":"total_orders"}, inplace=True)
                 data_frame['repeat_purchaser'] =  data_frame['total_orders']>1
             
                 st.write("""the data after adding the repeat_purchaser column will be as below. 
@@ -70,7 +564,7 @@ class StreamlitLogisticRegressionApp():
                 
                 #extract usefull features only from the dataset
                 st.write("""lets extract the usefull columns only from the dataframe""")
-                processingData = data_frame[['total_revenue','total_orders','repeat_purchaser']]
+                processingData = data_frame[MODEL_FEATURES + ['repeat_purchaser']]
                 st.dataframe(processingData.head(5))
                 
                 # Count rows with null values
@@ -87,7 +581,7 @@ class StreamlitLogisticRegressionApp():
                 
                 # split the features and target variables
                 st.write("split the dataset into input features(x) and target(y)")
-                X = processingData[['total_revenue','total_orders']]  # Features (total_revenue, total_orders)
+                X = processingData[MODEL_FEATURES]  # Features (revenue, orders, order value, recency, order gaps)
                 y = processingData['repeat_purchaser']   # Target variable (repeat_purchaser)
                 x_col,y_col = st.columns(2)
                 with x_col:
@@ -121,11 +615,16 @@ class StreamlitLogisticRegressionApp():
             #define the folds to validate
             st.write(f"Lets define folds count as {k}")
             n_folds = k
-            skf = StratifiedKFold(n_splits=n_folds)
+            
+            # train the model, or load the one already trained on the current data
+            artifact = get_trained_lr_model(X, y, n_folds)
+            self.model = artifact['model']
+            self.standardizer = artifact['standardizer']
+            self.feature_defaults = artifact['feature_defaults']
             
             # prepare the features and target
             st.write("""Lets standardize our input data X and flatten the target data Y""")
-            x_label = self.standardizer.fit_transform(X)
+            x_label = self.standardizer.transform(model_features(X))
             y_label = np.ravel(y)
             x_col, y_col = st.columns(2)
             with x_col:
@@ -133,51 +632,16 @@ class StreamlitLogisticRegressionApp():
             with y_col:
                 st.write("Y",y_label)
             
-            #initialize the testing metric to update the test metrics 
-            test_accuracy, test_precision, test_recall, test_f1, test_time = np.zeros((5,n_folds))
-            
-            #iterate nfolds to fit the model and find metrics of each folds
-            for i, (train_index, test_index) in enumerate(skf.split(x_label, y_label)):
-                
-                # Measure execution time
-                start_time = time.time()
-            
-                self.model.fit(x_label[train_index], y_label[train_index])
-                y_pred = self.model.predict(x_label[test_index])
-                
-                # Calculate execution time
-                end_time = time.time()
-                
-                # performance metrics
-                test_accuracy[i] = accuracy_score(y_label[test_index], y_pred)
-                test_precision[i] = precision_score(y_label[test_index], y_pred)
-                test_recall[i] = recall_score(y_label[test_index], y_pred)
-                test_f1[i] = f1_score(y_label[test_index], y_pred)
-                test_time[i]= end_time - start_time
-            
-            #combine the matrics array to a dataframe
+            #display the fold-wise metrics
             st.write(f"""lets validate the model on {n_folds} folds and get the performance metrics on each folds.
                     This is called {n_folds}-Fold cross validation""")
-            kfold_metric = pd.DataFrame(index=[f"fold-{x+1}" for x in range(n_folds)],
-                                    columns=['Accuracy', 'Precision', 'Recall', 'F1score','Time'])
-            kfold_metric['Accuracy'] = test_accuracy
-            kfold_metric['Precision'] = test_precision
-            kfold_metric['Recall'] = test_recall
-            kfold_metric['F1score'] = test_f1
-            kfold_metric['Time'] = test_time
-            st.write(kfold_metric)
+            st.write(artifact['kfold_metric'])
             
-            #find the mean and standar deviation of the validations metrics
+            #display the mean and standar deviation of the validations metrics
             st.write(f"""lets find the mean and standard deviation the {n_folds}Fold evaluation metrics""")
-            average_metric = pd.DataFrame(index=['Mean','Standard Deviation'],
-                                    columns=['Accuracy', 'Precision', 'Recall', 'F1score','Time'])
-            average_metric['Accuracy'] = test_accuracy.mean(),test_accuracy.std()
-            average_metric['Precision'] = test_precision.mean(),test_precision.std()
-            average_metric['Recall'] = test_recall.mean(),test_recall.std()
-            average_metric['F1score'] = test_f1.mean(),test_f1.std()
-            average_metric['Time'] = test_time.mean(),test_time.std()
-            
-            st.write(average_metric)
+            st.write(artifact['average_metric'])
+            st.caption(f"Model trained on the data imported at version {artifact['data_version']}; "
+                       "it is retrained only after the next import.")
             return self.model
         except Exception:
             return st.error("some thing went wrong on validation!")
@@ -187,13 +651,14 @@ class StreamlitLogisticRegressionApp():
         Predict Customer Repeat Purchase Behavior.
 
         Parameters:
-            data (DataFrame): Input data with `total_revenue` and `total_orders`.
+            data (DataFrame): Input data with `total_revenue` and `total_orders`; the
+                other features are filled with their training medians when missing.
 
         Returns:
             ndarray: Prediction result (1 for repeat purchaser, 0 for non-repeat).
         """
         try:
-            predict_data = self.standardizer.fit_transform(data)
+            predict_data = self.standardizer.transform(model_features(data, self.feature_defaults)) # Scale with the training statistics
             y_predict = self.model.predict(predict_data)
             return y_predict
         except Exception:
@@ -211,9 +676,14 @@ class SimpleLogisticRegressionApp():
     This class provides core functionality for logistic regression, without 
     Streamlit components, making it suitable for backend processing.
     """
-    #Logistic Regression
-    model = LogisticRegression()
-    standardizer = StandardScaler()
+    def __init__(self):
+        """
+        Initialize an Untrained Model.
+        """
+        #Logistic Regression
+        self.model = LogisticRegression()
+        self.standardizer = StandardScaler()
+        self.feature_defaults = None
     
     def data_preprocessing_for_model_build(self):
         """
@@ -226,15 +696,16 @@ class SimpleLogisticRegressionApp():
             tuple: Processed features (X) and target (y) data.
         """
         try:
+            # Get the shared database engine
+            engine = get_db_connection()
             if engine:
-                #get the customer data with their total orders and total spent
-                data_frame = filter_customer_by_amount(0,0)
-                data_frame.rename(columns={"total_spent":"total_revenue","number_of_orders":"total_orders"}, inplace=True)
+                #get the customer features maintained by the importer
+                data_frame = get_customer_features()
                 data_frame['repeat_purchaser'] =  data_frame['total_orders']>1
-                processingData = data_frame[['total_revenue','total_orders','repeat_purchaser']]
+                processingData = data_frame[MODEL_FEATURES + ['repeat_purchaser']]
                 
                 # split the features and target variables
-                X = processingData[['total_revenue','total_orders']]  # Features (total_revenue, total_orders)
+                X = processingData[MODEL_FEATURES]  # Features (revenue, orders, order value, recency, order gaps)
                 y = processingData['repeat_purchaser']   # Target variable (repeat_purchaser)
                 x_col,y_col = st.columns(2)
                 self.X, self.y  = X, y
@@ -256,50 +727,12 @@ class SimpleLogisticRegressionApp():
             tuple: Trained model, average metrics, and fold-wise metrics.
         """
         try:
-            n_folds = k
-            skf = StratifiedKFold(n_splits=n_folds)
-            x_label = self.standardizer.fit_transform(X)
-            y_label = np.ravel(y)
-            
-            #initialize the testing metric to update the test metrics 
-            test_accuracy, test_precision, test_recall, test_f1, test_time = np.zeros((5,n_folds))
-            
-            #iterate nfolds to fit the model and find metrics of each folds
-            for i, (train_index, test_index) in enumerate(skf.split(x_label, y_label)):
-                
-                # Measure execution time
-                start_time = time.time()
-            
-                self.model.fit(x_label[train_index], y_label[train_index])
-                y_pred = self.model.predict(x_label[test_index])
-                
-                # Calculate execution time
-                end_time = time.time()
-                
-                # performance metrics
-                test_accuracy[i] = accuracy_score(y_label[test_index], y_pred)
-                test_precision[i] = precision_score(y_label[test_index], y_pred)
-                test_recall[i] = recall_score(y_label[test_index], y_pred)
-                test_f1[i] = f1_score(y_label[test_index], y_pred)
-                test_time[i]= end_time - start_time
-            
-            #combine the matrics array to a dataframe
-            kfold_metric = pd.DataFrame(index=[f"fold-{x+1}" for x in range(n_folds)],
-                                    columns=['Accuracy', 'Precision', 'Recall', 'F1score','Time'])
-            kfold_metric['Accuracy'] = test_accuracy
-            kfold_metric['Precision'] = test_precision
-            kfold_metric['Recall'] = test_recall
-            kfold_metric['F1score'] = test_f1
-            kfold_metric['Time'] = test_time
-            
-            #find the mean and standar deviation of the validations metrics
-            average_metric = pd.DataFrame(index=['Mean','Standard Deviation'],
-                                    columns=['Accuracy', 'Precision', 'Recall', 'F1score','Time'])
-            average_metric['Accuracy'] = test_accuracy.mean(),test_accuracy.std()
-            average_metric['Precision'] = test_precision.mean(),test_precision.std()
-            average_metric['Recall'] = test_recall.mean(),test_recall.std()
-            average_metric['F1score'] = test_f1.mean(),test_f1.std()
-            average_metric['Time'] = test_time.mean(),test_time.std()
+            # train the model, or load the one already trained on the current data
+            artifact = get_trained_lr_model(X, y, k)
+            self.model = artifact['model']
+            self.standardizer = artifact['standardizer']
+            self.feature_defaults = artifact['feature_defaults']
+            average_metric, kfold_metric = artifact['average_metric'], artifact['kfold_metric']
             
             self.performance_metrics = average_metric
             self.validation_metrics = kfold_metric
@@ -312,14 +745,87 @@ class SimpleLogisticRegressionApp():
         Predict Customer Repeat Purchase Behavior.
 
         Parameters:
-            data (DataFrame): Input data with `total_revenue` and `total_orders`.
+            data (DataFrame): Input data with `total_revenue` and `total_orders`; the
+                other features are filled with their training medians when missing.
 
         Returns:
             ndarray: Prediction result (1 for repeat purchaser, 0 for non-repeat).
         """
         try:
-            predict_data = self.standardizer.fit_transform(data)
+            predict_data = self.standardizer.transform(model_features(data, self.feature_defaults)) # Scale with the training statistics
             y_predict = self.model.predict(predict_data)
             return y_predict
         except Exception:
-            return st.error("something went wrong on prediction!")
\ No newline at end of file
+            return st.error("something went wrong on prediction!")
+
+    def predict_batch(self, data):
+        """
+        Predict Repeat Purchase Behavior for Many Customers.
+
+        Parameters:
+            data (DataFrame): Customers with `total_revenue` and `total_orders`.
+
+        Returns:
+            DataFrame: `repeat_probability` and `repeat_purchaser` of every customer.
+        """
+        try:
+            return score_batch(self.model, self.standardizer, data, self.feature_defaults)
+        except Exception:
+            return st.error("something went wrong on prediction!")
+
+    def score_all_customers(self, k=5, chunksize=SCORE_CHUNK_SIZE, online=False):
+        """
+        Score Every Customer into the `customer_scores` Table.
+
+        Uses the model trained on the current data with `k` folds, training it
+        first when no persisted model exists, or the online model after updating
+        it with the changed customers.
+
+        Parameters:
+            k (int): Number of folds for cross-validation (default is 5).
+            chunksize (int): Number of customers per chunk (default is `SCORE_CHUNK_SIZE`).
+            online (bool): Score with the online model (default is False).
+
+        Returns:
+            int: Number of customers scored (0 when no orders are imported).
+        """
+        try:
+            engine = get_db_connection()
+            if engine:
+                if get_feature_reference_date() is None:
+                    return 0 # No orders imported yet: nothing to train on or score
+                if online:
+                    self.update_online_model(chunksize)
+                else:
+                    X, y = self.data_preprocessing_for_model_build()
+                    self.validate_the_lr_model(X, y, k)
+                return score_all_customers(engine, self.model, self.standardizer, chunksize, self.feature_defaults)
+            return None
+        except Exception:
+            return st.error("something went wrong on scoring!")
+
+    def update_online_model(self, chunksize=SCORE_CHUNK_SIZE):
+        """
+        Switch to the Online Model After Updating it with the Changed Customers.
+
+        Subsequent predictions use the online model.
+
+        Parameters:
+            chunksize (int): Number of customers per chunk (default is `SCORE_CHUNK_SIZE`).
+
+        Returns:
+            int: Number of customers consumed by the update (0 when no orders are imported).
+        """
+        try:
+            engine = get_db_connection()
+            if engine:
+                artifact = update_online_model(engine, chunksize)
+                if artifact is None:
+                    return 0 # No orders imported yet
+                self.model = artifact['model']
+                self.standardizer = artifact['standardizer']
+                self.feature_defaults = artifact['feature_defaults']
+                return artifact['customers_consumed']
+            return None
+        except Exception:
+            return st.error("something went wrong on the online update!")
@@ -9,10 +9,25 @@ and key metrics on the dashboard page of the Streamlit app. It includes:
 3. Key metrics display: Shows summary statistics for total revenue, unique customers, 
    and number of orders.
 
+The slider bounds, charts and metrics come from one `get_dashboard_snapshot` call.
+`home()` in `app.py` fetches it together with the filtered tables and the revenue
+series through `fetch_dashboard_data`, which runs these independent queries
+concurrently (see `db.concurrency`) with the filter values of the widgets' session
+state, and passes the joined results to each function before anything is drawn.
+
+With the "Approximate overview" toggle on (initially `approximate_mode` of the
+`[delivergate_db]` secrets section), the slider bounds and summary metrics are
+estimated from the sketches maintained at import instead of the snapshot's full
+scans, and shown with their 95% intervals.
+
 Functions:
+- fetch_dashboard_data: Runs every query of a dashboard render concurrently and returns the results.
+- orders_page_cursors: Returns the page cursors of the orders table for the current filters.
 - data_filtering: Displays sidebar filters and filtered data tables for orders and customers.
+- orders_page_display: Displays one page of the filtered orders with previous/next navigation.
 - dashboard_data_visualization: Creates bar and line charts to visualize top customers by revenue
   and total revenue over time.
+- metric_value: Formats a metric, marking estimates and their interval.
 - dashboard_key_metrics_display: Displays summary metrics including total revenue, unique customers, 
   and order count.
 """
@@ -20,16 +35,111 @@ import streamlit as st # Main library for app interface
 from db.db_connector import get_db_connection # Database connection function
 import pandas as pd # Data manipulation library
 from db.filter import ( # Import filter functions for data processing
-    filter_data_by_sidebar,
-    get_max_filter_amount,
+    filter_orders_page,
+    count_filtered_orders,
     filter_customer_by_amount,
-    top_customer_by_revenue,
+    get_dashboard_snapshot,
     get_total_over_time,
-    get_total_summery
+    get_max_filter_amount,
+    get_total_summery,
+    get_spend_quantiles,
+    top_customer_by_revenue
 )
+from db.db_connector import get_db_setting # Initial approximate mode
+from db.sketches import Estimate # Estimated metrics of the approximate mode
 import calendar # Standard library for working with dates
+import math # Page count of the orders table
+from db.instrumentation import instrumented, record_error # Call timings and failures for the debug panel
+from db.concurrency import run_concurrently # Independent queries of a render run at the same time
+
+# Page sizes offered for the orders table
+ORDERS_PAGE_SIZES = [50, 100, 500, 1000]
+
+# Granularities offered for the revenue chart, with their axis labels
+REVENUE_GRANULARITIES = {'day': 'Day', 'week': 'Week', 'month': 'Month', 'year': 'Year'}
+
+def orders_page_cursors(date_range, min_amount, min_orders, page_size):
+    """
+    Return the Page Cursors of the Orders Table.
+
+    The cursors of the pages visited so far are kept in the session state and reset
+    to the first page whenever the filters or the page size change.
+
+    Parameters:
+        date_range (tuple): A tuple containing the start and end dates for filtering.
+        min_amount (float): The minimum amount spent by customers for filtering.
+        min_orders (int): The minimum number of orders placed by customers for filtering.
+        page_size (int): The number of orders per page.
+
+    Returns:
+        list: Cursor of every visited page, the current page last (None for the first page).
+    """
+    filters = (tuple(date_range), min_amount, min_orders, page_size)
+    if st.session_state.get('orders_page_filters') != filters:
+        st.session_state['orders_page_filters'] = filters
+        st.session_state['orders_page_cursors'] = [None]
+    return st.session_state['orders_page_cursors']
+
+@instrumented
+def fetch_dashboard_data():
+    """
+    Run Every Query of a Dashboard Render Concurrently.
+
+    The filter values are read from the session state of the sidebar and page
+    widgets (their defaults on the first render), so the queries can start before
+    the widgets are drawn.
+
+    Returns:
+        dict: `snapshot` (result of `get_dashboard_snapshot`), `customers`,
+        `orders_page`, `order_count` and, unless the snapshot's monthly series is
+        shown, `total_over_time`.
+    In approximate mode the snapshot is assembled from the top customers, the
+    monthly revenue rollup and the sketch estimates of the bounds and metrics, and
+    `spend_quantiles` is added.
+    """
+    date_range = st.session_state.get('order_date_range') or []
+    min_amount = st.session_state.get('min_amount', 0)
+    min_orders = st.session_state.get('min_orders', 0)
+    page_size = st.session_state.get('orders_page_size', ORDERS_PAGE_SIZES[1])
+    granularity = st.session_state.get('revenue_granularity', 'month')
+    cursor = orders_page_cursors(date_range, min_amount, min_orders, page_size)[-1]
+    
+    calls = {
+        'snapshot': (get_dashboard_snapshot, ()),
+        'customers': (filter_customer_by_amount, (min_amount, min_orders)),
+        'orders_page': (filter_orders_page, (date_range, min_amount, min_orders, page_size, cursor)),
+        'order_count': (count_filtered_orders, (date_range, min_amount, min_orders)),
+    }
+    if granularity != 'month' or len(date_range) == 2:
+        calls['total_over_time'] = (get_total_over_time, (granularity, tuple(date_range) if len(date_range) == 2 else None))
+    
+    # Approximate mode: replace the snapshot's full scans with the sketches
+    approximate = st.session_state.get('approximate_mode', bool(get_db_setting("approximate_mode", False)))
+    if approximate:
+        del calls['snapshot']
+        calls.update({
+            'top_customers': (top_customer_by_revenue, (10,)),
+            'monthly_revenue': (get_total_over_time, ('month',)),
+            'bounds': (get_max_filter_amount, (True,)),
+            'summary': (get_total_summery, (True,)),
+            'spend_quantiles': (get_spend_quantiles, ()),
+        })
+    results = run_concurrently(calls)
+    
+    if approximate:
+        parts = [results['top_customers'], results['monthly_revenue'], results['bounds'], results['summary']]
+        failed = [part for part in parts if not isinstance(part, (pd.DataFrame, tuple))]
+        results['snapshot'] = failed[0] if failed else {
+            'max_amount': results['bounds'][0],
+            'max_count': results['bounds'][1],
+            'summary': results['summary'],
+            'top_customers': results['top_customers'],
+            'total_over_time': results['monthly_revenue'],
+        }
+    return results
 
-def data_filtering():
+@instrumented
+def data_filtering(snapshot=None, results=None):
     """
     Display Data Filters and Filtered Data Tables.
 
@@ -38,25 +148,35 @@ def data_filtering():
     - Displays filtered data tables for "Orders Data with Customers" and "Customers Data" 
       based on selected filters.
 
+    Parameters:
+        snapshot (dict): Result of `get_dashboard_snapshot`, fetched when not given.
+        results (dict): Result of `fetch_dashboard_data`; the tables are fetched when not given.
+
     Raises:
         Exception: Catches errors related to data filtering and displays an error message.
     """
     try:
         # Get the maximum values for the sidebar sliders
-        sidebar_max_amount, sidebar_max_order = get_max_filter_amount()
+        snapshot = snapshot or get_dashboard_snapshot()
+        sidebar_max_amount, sidebar_max_order = snapshot['max_amount'], snapshot['max_count']
         
         # Sidebar Filter Configuration
         st.sidebar.subheader("Data Filters")
         st.sidebar.write("let's apply some filters to play around the data.")
         
         # Define sidebar filters for date range, minimum amount, and minimum orders
-        date_range = st.sidebar.date_input('Order Date Range',[])
-        min_amount = st.sidebar.slider('Filter By Total Spent', min_value=0, max_value=sidebar_max_amount)
-        min_orders = st.sidebar.slider('Min Number Of Orders Placed By A Customer',min_value=0, max_value=sidebar_max_order)
+        st.sidebar.toggle('Approximate overview', value=bool(get_db_setting("approximate_mode", False)),
+                          key='approximate_mode', help="Estimate the bounds and metrics from sketches maintained at import")
+        date_range = st.sidebar.date_input('Order Date Range',[], key='order_date_range')
+        min_amount = st.sidebar.slider('Filter By Total Spent', min_value=0, max_value=sidebar_max_amount, key='min_amount')
+        min_orders = st.sidebar.slider('Min Number Of Orders Placed By A Customer',min_value=0, max_value=sidebar_max_order,
+                                       key='min_orders')
 
         # Filter data based on sidebar input
-        filter_orders = filter_data_by_sidebar(date_range, min_amount, min_orders)
-        filter_customers = filter_customer_by_amount(min_amount, min_orders)
+        if results is None:
+            filter_customers = filter_customer_by_amount(min_amount, min_orders)
+        else:
+            filter_customers = results['customers'] # Fetched concurrently before drawing
 
         # Page Header and Information
         st.header("Delivergate Data Engineering")
@@ -72,7 +192,7 @@ def data_filtering():
                 and the total amount spent by the customer is above {min_amount}, 
                 and the total number of orders place by the perticular customer is above {min_orders}
             """)
-            st.dataframe(filter_orders) # Display the filtered customers data
+            orders_page_display(date_range, min_amount, min_orders, results) # Display one page of the filtered orders
             
         with tab2:
             st.write("## Customers Data")
@@ -83,42 +203,122 @@ def data_filtering():
             """)
             st.dataframe(filter_customers) # Display the filtered customers data
             
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.error("Error in filtering the data!") # Display error if filtering fails
         
-def dashboard_data_visualization():
+@instrumented
+def orders_page_display(date_range, min_amount, min_orders, results=None):
+    """
+    Display One Page of the Filtered Orders.
+
+    Only the visible page is fetched, using the (order_date, order_id) cursor of the
+    previous page, and the total is read with a separate count query. The cursors of
+    the pages visited so far are kept in the session state so the user can go back;
+    they are reset whenever the filters or the page size change.
+
+    Parameters:
+        date_range (tuple): A tuple containing the start and end dates for filtering.
+        min_amount (float): The minimum amount spent by customers for filtering.
+        min_orders (int): The minimum number of orders placed by customers for filtering.
+        results (dict): Result of `fetch_dashboard_data`; the page is fetched when not given.
+    """
+    page_size = st.selectbox('Orders per page', ORDERS_PAGE_SIZES, index=1, key='orders_page_size')
+    
+    # Start from the first page whenever the filters or the page size change
+    cursors = orders_page_cursors(date_range, min_amount, min_orders, page_size)
+    
+    # Fetch the current page and the total number of matching orders
+    if results is None:
+        orders_page, next_cursor = filter_orders_page(date_range, min_amount, min_orders, page_size, cursors[-1])
+        total_orders = count_filtered_orders(date_range, min_amount, min_orders)
+    else:
+        (orders_page, next_cursor), total_orders = results['orders_page'], results['order_count']
+    # Display the current page of the filtered orders, showing the compacted datetime64 dates as dates
+    st.dataframe(orders_page, column_config={'order_date': st.column_config.DateColumn('order_date')})
+    
+    # Previous / next navigation
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        st.button('Previous', on_click=cursors.pop, disabled=len(cursors) == 1, use_container_width=True)
+    with col2:
+        st.write(f"Page {len(cursors)} of {max(1, math.ceil(total_orders / page_size))} ({total_orders} orders)")
+    with col3:
+        st.button('Next', on_click=cursors.append, args=(next_cursor,), disabled=next_cursor is None,
+                  use_container_width=True)
+
+@instrumented
+def dashboard_data_visualization(snapshot=None, results=None):
     """
     Display Data Visualizations.
 
     This function creates:
     - A bar chart showing the top 10 customers by revenue.
-    - A line chart displaying total revenue over time.
+    - A line chart displaying total revenue per day, week, month or year, read from the
+      daily revenue rollup and limited to the sidebar date range when one is selected.
     
+    Parameters:
+        snapshot (dict): Result of `get_dashboard_snapshot`, fetched when not given.
+        results (dict): Result of `fetch_dashboard_data`; the revenue series is fetched when not given.
+
     Raises:
         Exception: Catches errors related to data visualization and displays an error message.
     """
     try:
         # Display top 10 customers by revenue
         st.subheader('Top 10 Customers by Revenue') 
-        filter_top_customer = top_customer_by_revenue(10)
+        snapshot = snapshot or get_dashboard_snapshot()
+        filter_top_customer = snapshot['top_customers']
         st.bar_chart(filter_top_customer,y="spent_amount", x="customer_name",x_label='Customer',y_label='Total Spent')
 
-        # Display total revenue over time with month and year
-        grouped_date = get_total_over_time()
+        # Display total revenue over time at the selected granularity and sidebar date range
+        st.subheader('Total Revenue Over Time')
+        granularity = st.selectbox('Revenue per', list(REVENUE_GRANULARITIES), index=2,
+                                   format_func=REVENUE_GRANULARITIES.get, key='revenue_granularity')
+        date_range = tuple(st.session_state.get('order_date_range') or ())
+        if granularity == 'month' and len(date_range) != 2:
+            grouped_date = snapshot['total_over_time'].copy() # Monthly series already in the snapshot
+        elif results is not None and 'total_over_time' in results:
+            grouped_date = results['total_over_time'] # Fetched concurrently before drawing
+        else:
+            grouped_date = get_total_over_time(granularity, date_range if len(date_range) == 2 else None)
         grouped_date.drop(['order_count'], axis=1, inplace=True)
         
-        # Convert month number to abbreviated month name for clarity
-        grouped_date['order_month'] = grouped_date['order_month'].apply(lambda x: calendar.month_abbr[x])
-        grouped_date['month_with_year'] = grouped_date['order_year'].astype(str) +" - "+ grouped_date['order_month']
+        # Label months as "year - abbreviated month name", years by number and days/weeks by date
+        if granularity == 'month':
+            grouped_date['order_month'] = grouped_date['order_month'].apply(lambda x: calendar.month_abbr[x])
+            grouped_date['period'] = grouped_date['order_year'].astype(str) +" - "+ grouped_date['order_month']
+        elif granularity == 'year':
+            grouped_date['period'] = grouped_date['order_year'].astype(str)
+        else:
+            grouped_date['period'] = grouped_date['period_start'].astype(str)
         
-        # display header and line chart of the Total Revenue Over Time
-        st.subheader('Total Revenue Over Time')
-        st.line_chart(grouped_date,y='spent_amount', x='month_with_year', color='#ffaa00', x_label='Month',y_label='total revenue')
+        # display line chart of the Total Revenue Over Time
+        st.line_chart(grouped_date,y='spent_amount', x='period', color='#ffaa00',
+                      x_label=REVENUE_GRANULARITIES[granularity],y_label='total revenue')
     
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.error("Error in visualizing data required to draw chart!") # Display error if visualization fails
 
-def dashboard_key_metrics_display():
+def metric_value(value):
+    """
+    Format a Metric, Marking Estimates.
+
+    Parameters:
+        value: Exact metric, or an `Estimate` of the approximate mode.
+
+    Returns:
+        tuple: Displayed value and the help text with the 95% interval (None when exact).
+    """
+    if isinstance(value, Estimate):
+        if value.low == value.high:
+            return f"{value.value:,.0f}", None
+        return f"≈ {value.value:,.0f}", f"95% interval: {value.low:,.0f} – {value.high:,.0f}"
+    return f"{value}", None
+
+@instrumented
+def dashboard_key_metrics_display(snapshot=None, results=None):
     """
     Display Key Metrics on Dashboard.
 
@@ -127,27 +327,43 @@ def dashboard_key_metrics_display():
     - Number of unique customers
     - Number of orders
 
-    The metrics are displayed in three columns for a clean layout.
+    The metrics are displayed in three columns for a clean layout. Estimated metrics
+    are marked with "≈" and carry their 95% interval in the help text.
     
+    Parameters:
+        snapshot (dict): Result of `get_dashboard_snapshot`, fetched when not given.
+        results (dict): Result of `fetch_dashboard_data`; its spend quantiles are shown in approximate mode.
+
     Raises:
         Exception: Catches errors related to displaying metrics and shows an error message.
     """
     try:
         # Retrieve key metrics for display
         st.subheader('Summary Metrics')
-        total_revenue,total_customers,total_orders=get_total_summery()
+        snapshot = snapshot or get_dashboard_snapshot()
+        total_revenue,total_customers,total_orders=snapshot['summary']
         
         # Display metrics in columns for better readability
         col1, col2, col3 = st.columns(3)
         with col1:
             #display total revenue in metric output
-            st.metric(label=f"Total Revenue", value=f"{total_revenue}", delta="")
+            value, interval = metric_value(total_revenue)
+            st.metric(label=f"Total Revenue", value=value, delta="", help=interval)
         with col2:
             #display Number of unique customers in metric output
-            st.metric(label=f"Number of unique customers", value=f"{total_customers}", delta="")
+            value, interval = metric_value(total_customers)
+            st.metric(label=f"Number of unique customers", value=value, delta="", help=interval)
         with col3:
             #display Number of orders in metric output
-            st.metric(label=f"Number of orders", value=f"{total_orders}", delta="")
+            value, interval = metric_value(total_orders)
+            st.metric(label=f"Number of orders", value=value, delta="", help=interval)
+        
+        # Spend distribution estimated from the sketches in approximate mode
+        spend_quantiles = (results or {}).get('spend_quantiles')
+        if isinstance(spend_quantiles, pd.DataFrame) and not spend_quantiles.empty:
+            st.write("Spend percentiles (estimated within 1%)")
+            st.dataframe(spend_quantiles, hide_index=True)
 
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.error("Error in retrieving metrics data!")  # Display error if metrics retrieval fails
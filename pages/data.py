@@ -4,23 +4,67 @@ Data Upload Page Module for Streamlit Application
 This module manages the "Data Page" in the Streamlit app, allowing users to import customers 
 and orders data from CSV files into a MySQL database. The page displays brief information about the data 
 and guides users on how to upload it. The `data_read_write` function handles data insertion to the database.
+The previews are only loaded after "Read more" is clicked, limited to the first rows of each
+file. Row counts and column statistics are computed on request in one streaming pass over the
+file (or its typed Parquet snapshot, see `db.csv_snapshot`) and cached until a file changes.
 
 Functions:
 - data_upload_page_display: Displays the UI for data upload and handles button actions for data import.
+- data_preview_display: Displays the first rows and the column statistics of one CSV file.
 """
 #import necessory libraries
 import streamlit as st # Streamlit library for app interface
 from db.data_import import data_read_write # Function for reading and writing data to MySQL
-import pandas as pd # Library for data manipulation
+from db.data_import import CUSTOMERS_CSV, ORDERS_CSV, CUSTOMER_DTYPES, ORDER_DTYPES, ORDER_DATE_COLUMNS # Source files and parsing options
+from db.csv_snapshot import read_source_head, get_source_stats # Bounded previews and cached statistics
+from db.instrumentation import instrumented, record_error # Call timings and failures for the debug panel
 
+# Rows shown in each preview by default, and the largest preview offered
+PREVIEW_ROWS = 100
+MAX_PREVIEW_ROWS = 10000
+
+def toggle_data_preview():
+    """
+    Show or Hide the Dataset Previews.
+    """
+    st.session_state['show_data_preview'] = not st.session_state.get('show_data_preview', False)
+
+@instrumented
+def data_preview_display(title, path, dtype=None, parse_dates=None, nrows=PREVIEW_ROWS):
+    """
+    Display the First Rows and the Column Statistics of a CSV File.
+
+    The first rows are shown right away; the row count and column statistics need
+    a pass over the whole file and are only computed once their toggle is switched on.
+
+    Parameters:
+        title (str): Heading of the preview.
+        path (str): Path of the CSV file.
+        dtype (dict): Optional column types passed to `pd.read_csv`.
+        parse_dates (list): Optional CSV columns parsed as datetimes.
+        nrows (int): Number of rows shown (default is `PREVIEW_ROWS`).
+    """
+    head_df = read_source_head(path, nrows, dtype, parse_dates)
+    st.write(title, f"first {len(head_df):,} rows")
+    st.dataframe(head_df)
+    
+    # Row count and column statistics, read in a full pass only when asked for
+    if st.toggle('Column statistics', key=f"data_stats_{title}"):
+        row_count, column_stats = get_source_stats(path, dtype, parse_dates)
+        st.write(f"{row_count:,} rows")
+        st.dataframe(column_stats, hide_index=True)
+
+@instrumented
 def data_upload_page_display():
     """
     Display the Data Upload Page.
 
     This function renders the UI for the data upload page, including:
     - A header and brief instructions for data upload.
-    - Two main buttons: "Import Data" for uploading CSV data to MySQL and "Read More" for additional info.
-    - Sample data tables displaying data from customers.csv and order.csv.
+    - Three main buttons: "Import Data" for uploading CSV data to MySQL, "Incremental Import" for
+      loading only new orders and changed customers, and "Read More" to show or hide additional info.
+    - Sample data tables with the first rows of customers.csv and order.csv, read only while
+      "Read More" is open, and their row counts and column statistics on request.
     - Column name mapping information for how data is standardized in the database.
     """
     try:
@@ -29,10 +73,6 @@ def data_upload_page_display():
         st.write("lets import the dataset by clicking the Import Data button."
                  "it will make your dataset uploaded to mysql database.")
         
-        # Load the data from CSV files for display
-        customer_data = pd.read_csv("data/customers.csv")
-        order_data = pd.read_csv("data/order.csv")
-        
         # Layout for buttons and interactive actions
         col1, col2, col3, col4, col5 =st.columns(5) # Columns for button layout
         with col1:
@@ -40,23 +80,28 @@ def data_upload_page_display():
             st.button('Import Data', on_click=data_read_write, use_container_width=True)
             
         with col2:
+            # Button to load only new orders and changed customers
+            st.button('Incremental Import', on_click=data_read_write, kwargs={'incremental': True}, use_container_width=True)
+            
+        with col3:
             # "Read More" button to provide additional information
-            readmore_button = st.button("Read more", use_container_width=True)
+            st.button("Read more", on_click=toggle_data_preview, use_container_width=True)
         
-        # Display additional information when "Read More" is clicked
-        if readmore_button:
+        # Display additional information when "Read More" is clicked, reading the files only then
+        if st.session_state.get('show_data_preview', False):
             st.write("""
                 This is part of the Delivergate Data Engineering project.
                 The data provided here includes two datasets: Customers and Orders, both in .csv format.
                 Below are previews of each dataset:
             """)
             
-            # Display sample data from both CSVs
+            # Display the first rows and column statistics of both CSVs
+            nrows = st.number_input('Preview rows', min_value=1, max_value=MAX_PREVIEW_ROWS, value=PREVIEW_ROWS)
             col1, col2 = st.columns(2)
             with col1:
-                st.write("Customers.csv",customer_data, "** Note **")
+                data_preview_display("Customers.csv", CUSTOMERS_CSV, CUSTOMER_DTYPES, nrows=nrows)
             with col2:
-                st.write("Orders.csv",order_data)
+                data_preview_display("Orders.csv", ORDERS_CSV, ORDER_DTYPES, ORDER_DATE_COLUMNS, nrows=nrows)
             
             # Explain changes in column names to align with database schema
             st.write("""
@@ -81,6 +126,7 @@ def data_upload_page_display():
                     id -> order_id
                     created_at -> order_date
                 """)
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         # Display error message if CSV file paths are incorrect
         return st.error("data path not correct!")
@@ -8,6 +8,7 @@ It organizes the page into three main sections:
 3. Predictions: Provides an interface for users to input values and make predictions.
 
 Functions:
+- get_ml_app: Returns the model app of the current session.
 - ml_prediction_display: Displays prediction input fields and prediction results based on user input.
 - ml_data_processing_display: Organizes and displays the machine learning page with tabs for data processing, 
   validation, and prediction.
@@ -17,10 +18,23 @@ import streamlit as st # Streamlit for app interface
 from db.db_connector import get_db_connection # Database connection function
 import pandas as pd # Data manipulation library
 from ml_model import StreamlitLogisticRegressionApp # Import custom logistic regression class
+from db.instrumentation import instrumented, record_error # Call timings and failures for the debug panel
 
-# Initialize the ML model app
-ml_app = StreamlitLogisticRegressionApp()
+def get_ml_app():
+    """
+    Return the Model App of the Current Session.
+
+    Each session holds its own app instance, so the model one session loads is
+    never swapped out by another session choosing a different fold count.
+
+    Returns:
+        StreamlitLogisticRegressionApp: The session's model app.
+    """
+    if 'ml_app' not in st.session_state:
+        st.session_state.ml_app = StreamlitLogisticRegressionApp()
+    return st.session_state.ml_app
 
+@instrumented
 def ml_prediction_display():
     """
     Display Prediction Interface for Machine Learning Model.
@@ -55,7 +69,7 @@ def ml_prediction_display():
             data['total_orders'] = total_orders #assign data frame value
             
             # Predict using the ML model
-            y = ml_app.predict_data_from_model(data)
+            y = get_ml_app().predict_data_from_model(data)
             
             # Display prediction result and status message
             if y == 0:
@@ -64,9 +78,11 @@ def ml_prediction_display():
                 st.success("Great! This customer is repeat purchaser") #success status message display
             st.write("see the predicted output below",y) #display predicted value of the given user input
             
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.error("something went wrong on prediction") # Error message if prediction fails
         
+@instrumented
 def ml_data_processing_display():
     """
     Display and Organize Machine Learning Page.
@@ -88,6 +104,8 @@ def ml_data_processing_display():
         """)
         st.write("here we use 3 tabs to seperate sections to make this visualy appealing") # paragraph
         
+        ml_app = get_ml_app() # Model app of this session
+        
         # Create tabs for Data Processing, Validation, and Predictions
         data_process_tab, validate_tab, model_tab = st.tabs(['Data Processing','Validations','Predictions'])
         
@@ -112,6 +130,7 @@ def ml_data_processing_display():
             # within the predictions tab
             ml_prediction_display()
         return None
-    except Exception:
+    except Exception as e:
+        record_error(e) # Keep the failure visible in the metrics
         return st.error("something went wrong!") #return error status message
         
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""
+Batch Scoring Script for the Repeat Purchaser Model
+
+This script scores the repeat purchase probability of every customer with the
+model trained on the current data (training it first if needed) and writes the
+results to the `customer_scores` table. With `--online`, the online model is first
+updated with the customers changed since its last update and used for scoring. It is meant to run as a nightly job from
+the project directory, so that `.streamlit/secrets.toml` is found:
+
+    python score_customers.py --folds 5
+    python score_customers.py --online
+
+Functions:
+- main: Parses the command line and scores all customers.
+"""
+import argparse # Command line options
+import time # Duration of the run
+from ml_model import SimpleLogisticRegressionApp, SCORE_CHUNK_SIZE # Model and batch scoring
+
+def main():
+    """
+    Parse the Command Line and Score All Customers.
+    """
+    parser = argparse.ArgumentParser(description="Score the repeat purchase probability of every customer.")
+    parser.add_argument('--folds', type=int, default=5, help="Folds of the model validation (default: 5).")
+    parser.add_argument('--chunksize', type=int, default=SCORE_CHUNK_SIZE,
+                        help=f"Customers scored per chunk (default: {SCORE_CHUNK_SIZE}).")
+    parser.add_argument('--online', action='store_true',
+                        help="Update the online model with the changed customers and score with it.")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    scored = SimpleLogisticRegressionApp().score_all_customers(args.folds, args.chunksize, online=args.online)
+    if not isinstance(scored, int):
+        raise SystemExit("Scoring failed, check the database connection and the imported data.")
+    if scored == 0:
+        print("No orders imported yet, nothing to score.")
+        return
+    print(f"Scored {scored} customers in {time.perf_counter() - start_time:.1f}s.")
+
+if __name__ == '__main__':
+    main()
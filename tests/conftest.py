@@ -0,0 +1,86 @@
+"""
+Shared Fixtures for the Test Suite
+
+The tests run the application code against embedded SQLite databases, so they need
+neither a MySQL server nor `secrets.toml`. Every test gets its own database file and
+working directory (for the Parquet snapshots), selected through the `DATABASE_URL`
+environment variable read by `db.db_connector`.
+
+Fixtures:
+- source_csvs: Synthetic customers and orders CSV files, split for incremental imports.
+- use_database: Points the shared engine at a new SQLite file.
+- imported: A database holding a full import of the synthetic CSV files.
+"""
+import pandas as pd # Splitting the generated CSV files
+import pytest # Fixtures
+from benchmark import generate_customers, generate_orders # Synthetic data in the CSV export format
+from db.cache import clear_cache, _data_version # Query cache and data version token of the process
+from db.data_import import data_read_write # Import under test
+from db.db_connector import _create_engine, get_db_connection # Shared engine
+
+# Size of the generated data: enough for several pages and chunks, small enough for SQLite
+N_CUSTOMERS = 300
+N_ORDERS = 3000
+
+# Customers and orders of the first import; the rest arrives with the incremental import
+FIRST_CUSTOMERS = 250
+FIRST_ORDERS = 2000
+
+@pytest.fixture(scope='session')
+def source_csvs(tmp_path_factory):
+    """
+    Write the Synthetic CSV Files.
+
+    Returns:
+        dict: Paths of the complete `customers`/`orders` files and of the
+        `customers_first`/`orders_first` files of the first import. The complete
+        customers file also changes the email of one customer of the first import.
+    """
+    directory = tmp_path_factory.mktemp('csv')
+    paths = {name: str(directory / f"{name}.csv") for name in ('customers', 'orders', 'customers_first', 'orders_first')}
+    generate_customers(paths['customers'], N_CUSTOMERS, seed=1)
+    generate_orders(paths['orders'], N_ORDERS, N_CUSTOMERS, seed=1)
+
+    # Cents in a quarter of the amounts, so amounts are not all whole numbers
+    orders = pd.read_csv(paths['orders'])
+    orders['total_amount'] = orders['total_amount'] + (orders['id'] % 4) * 0.25
+    orders.to_csv(paths['orders'], index=False)
+    orders[orders['id'] <= FIRST_ORDERS].to_csv(paths['orders_first'], index=False)
+
+    customers = pd.read_csv(paths['customers'])
+    customers[customers['customer_id'] <= FIRST_CUSTOMERS].to_csv(paths['customers_first'], index=False)
+    customers.loc[customers['customer_id'] == 5, 'email'] = "changed@example.com"
+    customers.to_csv(paths['customers'], index=False)
+    return paths
+
+@pytest.fixture
+def use_database(tmp_path, monkeypatch):
+    """
+    Return a Function Pointing the Shared Engine at a New SQLite File.
+
+    The working directory is the test's temporary directory, so snapshots are
+    written there. The query cache and the data version token are reset with
+    every switch.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def connect(name='test.db'):
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / name}")
+        _create_engine.clear()
+        clear_cache()
+        _data_version.update(token=None, checked_at=0.0)
+        return get_db_connection()
+
+    yield connect
+    _create_engine.clear()
+    clear_cache()
+    _data_version.update(token=None, checked_at=0.0)
+
+@pytest.fixture
+def imported(use_database, source_csvs):
+    """
+    Return the Engine of a Database Holding a Full Import of the Complete CSV Files.
+    """
+    engine = use_database()
+    data_read_write(customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+    return engine
@@ -0,0 +1,25 @@
+"""
+Tests of the Benchmark Helpers
+
+A failed query must stop the benchmark instead of being timed, and the benchmark's
+snapshots must stay in its working directory.
+"""
+import os # Snapshot paths
+import pandas as pd # Query results
+import pytest # Expected failures
+import streamlit as st # Warnings returned by failed queries
+from benchmark import ORDERS_PAGE_RESULT, SUMMARY_RESULT, check_result, time_call # Helpers under test
+from db.csv_snapshot import get_snapshot_path # Snapshot location
+
+def test_failed_queries_are_not_timed():
+    with pytest.raises(RuntimeError):
+        time_call(lambda: st.warning("something went wrong on filtering!"), repeats=1, expected=pd.DataFrame)
+    with pytest.raises(RuntimeError):
+        check_result((1.0, 2), SUMMARY_RESULT)
+    check_result((1.0, 2, 3), SUMMARY_RESULT)
+    check_result((pd.DataFrame(), None), ORDERS_PAGE_RESULT)
+
+def test_snapshot_dir_environment_variable(tmp_path, monkeypatch):
+    monkeypatch.setenv('SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    snapshot_path, fingerprint_path = get_snapshot_path('orders.csv')
+    assert os.path.dirname(snapshot_path) == os.path.dirname(fingerprint_path) == str(tmp_path / 'snapshots')
@@ -0,0 +1,70 @@
+"""
+Tests of the CSV Snapshots
+
+A snapshot has to hold exactly what parsing the CSV file gives, and a file whose
+chunks parse to different types must still be readable and importable.
+"""
+import os # Snapshot files
+import numpy as np # Synthetic orders
+import pandas as pd # CSV files and frames
+import pytest # Fixtures
+from db.csv_snapshot import (SNAPSHOT_CHUNK_SIZE, ensure_snapshot, get_snapshot_path, read_source, read_source_chunks,
+                             read_source_head, get_source_stats) # Snapshots under test
+from db.data_import import data_read_write, ORDER_DTYPES, ORDER_DATE_COLUMNS # Typed import of the orders
+
+pytest.importorskip('pyarrow')
+
+@pytest.fixture
+def drifting_orders_csv(tmp_path):
+    """
+    Write Orders Whose Amounts Are Whole Numbers in the First Chunk Only.
+
+    Parsed chunk by chunk without explicit types, `total_amount` is int64 in the
+    first chunk and float64 afterwards, and `display_order_id` turns from numbers
+    into text.
+    """
+    n_orders = SNAPSHOT_CHUNK_SIZE + 10000
+    ids = np.arange(1, n_orders + 1)
+    path = tmp_path / 'orders.csv'
+    pd.DataFrame({
+        'id': ids,
+        'display_order_id': [str(i) if i <= SNAPSHOT_CHUNK_SIZE else f"X{i}" for i in ids],
+        'total_amount': np.where(ids <= SNAPSHOT_CHUNK_SIZE, 100.0, 100.5),
+        'created_at': (pd.Timestamp('2024-01-01') + pd.to_timedelta(ids, unit='min')).strftime('%Y-%m-%d %H:%M:%S'),
+        'customer_id': np.where(ids % 7 == 0, np.nan, ids % 500 + 1),
+    }).to_csv(path, index=False)
+    return str(path)
+
+def test_snapshot_matches_the_csv(use_database, drifting_orders_csv):
+    snapshot_path = ensure_snapshot(drifting_orders_csv, ORDER_DTYPES, ORDER_DATE_COLUMNS)
+    assert snapshot_path == get_snapshot_path(drifting_orders_csv)[0]
+    expected = pd.read_csv(drifting_orders_csv, dtype=ORDER_DTYPES, parse_dates=ORDER_DATE_COLUMNS)
+    snapshot_df = read_source(drifting_orders_csv, ORDER_DTYPES, ORDER_DATE_COLUMNS)
+    pd.testing.assert_frame_equal(snapshot_df, expected, check_dtype=False)
+    chunks = list(read_source_chunks(drifting_orders_csv, 25000, ORDER_DTYPES, ORDER_DATE_COLUMNS))
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected, check_dtype=False)
+
+def test_untyped_drifting_chunks_fall_back_to_the_csv(use_database, drifting_orders_csv):
+    assert ensure_snapshot(drifting_orders_csv) is None
+    chunks = list(read_source_chunks(drifting_orders_csv, SNAPSHOT_CHUNK_SIZE))
+    assert sum(len(chunk) for chunk in chunks) == SNAPSHOT_CHUNK_SIZE + 10000
+    assert chunks[-1]['total_amount'].iloc[-1] == 100.5
+
+def test_drifting_orders_import(use_database, source_csvs, drifting_orders_csv):
+    engine = use_database()
+    data_read_write(customers_csv=source_csvs['customers'], orders_csv=drifting_orders_csv)
+    loaded = pd.read_sql("SELECT COUNT(*) AS n, SUM(total_amount) AS total, COUNT(customer_id) AS with_customer "
+                         "FROM orders", con=engine).iloc[0]
+    expected = pd.read_csv(drifting_orders_csv)
+    assert loaded['n'] == len(expected)
+    assert loaded['total'] == pytest.approx(expected['total_amount'].sum())
+    assert loaded['with_customer'] == expected['customer_id'].notna().sum()
+
+def test_preview_and_statistics_build_no_snapshot(use_database, drifting_orders_csv):
+    head_df = read_source_head(drifting_orders_csv, 100, ORDER_DTYPES, ORDER_DATE_COLUMNS)
+    assert len(head_df) == 100
+    row_count, stats_df = get_source_stats(drifting_orders_csv, ORDER_DTYPES, ORDER_DATE_COLUMNS)
+    assert row_count == SNAPSHOT_CHUNK_SIZE + 10000
+    assert stats_df.set_index('column').loc['customer_id', 'nulls'] == row_count // 7
+    snapshot_path, fingerprint_path = get_snapshot_path(drifting_orders_csv)
+    assert not os.path.exists(snapshot_path) and not os.path.exists(fingerprint_path)
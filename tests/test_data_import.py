@@ -0,0 +1,109 @@
+"""
+Tests of the Data Import
+
+An incremental import on top of a first import has to leave every table in the
+same state as a full import of the complete files.
+"""
+import pandas as pd # Table contents
+import pytest # Parametrized tests
+from datetime import datetime # Score timestamp
+from sqlalchemy import insert, text # Rows of the tables outside the import
+from db.schema import customer_scores # Table written by the batch scoring
+import db.data_import # Failure injection
+from db.data_import import data_read_write, LOADED_TABLES # Import under test
+
+# Primary keys the table contents are ordered by
+TABLE_KEYS = {
+    'customers': 'customer_id',
+    'orders': 'order_id',
+    'customer_summary': 'customer_id',
+    'customer_features': 'customer_id',
+    'revenue_daily': 'order_day',
+    'top_customers': 'rank',
+}
+
+def read_table(engine, table):
+    """
+    Read a Table Ordered by its Key, Without the Import Version Stamps.
+    """
+    table_df = pd.read_sql(f"SELECT * FROM {table} ORDER BY {TABLE_KEYS[table]}", con=engine)
+    return table_df.drop(columns=['updated_version'], errors='ignore')
+
+def fail_rollup_refresh(connection, customer_ids, version):
+    """
+    Stand in for the Rollup Refresh and Fail After the New Orders Were Written.
+    """
+    raise RuntimeError("injected failure")
+
+@pytest.fixture
+def full_and_incremental(use_database, source_csvs):
+    """
+    Return the Engines of a Full Import and of a First Plus an Incremental Import.
+    """
+    incremental_engine = use_database('incremental.db')
+    data_read_write(customers_csv=source_csvs['customers_first'], orders_csv=source_csvs['orders_first'])
+    data_read_write(incremental=True, customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+    full_engine = use_database('full.db')
+    data_read_write(customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+    return full_engine, incremental_engine
+
+def test_every_loaded_table_is_covered():
+    assert set(TABLE_KEYS) == set(LOADED_TABLES)
+
+@pytest.mark.parametrize('table', sorted(TABLE_KEYS))
+def test_incremental_import_matches_full_import(full_and_incremental, table):
+    full_engine, incremental_engine = full_and_incremental
+    full_df = read_table(full_engine, table)
+    assert len(full_df) > 0
+    pd.testing.assert_frame_equal(read_table(incremental_engine, table), full_df, check_exact=False, rtol=1e-9)
+
+def test_noop_incremental_import_changes_nothing(imported, source_csvs):
+    before = {table: read_table(imported, table) for table in TABLE_KEYS}
+    data_read_write(incremental=True, customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+    for table, table_df in before.items():
+        pd.testing.assert_frame_equal(read_table(imported, table), table_df)
+
+def test_rollups_match_the_orders(imported):
+    summary = read_table(imported, 'customer_summary').set_index('customer_id')
+    expected = pd.read_sql("SELECT customer_id, SUM(total_amount) AS total_spent, COUNT(*) AS order_count "
+                           "FROM orders WHERE customer_id IS NOT NULL GROUP BY customer_id ORDER BY customer_id",
+                           con=imported).set_index('customer_id')
+    pd.testing.assert_frame_equal(summary[['total_spent', 'order_count']], expected, check_exact=False)
+
+    revenue = read_table(imported, 'revenue_daily')
+    assert revenue['order_count'].sum() == pd.read_sql("SELECT COUNT(*) AS n FROM orders", con=imported)['n'].iloc[0]
+
+    top = read_table(imported, 'top_customers')
+    ranked = expected.reset_index().sort_values(['total_spent', 'customer_id'], ascending=[False, True]).head(len(top))
+    assert top['customer_id'].tolist() == ranked['customer_id'].tolist()
+
+def test_failed_incremental_import_is_retried_in_full(use_database, source_csvs, monkeypatch):
+    retried_engine = use_database('retried.db')
+    data_read_write(customers_csv=source_csvs['customers_first'], orders_csv=source_csvs['orders_first'])
+    before = {table: read_table(retried_engine, table) for table in TABLE_KEYS}
+
+    # The failure comes after the new orders were written, and rolls them back
+    with monkeypatch.context() as patch:
+        patch.setattr(db.data_import, 'refresh_customer_summary', fail_rollup_refresh)
+        data_read_write(incremental=True, customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+    for table, table_df in before.items():
+        pd.testing.assert_frame_equal(read_table(retried_engine, table), table_df)
+
+    data_read_write(incremental=True, customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+    full_engine = use_database('full.db')
+    data_read_write(customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+    for table in TABLE_KEYS:
+        pd.testing.assert_frame_equal(read_table(retried_engine, table), read_table(full_engine, table),
+                                      check_exact=False, rtol=1e-9)
+
+def test_full_import_keeps_the_other_tables(imported, source_csvs):
+    with imported.begin() as connection:
+        first_version = connection.execute(text("SELECT version FROM data_version")).scalar()
+        customer_scores.create(connection)
+        connection.execute(insert(customer_scores).values(customer_id=1, repeat_probability=0.5, repeat_purchaser=True,
+                                                          data_version=first_version, scored_at=datetime.now()))
+    data_read_write(customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+    with imported.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM customer_scores")).scalar() == 1
+        assert connection.execute(text("SELECT version FROM data_version")).scalar() > first_version
+        assert connection.execute(text("SELECT COUNT(*) FROM sketches")).scalar() > 0
@@ -0,0 +1,89 @@
+"""
+Tests of the Compact Data Types
+
+Compacting a fetched DataFrame may only change how its values are stored, never
+the values themselves.
+"""
+from datetime import date, datetime # Date and datetime objects as returned by the drivers
+from decimal import Decimal # NUMERIC values as returned by MySQL
+import numpy as np # Column types
+import pandas as pd # Frames under test
+import pytest # Parametrized tests
+from db.cache import clear_cache # Query cache between the compacted and the plain results
+from db.dtypes import compact_frame, compact_result, pop_raw_size # Compaction under test
+from db.filter import (filter_customer_by_amount, filter_data_by_sidebar, get_customer_features, get_dashboard_snapshot,
+                       get_total_over_time) # Compacted queries
+
+def assert_same_values(compact_df, fetched_df):
+    """
+    Check that Two Frames Hold the Same Values Whatever their Column Types.
+    """
+    assert list(compact_df.columns) == list(fetched_df.columns)
+    for name in fetched_df.columns:
+        compact, fetched = compact_df[name], fetched_df[name]
+        if pd.api.types.is_datetime64_any_dtype(compact):
+            fetched = pd.to_datetime(fetched)
+        elif pd.api.types.is_numeric_dtype(compact) or fetched.map(lambda value: isinstance(value, Decimal)).any():
+            compact, fetched = compact.astype(np.float64), fetched.astype(np.float64)
+        else:
+            compact, fetched = compact.astype(object), fetched.astype(object)
+        assert compact.isna().tolist() == fetched.isna().tolist(), name
+        assert (compact[compact.notna()] == fetched[fetched.notna()]).all(), name
+
+def test_compact_frame_types_and_values():
+    fetched_df = pd.DataFrame({
+        'customer_id': np.arange(1, 9, dtype=np.int64),
+        'large_id': np.array([2 ** 40] * 8, dtype=np.int64),
+        'whole_amount': [100.0, 250.0, 1e6, 0.5, 3.25, 16777216.0, 7.0, np.nan],
+        'cent_amount': [0.1, 19.99, 5.0, 2.5, 1.01, 3.0, 9.99, 4.0],
+        'decimal_amount': [Decimal('10.50'), Decimal('3.25'), None, Decimal('1'), Decimal('2'), Decimal('8'),
+                           Decimal('9'), Decimal('0')],
+        'order_day': [date(2024, 1, day) for day in range(1, 9)],
+        'order_time': [datetime(2024, 1, 1, hour) for hour in range(8)],
+        'customer_name': ['a', 'b', 'a', 'a', None, 'b', 'a', 'b'],
+        'customer_email': pd.Series([f"{i}@example.com" for i in range(8)], dtype=object),
+    })
+    compact_df = compact_frame(fetched_df)
+    assert compact_df['customer_id'].dtype == np.int32
+    assert compact_df['large_id'].dtype == np.int64 # Does not fit in int32
+    assert compact_df['whole_amount'].dtype == np.float32
+    assert compact_df['cent_amount'].dtype == np.float64 # float32 would round the cents
+    assert compact_df['decimal_amount'].dtype == np.float32
+    assert pd.api.types.is_datetime64_any_dtype(compact_df['order_day'])
+    assert pd.api.types.is_datetime64_any_dtype(compact_df['order_time'])
+    assert isinstance(compact_df['customer_name'].dtype, pd.CategoricalDtype)
+    assert compact_df.memory_usage(deep=True).sum() < fetched_df.memory_usage(deep=True).sum()
+    assert_same_values(compact_df, fetched_df)
+
+def test_compact_frame_keeps_empty_frames():
+    fetched_df = pd.DataFrame({'customer_id': pd.Series([], dtype=np.int64), 'customer_name': pd.Series([], dtype=object)})
+    compact_df = compact_frame(fetched_df)
+    assert list(compact_df.columns) == ['customer_id', 'customer_name'] and compact_df.empty
+
+def test_compact_result_records_the_fetched_size():
+    fetched_df = pd.DataFrame({'order_id': np.arange(1000, dtype=np.int64), 'total_amount': np.ones(1000)})
+
+    @compact_result
+    def fetch():
+        return fetched_df, 7
+
+    compact_df, count = fetch()
+    assert count == 7
+    assert pop_raw_size(fetch.__qualname__) == fetched_df.memory_usage(deep=True).sum()
+    assert pop_raw_size(fetch.__qualname__) is None # Popped once
+    assert_same_values(compact_df, fetched_df)
+
+@pytest.mark.parametrize('query', [
+    lambda: filter_data_by_sidebar([], 0, 0),
+    lambda: filter_customer_by_amount(0, 0),
+    lambda: get_total_over_time('week'),
+    lambda: get_dashboard_snapshot(10)['top_customers'],
+    lambda: get_customer_features(),
+])
+def test_compacted_queries_keep_their_values(imported, monkeypatch, query):
+    compact_df = query()
+    monkeypatch.setattr('db.dtypes.get_db_setting', lambda name, default=None: False if name == 'compact_dtypes' else default)
+    clear_cache()
+    fetched_df = query()
+    assert len(fetched_df) > 0
+    assert_same_values(compact_df, fetched_df)
@@ -0,0 +1,100 @@
+"""
+Tests of the Dashboard Queries
+
+Keyset paging has to return every matching order exactly once, in order date
+order, and agree with the order count and the unpaged filter.
+"""
+from datetime import date # Date range filters
+import pandas as pd # Result frames
+import pytest # Parametrized tests
+import db.filter as dashboard_queries # Backend switch of the queries
+from db.cache import clear_cache, get_data_version # Query cache between the two backends
+from db.data_import import data_read_write # Import of the late order
+from db.memory_engine import InMemoryAnalytics # In-memory backend
+from db.filter import (count_filtered_orders, filter_data_by_sidebar, filter_orders_page, get_total_over_time,
+                       get_total_summery, top_customer_by_revenue) # Queries under test
+
+# Sidebar filters: date range, minimum amount spent and minimum order count
+FILTERS = [
+    ((date(2021, 1, 1), date(2024, 12, 31)), 0, 0),
+    ((date(2022, 3, 1), date(2023, 8, 15)), 0, 0),
+    ((date(2021, 1, 1), date(2024, 12, 31)), 5000, 3),
+    ((date(2023, 1, 1), date(2023, 1, 31)), 0, 0),
+    ((date(2030, 1, 1), date(2030, 12, 31)), 0, 0),
+]
+
+# Order placed late on the last day of a date range
+LATE_ORDER = {'id': 100000, 'display_order_id': 'LATE1', 'total_amount': 1000000.0,
+              'created_at': '2023-08-15 23:30:00', 'customer_id': 1}
+
+def read_all_pages(date_range, min_amount, min_orders, page_size):
+    """
+    Follow the Page Cursors to the Last Page.
+
+    Returns:
+        DataFrame: The orders of all pages, in page order.
+    """
+    pages, cursor = [], None
+    while True:
+        page_df, cursor = filter_orders_page(date_range, min_amount, min_orders, page_size, cursor)
+        assert len(page_df) <= page_size
+        pages.append(page_df)
+        if cursor is None:
+            return pd.concat(pages, ignore_index=True)
+
+@pytest.mark.parametrize('date_range, min_amount, min_orders', FILTERS)
+@pytest.mark.parametrize('page_size', [25, 100])
+def test_pages_return_every_order_once(imported, date_range, min_amount, min_orders, page_size):
+    orders_df = read_all_pages(date_range, min_amount, min_orders, page_size)
+    assert orders_df['order_id'].is_unique
+    assert len(orders_df) == count_filtered_orders(date_range, min_amount, min_orders)
+
+    expected = filter_data_by_sidebar(date_range, min_amount, min_orders)
+    assert set(orders_df['order_id']) == set(expected['order_id'])
+
+    assert orders_df['order_date'].is_monotonic_increasing # Pages follow the order timestamps
+
+def test_filtered_orders_match_sql(imported):
+    date_range, min_amount, min_orders = FILTERS[2]
+    expected = pd.read_sql(
+        "SELECT o.order_id FROM orders o JOIN customer_summary s ON o.customer_id = s.customer_id "
+        "WHERE o.order_date >= '2021-01-01' AND o.order_date < '2025-01-01' "
+        "AND s.total_spent > 5000 AND s.order_count > 3", con=imported)
+    assert count_filtered_orders(date_range, min_amount, min_orders) == len(expected) > 0
+
+def test_revenue_series_adds_up_to_the_total(imported):
+    total_revenue, _, total_orders = get_total_summery()
+    for granularity in ('day', 'week', 'month', 'year'):
+        series = get_total_over_time(granularity)
+        assert series['spent_amount'].sum() == pytest.approx(total_revenue)
+        assert series['order_count'].sum() == total_orders
+
+def test_unsupported_granularity_warns(imported):
+    assert not isinstance(get_total_over_time('hour'), pd.DataFrame)
+
+def test_top_customers_beyond_the_stored_table(imported):
+    top_df = top_customer_by_revenue(150)
+    assert len(top_df) == 150
+    assert top_df['spent_amount'].is_monotonic_decreasing
+    pd.testing.assert_frame_equal(top_df.head(10), top_customer_by_revenue(10))
+
+@pytest.mark.parametrize('backend', ['sql', 'memory'])
+def test_date_range_includes_the_whole_end_day(imported, source_csvs, tmp_path, monkeypatch, backend):
+    orders_csv = str(tmp_path / 'late_orders.csv')
+    source_df = pd.concat([pd.read_csv(source_csvs['orders']), pd.DataFrame([LATE_ORDER])])
+    source_df.to_csv(orders_csv, index=False)
+    data_read_write(incremental=True, customers_csv=source_csvs['customers'], orders_csv=orders_csv)
+    if backend == 'memory':
+        analytics = InMemoryAnalytics(imported, get_data_version())
+        monkeypatch.setattr(dashboard_queries, 'get_memory_engine', lambda: analytics)
+        clear_cache()
+
+    date_range = (date(2023, 8, 1), date(2023, 8, 15))
+    order_days = pd.to_datetime(source_df['created_at']).dt.date
+    in_range = source_df[order_days.between(*date_range)]
+    expected = in_range[in_range['customer_id'].notna()]
+    assert LATE_ORDER['id'] in set(filter_data_by_sidebar(date_range)['order_id'])
+    assert LATE_ORDER['id'] in set(read_all_pages(date_range, 0, 0, 25)['order_id'])
+    assert count_filtered_orders(date_range) == len(expected)
+    assert top_customer_by_revenue(1, date_range)['customer_id'].tolist() == [LATE_ORDER['customer_id']]
+    assert get_total_over_time('day', date_range)['spent_amount'].sum() == pytest.approx(in_range['total_amount'].sum())
@@ -0,0 +1,86 @@
+"""
+Tests of the In-Memory Analytics Backend
+
+Every `db.filter` query answered by `InMemoryAnalytics` has to return the same
+result as the SQL query it replaces.
+"""
+from datetime import date # Date range filters
+import pandas as pd # Result frames
+import pytest # Fixtures and approximate comparisons
+import db.filter as dashboard_queries # Queries answered by either backend
+from db.cache import clear_cache, get_data_version # Query cache between the two backends
+from db.data_import import data_read_write # Import of the empty files
+from db.memory_engine import InMemoryAnalytics # Backend under test
+
+DATE_RANGE = (date(2022, 3, 1), date(2023, 8, 15))
+
+# Query calls compared between the backends, with the columns their rows are ordered by
+CALLS = {
+    'max_filter_amount': (lambda: dashboard_queries.get_max_filter_amount(), None),
+    'orders': (lambda: dashboard_queries.filter_data_by_sidebar(DATE_RANGE, 2000, 2), 'order_id'),
+    'orders_page': (lambda: dashboard_queries.filter_orders_page(DATE_RANGE, 0, 0, 50), None),
+    'order_count': (lambda: dashboard_queries.count_filtered_orders(DATE_RANGE, 2000, 2), None),
+    'customers': (lambda: dashboard_queries.filter_customer_by_amount(2000, 2), 'customer_id'),
+    'top_customers': (lambda: dashboard_queries.top_customer_by_revenue(10), None),
+    'top_customers_in_range': (lambda: dashboard_queries.top_customer_by_revenue(10, DATE_RANGE), None),
+    'revenue_by_month': (lambda: dashboard_queries.get_total_over_time('month'), None),
+    'revenue_by_week_in_range': (lambda: dashboard_queries.get_total_over_time('week', DATE_RANGE), None),
+    'summary': (lambda: dashboard_queries.get_total_summery(), None),
+    'snapshot': (lambda: dashboard_queries.get_dashboard_snapshot(10), None),
+}
+
+def assert_same_result(memory_result, sql_result, order_by):
+    """
+    Compare Two Query Results, Frames by Value Regardless of their Column Types.
+    """
+    if isinstance(sql_result, pd.DataFrame):
+        assert isinstance(memory_result, pd.DataFrame)
+        if order_by:
+            sql_result = sql_result.sort_values(order_by)
+            memory_result = memory_result.sort_values(order_by)
+        pd.testing.assert_frame_equal(memory_result.reset_index(drop=True), sql_result.reset_index(drop=True),
+                                      check_dtype=False, check_categorical=False, check_exact=False)
+    elif isinstance(sql_result, dict):
+        assert memory_result.keys() == sql_result.keys()
+        for key in sql_result:
+            assert_same_result(memory_result[key], sql_result[key], None)
+    elif isinstance(sql_result, tuple):
+        assert len(memory_result) == len(sql_result)
+        for memory_item, sql_item in zip(memory_result, sql_result):
+            assert_same_result(memory_item, sql_item, None)
+    elif isinstance(sql_result, float):
+        assert memory_result == pytest.approx(sql_result)
+    else:
+        assert memory_result == sql_result # Counts and page cursors
+
+@pytest.fixture
+def empty_import(use_database, source_csvs, tmp_path):
+    """
+    Return the Engine of a Database Holding an Import of CSV Files Without Rows.
+    """
+    engine = use_database()
+    paths = {name: str(tmp_path / f"empty_{name}.csv") for name in ('customers', 'orders')}
+    for name, path in paths.items():
+        pd.read_csv(source_csvs[name], nrows=0).to_csv(path, index=False)
+    data_read_write(customers_csv=paths['customers'], orders_csv=paths['orders'])
+    return engine
+
+@pytest.mark.parametrize('name', sorted(CALLS))
+def test_memory_engine_matches_sql(imported, monkeypatch, name):
+    assert_same_backends(imported, monkeypatch, name)
+
+@pytest.mark.parametrize('name', sorted(CALLS))
+def test_memory_engine_matches_sql_without_orders(empty_import, monkeypatch, name):
+    assert_same_backends(empty_import, monkeypatch, name)
+
+def assert_same_backends(engine, monkeypatch, name):
+    """
+    Run a Query Call on the SQL and Then on the In-Memory Backend and Compare the Results.
+    """
+    call, order_by = CALLS[name]
+    sql_result = call()
+
+    analytics = InMemoryAnalytics(engine, get_data_version())
+    monkeypatch.setattr(dashboard_queries, 'get_memory_engine', lambda: analytics)
+    clear_cache()
+    assert_same_result(call(), sql_result, order_by)
@@ -0,0 +1,48 @@
+"""
+Tests of the Persisted Models
+
+A persisted model has to be keyed by the data version it was trained on, and an
+update of the online model has to consume every changed customer exactly once.
+"""
+import os # Artifact files
+import numpy as np # Target column
+import pandas as pd # Changed feature rows
+import ml_model # Artifact versions under test
+from db.cache import get_data_version # Data version token of the import
+from db.data_import import data_read_write # Imports changing the features
+from db.filter import add_recency_days, get_customer_features, get_feature_reference_date # Model features
+
+def customer_training_data():
+    """
+    Return the Model Features and the Repeat Purchaser Target of Every Customer.
+    """
+    feature_df = add_recency_days(get_customer_features(), get_feature_reference_date())
+    return feature_df, np.ravel(feature_df['total_orders'] > 1)
+
+def test_artifact_is_keyed_by_one_data_version(imported, monkeypatch):
+    X, y = customer_training_data()
+    stale_path = ml_model.get_model_artifact_path(3, 1)
+    os.makedirs(os.path.dirname(stale_path), exist_ok=True)
+    open(stale_path, 'wb').close()
+
+    # The data version read by the artifact path decides the artifact and the cleanup
+    versions = iter([get_data_version(), 1])
+    monkeypatch.setattr(ml_model, 'get_data_version', lambda: next(versions))
+    artifact = ml_model.get_trained_lr_model(X, y, 3)
+    assert artifact['data_version'] != 1
+    assert os.path.exists(ml_model.get_model_artifact_path(3, artifact['data_version']))
+    assert not os.path.exists(stale_path)
+
+def test_online_model_consumes_every_change_once(use_database, source_csvs, monkeypatch):
+    engine = use_database()
+    data_read_write(customers_csv=source_csvs['customers_first'], orders_csv=source_csvs['orders_first'])
+    monkeypatch.setattr(ml_model, 'get_data_version', lambda: 0) # A token read before the import finished
+    feature_rows = pd.read_sql("SELECT COUNT(*) AS n FROM customer_features", con=engine)['n'].iloc[0]
+    assert ml_model.update_online_model(engine)['customers_consumed'] == feature_rows > 0
+    assert ml_model.update_online_model(engine)['customers_consumed'] == 0
+
+    data_read_write(incremental=True, customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+    changed = pd.read_sql("SELECT COUNT(*) AS n FROM customer_features WHERE updated_version = "
+                          "(SELECT MAX(updated_version) FROM customer_features)", con=engine)['n'].iloc[0]
+    assert ml_model.update_online_model(engine)['customers_consumed'] == changed > 0
+    assert ml_model.update_online_model(engine)['customers_consumed'] == 0
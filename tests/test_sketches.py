@@ -0,0 +1,100 @@
+"""
+Tests of the Approximate Mode Sketches
+
+Every sketch has to stay within the error bound it reports: quantiles within the
+relative accuracy, distinct counts and sampled totals within their 95% intervals, and the running
+total exact.
+"""
+import math # Order statistics of the quantiles
+import numpy as np # Synthetic values
+import pandas as pd # Exact answers from the tables
+import pytest # Parametrized tests
+from db.data_import import data_read_write # Imports maintaining the sketches
+from db.filter import get_max_filter_amount, get_spend_quantiles, get_total_summery # Approximate queries
+from db.sketches import (Estimate, HyperLogLog, QuantileSketch, ReservoirSample, RunningTotal,
+                         QUANTILE_ACCURACY) # Sketches under test
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999]
+
+def assert_quantile_within_accuracy(estimate, values, q, accuracy=QUANTILE_ACCURACY):
+    """
+    Check an Estimate Against the Order Statistics Around the Quantile's Rank.
+    """
+    ordered = np.sort(np.asarray(values, dtype=np.float64))
+    rank = q * (len(ordered) - 1)
+    errors = [abs(estimate.value - ordered[index]) / ordered[index]
+              for index in {math.floor(rank), math.ceil(rank)}]
+    assert min(errors) <= accuracy * (1 + 1e-9)
+    assert estimate.low <= estimate.value <= estimate.high
+
+def test_quantile_sketch_relative_accuracy():
+    values = np.random.default_rng(3).lognormal(6.5, 1.2, 100000)
+    sketch, other = QuantileSketch(), QuantileSketch()
+    sketch.add(values[:50000])
+    other.add(values[50000:])
+    sketch.merge(other)
+    assert sketch.count == len(values)
+    assert (sketch.minimum, sketch.maximum) == (values.min(), values.max())
+    for q in QUANTILES:
+        assert_quantile_within_accuracy(sketch.quantile(q), values, q)
+
+    restored = QuantileSketch.from_arrays(sketch.to_arrays())
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+@pytest.mark.parametrize('n_ids', [100, 5000, 200000])
+def test_hyperloglog_within_interval(n_ids):
+    counter = HyperLogLog()
+    ids = np.arange(1, n_ids + 1)
+    counter.add(ids[:n_ids // 2])
+    counter.add(ids) # Ids seen twice are counted once
+    estimate = counter.estimate()
+    assert estimate.low <= n_ids <= estimate.high
+    assert HyperLogLog.from_arrays(counter.to_arrays()).estimate() == estimate
+
+def test_reservoir_sample_estimate():
+    amounts = np.random.default_rng(5).lognormal(6.5, 0.8, 100000)
+    sample = ReservoirSample(size=2000)
+    for start in range(0, len(amounts), 7000):
+        sample.add(amounts[start:start + 7000])
+    assert len(sample.amounts) == 2000 and sample.seen == len(amounts)
+    estimate = sample.estimate_total()
+    # The sample is random: allow twice the 95% margin, which fails about once in ten thousand runs
+    assert abs(estimate.value - amounts.sum()) <= 2 * (estimate.high - estimate.value)
+
+def test_reservoir_sample_exact_when_complete():
+    amounts = np.arange(1.0, 501.0)
+    sample = ReservoirSample(size=1000)
+    sample.add(amounts)
+    assert sample.estimate_total() == (amounts.sum(), amounts.sum(), amounts.sum())
+
+def test_running_total_is_exact_across_chunks():
+    amounts = np.random.default_rng(4).lognormal(6.5, 1.2, 100000).round(2)
+    running_total = RunningTotal()
+    for chunk in np.array_split(amounts, 7):
+        running_total.add(chunk)
+    restored = RunningTotal.from_arrays(running_total.to_arrays())
+    assert restored.estimate() == (math.fsum(amounts),) * 3
+    assert restored.count == len(amounts)
+
+@pytest.mark.parametrize('incremental', [False, True])
+def test_imported_sketches_match_the_tables(use_database, source_csvs, incremental):
+    engine = use_database()
+    if incremental:
+        data_read_write(customers_csv=source_csvs['customers_first'], orders_csv=source_csvs['orders_first'])
+    data_read_write(incremental=incremental, customers_csv=source_csvs['customers'], orders_csv=source_csvs['orders'])
+
+    revenue, customers, order_count = get_total_summery()
+    revenue_estimate, customers_estimate, orders_estimate = get_total_summery(True)
+    assert revenue_estimate == pytest.approx((revenue, revenue, revenue))
+    assert customers_estimate.low <= customers <= customers_estimate.high
+    assert orders_estimate.value == order_count
+    assert get_max_filter_amount(True) == get_max_filter_amount()
+
+    summary = pd.read_sql("SELECT total_spent, order_count FROM customer_summary", con=engine)
+    amounts = pd.read_sql("SELECT total_amount FROM orders", con=engine)['total_amount']
+    spend_quantiles = get_spend_quantiles(tuple(QUANTILES)).set_index('quantile')
+    for q in QUANTILES:
+        for column, values in (('total_spent', summary['total_spent']), ('order_count', summary['order_count']),
+                               ('order_amount', amounts)):
+            value = float(spend_quantiles.loc[q, column])
+            assert_quantile_within_accuracy(Estimate(value, value, value), values, q)